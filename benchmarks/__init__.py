@@ -0,0 +1,5 @@
+"""
+Performance benchmarks of ciphers and analyzers.
+
+Run with ``python -m benchmarks`` from the repository root.
+"""
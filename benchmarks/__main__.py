@@ -0,0 +1,105 @@
+"""
+Runs benchmarks, writes results as JSON and compares them with a stored baseline.
+
+Examples::
+
+    python -m benchmarks --quick
+    python -m benchmarks --save-baseline
+    python -m benchmarks --output results.json --tolerance 0.3
+"""
+import argparse
+import json
+import logging
+import platform
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+from .cases import CASES, Case
+
+logger = logging.getLogger(__name__)
+
+BASELINE = Path(__file__).parent / "baseline.json"
+
+
+def measure(case: Case, repeat: int) -> Dict[str, Any]:
+    run = case.setup(**case.params)
+    run()  # warm up
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started)
+    return {"median": statistics.median(timings), "min": min(timings), "repeat": repeat}
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]],
+            tolerance: float) -> List[str]:
+    """
+    Prints ratios of median timings to the baseline
+
+    :return:  Names of cases slower than the baseline by more than tolerance
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            print(f"{name:<60} {result['median'] * 1000:>10.2f} ms  (not in baseline)")
+            continue
+        ratio = result["median"] / baseline[name]["median"]
+        regressed = ratio > 1 + tolerance
+        if regressed:
+            regressions.append(name)
+        print(f"{name:<60} {result['median'] * 1000:>10.2f} ms  x{ratio:.2f}{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quick", action="store_true", help="Run only small inputs")
+    parser.add_argument("--filter", default=None, help="Run only cases with names containing this substring")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of measured runs of every case")
+    parser.add_argument("--output", type=Path, default=None, help="Write results to this JSON file")
+    parser.add_argument("--baseline", type=Path, default=BASELINE, help="Baseline JSON file to compare with")
+    parser.add_argument("--save-baseline", action="store_true", help="Store results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Allowed relative slowdown of a median timing before it is reported as a regression")
+    args = parser.parse_args(argv)
+    logging.basicConfig(format="%(asctime)s %(levelname)s:%(message)s", level=logging.ERROR)
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for case in CASES:
+        if args.quick and not case.quick:
+            continue
+        if args.filter and args.filter not in case.full_name:
+            continue
+        results[case.full_name] = measure(case, repeat=args.repeat)
+        print(f"{case.full_name:<60} {results[case.full_name]['median'] * 1000:>10.2f} ms", file=sys.stderr)
+
+    report = {
+        "meta": {"time": time.time(), "python": platform.python_version(), "numpy": np.__version__,
+                 "platform": platform.platform(), "repeat": args.repeat},
+        "results": results,
+    }
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=2))
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2))
+        print(f"Baseline saved to {str(args.baseline)}")
+        return 0
+    if not args.baseline.exists():
+        print(f"No baseline at {str(args.baseline)}, run with --save-baseline to store one")
+        return 0
+    regressions = compare(results, json.loads(args.baseline.read_text())["results"], tolerance=args.tolerance)
+    if regressions:
+        print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,215 @@
+"""
+Benchmark cases.
+
+Every case is a function registered with ``benchmark`` which prepares its inputs
+(outside of the measured time) and returns a callable to measure. Inputs are synthetic texts
+generated with fixed seeds or bundled corpus texts (see corpus.py), so results of two runs
+differ only by the speed of the code.
+"""
+import random
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence
+
+from crypto.algo.caesar import CaesarCipher
+from crypto.algo.substitution import SubstitutionCipher
+from crypto.algo.transpositions import DoubleTranspositionCipher
+from crypto.algo.vigenere import VigenereCipher
+from crypto.analysis.branch_bound import BranchAndBoundAnalyzer
+from crypto.analysis.caesar import CaesarAnalyzer
+from crypto.analysis.hill import HillClimbingAnalyzer
+from crypto.analysis.substitution import SubstitutionAnalyzer
+from crypto.analysis.language.frequency import GramStat, Language, ngram_fitness
+from crypto.analysis.language.utils import abs_loss, fast_ngram_fitness, fast_ngram_fitness_batch, log_loss
+from crypto.analysis.vigenere import VigenereAnalyzer
+
+from .corpus import corpus_text
+from .tasks import ENGLISH_10X11, RUSSIAN_6X20, TranspositionTask
+
+DATA = Path(__file__).parent.parent / "data"
+SEED = 1234
+
+
+@dataclass
+class Case:
+    name: str
+    setup: Callable[..., Callable[[], object]]
+    params: Dict[str, object]
+    quick: bool
+
+    @property
+    def full_name(self) -> str:
+        return "/".join([self.name, *(f"{key}={value}" for key, value in self.params.items())])
+
+
+CASES: List[Case] = []
+
+
+def benchmark(name: str, quick: Sequence[Dict[str, object]] = ({},), full: Sequence[Dict[str, object]] = ()):
+    """
+    Registers a case for every parameter set, ``quick`` parameter sets are also run in quick mode
+    """
+    def register(setup: Callable[..., Callable[[], object]]):
+        for params in quick:
+            CASES.append(Case(name, setup, dict(params), quick=True))
+        for params in full:
+            CASES.append(Case(name, setup, dict(params), quick=False))
+        return setup
+    return register
+
+
+_languages: Dict[str, Language] = {}
+
+
+def language(name: str) -> Language:
+    if name not in _languages:
+        kwargs = RUSSIAN_6X20.language_kwargs if name == "russian" else {}
+        _languages[name] = Language(name, DATA, **kwargs).preload()
+    return _languages[name]
+
+
+def synthetic_text(name: str, size: int, seed: int = SEED) -> str:
+    """
+    Random text with letters drawn from language monogram frequencies
+    """
+    monograms = language(name)[1]
+    return "".join(random.Random(seed).choices(list(monograms.keys()), weights=list(monograms.values()), k=size))
+
+
+def input_text(name: str, source: str, size: int) -> str:
+    """
+    Text of a language from a source: "synthetic" (see synthetic_text) or "corpus" (see corpus_text)
+    """
+    return synthetic_text(name, size) if source == "synthetic" else corpus_text(name, size)
+
+
+@benchmark("language_load", quick=[{"cache": True}], full=[{"cache": False}])
+def language_load(cache: bool):
+    def run():
+        return Language("english", DATA, cache=cache).preload()
+    # compiled tables are written on the first (not measured) load
+    run()
+    return run
+
+
+SOURCES = ("synthetic", "corpus")
+
+
+@benchmark("gramstat_from_text", quick=[{"n": 3, "size": 10_000, "source": "synthetic"}],
+           full=[{"n": n, "size": size, "source": source}
+                 for n in (1, 4) for size in (10_000, 100_000) for source in SOURCES])
+def gramstat_from_text(n: int, size: int, source: str):
+    text = input_text("english", source, size)
+    return lambda: GramStat.from_text(text, n=n)
+
+
+@benchmark("ngram_fitness", quick=[{"loss": "log", "size": 1_000, "source": "synthetic"},
+                                   {"loss": "abs", "size": 1_000, "source": "synthetic"}],
+           full=[{"loss": loss, "size": 10_000, "source": source} for loss in ("log", "abs") for source in SOURCES])
+def ngram_fitness_case(loss: str, size: int, source: str):
+    text, english = input_text("english", source, size), language("english")
+    loss_fn = {"log": log_loss, "abs": abs_loss}[loss]
+    return lambda: ngram_fitness(text, n=3, language=english, loss=loss_fn)
+
+
+@benchmark("fast_ngram_fitness", quick=[{"loss": "log", "size": 1_000, "source": "synthetic"},
+                                        {"loss": "abs", "size": 1_000, "source": "synthetic"}],
+           full=[{"loss": loss, "size": 10_000, "source": source} for loss in ("log", "abs") for source in SOURCES])
+def fast_ngram_fitness_case(loss: str, size: int, source: str):
+    # encoded text and integer-indexed table, as analyzers score decrypted codes
+    english = language("english")
+    codes, loss_fn = english.encode(input_text("english", source, size)), {"log": log_loss, "abs": abs_loss}[loss]
+    english.table(3)
+    return lambda: fast_ngram_fitness(codes, n=3, language=english, loss=loss_fn)
+
+
+@benchmark("fast_ngram_fitness_batch", quick=[{"loss": "log", "rows": 1_000, "size": 110, "source": "synthetic"}],
+           full=[{"loss": loss, "rows": 10_000, "size": 110, "source": source}
+                 for loss in ("log", "abs") for source in SOURCES])
+def fast_ngram_fitness_batch_case(loss: str, rows: int, size: int, source: str):
+    english = language("english")
+    codes = english.encode(input_text("english", source, rows * size)).reshape(rows, size)
+    loss_fn = {"log": log_loss, "abs": abs_loss}[loss]
+    english.table(3)
+    return lambda: fast_ngram_fitness_batch(codes, n=3, language=english, loss=loss_fn)
+
+
+@benchmark("caesar_cipher", quick=[{"size": 100_000, "source": "synthetic"}],
+           full=[{"size": 1_000_000, "source": source} for source in SOURCES])
+def caesar_cipher(size: int, source: str):
+    text, cipher = input_text("english", source, size), CaesarCipher(language("english").alphabet)
+    return lambda: cipher.decrypt(cipher.encrypt(text, "K"), "K")
+
+
+@benchmark("vigenere_cipher", quick=[{"size": 100_000, "source": "synthetic"}],
+           full=[{"size": 1_000_000, "source": source} for source in SOURCES])
+def vigenere_cipher(size: int, source: str):
+    text, cipher = input_text("english", source, size), VigenereCipher(language("english").alphabet)
+    return lambda: cipher.decrypt(cipher.encrypt(text, "LEMON"), "LEMON")
+
+
+@benchmark("caesar_analyzer_fit", quick=[{"size": 1_000, "source": "synthetic"}],
+           full=[{"size": size, "source": source} for size in (1_000, 100_000) for source in SOURCES
+                 if (size, source) != (1_000, "synthetic")])
+def caesar_analyzer_fit(size: int, source: str):
+    english = language("english")
+    crypttext = CaesarCipher(english.alphabet).encrypt(input_text("english", source, size), "K")
+    analyzer = CaesarAnalyzer(english)
+    return lambda: analyzer.fit(crypttext)
+
+
+@benchmark("vigenere_analyzer_fit", quick=[{"size": 1_000, "source": "corpus"}],
+           full=[{"size": size, "source": source} for size in (1_000, 10_000) for source in SOURCES
+                 if (size, source) != (1_000, "corpus")])
+def vigenere_analyzer_fit(size: int, source: str):
+    english = language("english")
+    crypttext = VigenereCipher(english.alphabet).encrypt(input_text("english", source, size), "JANET")
+    analyzer = VigenereAnalyzer(english)
+    return lambda: analyzer.fit(crypttext)
+
+
+@benchmark("transposition_key_sample", quick=[{"count": 10_000}], full=[{"count": 1_000_000}])
+def transposition_key_sample(count: int):
+    key_generator = RUSSIAN_6X20.key_generator(seed=SEED)
+    return lambda: key_generator.sample(count)
+
+
+@benchmark("substitution_analyzer_fit", quick=[{"size": 300, "source": "corpus"}],
+           full=[{"size": 3_000, "source": source} for source in SOURCES])
+def substitution_analyzer_fit(size: int, source: str):
+    english = language("english")
+    crypttext = SubstitutionCipher(english.alphabet).encrypt(input_text("english", source, size),
+                                                             "QWERTYUIOPASDFGHJKLZXCVBNM")
+    analyzer = SubstitutionAnalyzer(english)
+    return lambda: analyzer.fit(crypttext, ngrams=4, phases=5, seed=SEED)
+
+
+def _transposition_fit(task: TranspositionTask, phases: int, ngrams: int, **kwargs):
+    analyzer = HillClimbingAnalyzer(DoubleTranspositionCipher(), key_generator=task.key_generator(),
+                                    key_argname="k2", language=language(task.language), **kwargs)
+    frame = task.frame
+    return lambda: analyzer.fit(frame, ngrams=ngrams, phases=phases, seed=SEED)
+
+
+@benchmark("hill_climbing_fit", quick=[{"task": "english_10x11", "mode": "vectorized"}],
+           full=[{"task": task, "mode": mode} for task in ("english_10x11", "russian_6x20")
+                 for mode in ("default", "vectorized", "delta") if (task, mode) != ("english_10x11", "vectorized")])
+def hill_climbing_fit(task: str, mode: str):
+    task = {t.name: t for t in (ENGLISH_10X11, RUSSIAN_6X20)}[task]
+    kwargs = {"default": {}, "vectorized": {"vectorized": True}, "delta": {"delta": True}}[mode]
+    # russian data has no quadgrams and is scored with abs_loss
+    loss_fn = abs_loss if task.language == "russian" else log_loss
+    return _transposition_fit(task, phases=10, ngrams=3, loss_fn=loss_fn, **kwargs)
+
+
+@benchmark("branch_and_bound_fit", quick=[{"task": "english_10x11", "order": 2}],
+           full=[{"task": task, "order": order} for task in ("english_10x11", "russian_6x20") for order in (2, 3)
+                 if (task, order) != ("english_10x11", 2)])
+def branch_and_bound_fit(task: str, order: int):
+    task = {t.name: t for t in (ENGLISH_10X11, RUSSIAN_6X20)}[task]
+    loss_fn = abs_loss if task.language == "russian" else log_loss
+    analyzer = BranchAndBoundAnalyzer(DoubleTranspositionCipher(), key_generator=task.key_generator(),
+                                      key_argname="k2", language=language(task.language), loss_fn=loss_fn,
+                                      vectorized=True, order=order)
+    frame = task.frame
+    return lambda: analyzer.fit(frame, ngrams=3)
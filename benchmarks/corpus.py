@@ -0,0 +1,19 @@
+"""
+Natural language texts bundled with the repository (plaintexts of the notebook substitution task
+and of the russian transposition task) used as corpus inputs of benchmarks
+"""
+CORPUS = {
+    "english": ("IMAYNOTBEABLETOGROWFLOWERSBUTMYGARDENPRODUCESJUSTASMANYDEADLEAVESOLDOVERSHOESPIECESOFROPE"
+                "ANDBUSHELSOFDEADGRASSASANYBODYSANDTODAYIBOUGHTAWHEELBARROWTOHELPINCLEARINGITUPIHAVEALWAYS"
+                "LOVEDANDRESPECTEDTHEWHEELBARROWITISTHEONEWHEELEDVEHICLEOFWHICHIAMPERFECTMASTER"),
+    "russian": ("ДОЛГОЕВРЕМЯЗАНЯТИЕКРИПТОГРАФИЕЙБЫЛОУДЕЛОМОДИНОЧЕКТЧКСРЕДИНИХБЫЛИОДАРЕННЫЕУЧЕНЫЕЗПТ"
+                "ДИПЛОМАТЫЗПТСВЯЩЕННОСЛУЖИТЕЛИТЧК"),
+}
+
+
+def corpus_text(name: str, size: int) -> str:
+    """
+    Bundled text of a language repeated up to size characters
+    """
+    text = CORPUS[name]
+    return (text * (size // len(text) + 1))[:size]
@@ -0,0 +1,54 @@
+"""
+Double transposition tasks used by benchmarks
+"""
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
+
+from crypto.analysis.transposition import TranspositionKeyGenerator
+from crypto.utils import to_df
+
+
+@dataclass
+class TranspositionTask:
+    name: str
+    language: str
+    crypttext: str
+    size: Tuple[int, int]
+    initial_key: List[int]
+    generator_kwargs: Dict[str, Any] = field(default_factory=dict)
+    language_kwargs: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def frame(self):
+        return to_df(self.crypttext, self.size)
+
+    def key_generator(self, seed: int = None) -> TranspositionKeyGenerator:
+        return TranspositionKeyGenerator(self.initial_key, seed=seed, **self.generator_kwargs)
+
+
+RUSSIAN_6X20 = TranspositionTask(
+    name="russian_6x20",
+    language="russian",
+    crypttext=("ЯНЛВКРАДОЕТЕРГОМИЗЯЕ"
+               "ЙЛТАЛФЫИПЕУИООГЕДБОР"
+               "ЧРДЧИЕСМОНДКХИНТИКЕО"
+               "НУЛАЕРЕБЫЫЕЕЗИОННЫЧД"
+               "ЫТДОЕМППТЩВАНИПТЯЗСЛ"
+               "ИКСИ-ТЧНО--Е-ЛУЛ-Т-Ж"),
+    size=(6, 20),
+    initial_key=[8, 2, 5, 6, 15, 3, 1, 11, 7, 0, 17, 19, 13, 14, 18, 10, 16, 9, 4, 12],
+    generator_kwargs={"permutation_indices": range(0, 14), "linked_groups": [[-1, -2, -3, -4, -5, -6]]},
+    language_kwargs={"mapping": {"Ё": "Е"}, "encoding": "utf-8"},
+)
+
+ENGLISH_10X11 = TranspositionTask(
+    name="english_10x11",
+    language="english",
+    crypttext=("TNOSSKAIMAGAEITMHETHTSRH--IHEU-D-NUEIDSATDTDDSARAHHENTTTDSOUIOEART"
+               "FHDAOMWYWFERTNEONFDYAHSEIMEDGRWTATISURUARTHJ"),
+    size=(10, 11),
+    initial_key=list(range(11)),
+    generator_kwargs={"linked_groups": [[-1, -2]]},
+)
+
+TASKS = [RUSSIAN_6X20, ENGLISH_10X11]
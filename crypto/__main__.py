@@ -0,0 +1,66 @@
+"""
+Cracks crypttexts read as JSON lines (see crypto.batch) from files or stdin
+and writes results as JSON lines.
+
+Examples::
+
+    python -m crypto jobs.jsonl --workers 8 > results.jsonl
+    cat jobs.jsonl | python -m crypto --cipher vigenere --unordered
+    python -m crypto russian.jsonl --language russian --loss abs --mapping Ё=Е --encoding utf-8
+"""
+import argparse
+import fileinput
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import List
+
+from crypto.analysis.language.frequency import Language
+from crypto.analysis.language.utils import abs_loss, log_loss
+from crypto.batch import CIPHERS, crack_stream, read_jobs
+
+DATA = Path(__file__).parent.parent / "data"
+LOSSES = {"log": log_loss, "abs": abs_loss}
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m crypto", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="*", help="JSON lines files with jobs (stdin if none or -)")
+    parser.add_argument("--cipher", choices=CIPHERS, default=None, help="Cipher of jobs without one")
+    parser.add_argument("--language", default="english", help="Name of the language")
+    parser.add_argument("--data", type=Path, default=DATA, help="Directory with language data")
+    parser.add_argument("--encoding", default=None, help="Encoding of language data files")
+    parser.add_argument("--mapping", action="append", default=[], metavar="FROM=TO",
+                        help="Replace a character of texts before analysis (repeatable)")
+    parser.add_argument("--loss", choices=sorted(LOSSES), default="log", help="Loss of n-gram based analyzers")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="Number of worker processes (1 cracks jobs in this process)")
+    parser.add_argument("--max-in-flight", type=int, default=None,
+                        help="Maximal number of jobs read ahead of written results (2 per worker by default)")
+    parser.add_argument("--unordered", action="store_true", help="Write results in the order of completion")
+    parser.add_argument("--output", type=Path, default=None, help="Write results to this file instead of stdout")
+    parser.add_argument("--log-level", default="WARNING", help="Logging level")
+    args = parser.parse_args(argv)
+    logging.basicConfig(format="%(asctime)s %(levelname)s:%(message)s", level=args.log_level.upper())
+
+    mapping = dict(item.split("=", 1) for item in args.mapping)
+    language = Language(args.language, args.data, mapping=mapping or None, encoding=args.encoding)
+    output = args.output.open("w", encoding="utf-8") if args.output is not None else sys.stdout
+    try:
+        with fileinput.input(args.files, openhook=fileinput.hook_encoded("utf-8")) as lines:
+            records = crack_stream(read_jobs(lines, cipher=args.cipher), language, loss_fn=LOSSES[args.loss],
+                                   workers=args.workers, max_in_flight=args.max_in_flight,
+                                   ordered=not args.unordered)
+            for record in records:
+                print(json.dumps(record, ensure_ascii=False), file=output, flush=True)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
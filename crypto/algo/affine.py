@@ -3,7 +3,7 @@
 """
 from typing import Union, Sequence
 
-from math import gcd
+from crypto.algo.utils import AlphabetTranslator
 
 
 class AffineEncryptor:
@@ -12,22 +12,19 @@ class AffineEncryptor:
         if len(alphabet) != len(set(alphabet)):
             raise ValueError("Passed alphabet must not contain duplicate characters!")
         self.alphabet = alphabet
+        self.translator = AlphabetTranslator(self.alphabet)
 
     def encrypt(self, data: str, factor, shift, **kwargs) -> str:
         return self.__encrypt(data, factor, shift)
 
     def decrypt(self, data: str, factor, shift, **kwargs) -> str:
-        g = gcd(factor, len(self.alphabet))
-        x = factor // g
-        return self.__encrypt(ctext, x, -shift)
+        # pos = (c - shift) / factor = c * factor^-1 - shift * factor^-1
+        inverse = pow(factor, -1, len(self.alphabet))
+        return self.__encrypt(data, inverse, -shift * inverse)
 
     def __encrypt(self, ptext, factor, shift):
-        while shift < 0:
-            shift += len(self.alphabet)
-        ctext = []
-        for c in ptext:
-            pos = self.alphabet.find(c)
-            if pos == -1:
-                raise Exception("Text not in alphabet")
-            ctext.append(self.alphabet[(pos * factor + shift) % len(self.alphabet)])
-        return "".join(ctext)
+        factor, shift = factor % len(self.alphabet), shift % len(self.alphabet)
+        if self.translator.invalid(ptext) is not None:
+            raise Exception("Text not in alphabet")
+        return self.translator.translate(ptext, (factor, shift),
+                                         lambda pos: (pos * factor + shift) % len(self.alphabet))
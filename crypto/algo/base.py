@@ -2,7 +2,9 @@
 Base interface
 """
 from abc import ABC, abstractmethod
-from typing import Any, Sequence, Union, Set
+from typing import Any, Callable, Sequence, Union, Set, Tuple
+
+import numpy as np
 
 
 class Cipher(ABC):
@@ -18,3 +20,35 @@ class Cipher(ABC):
     @abstractmethod
     def to_text(self, data: Any) -> str:
         raise NotImplementedError()
+
+    def to_codes(self, data: Any, encode: Callable[[str], np.ndarray]) -> np.ndarray:
+        """
+        Encodes data to an array of integer character codes in the layout decrypt_codes expects
+        """
+        return encode(self.to_text(data))
+
+    def decrypt_codes(self, codes: np.ndarray, **kwargs) -> np.ndarray:
+        """
+        Decrypts data encoded with to_codes and returns a flat array of codes of the decrypted text.
+        Only ciphers which do not depend on the meaning of characters (i.e. transpositions) can implement this.
+        """
+        raise NotImplementedError()
+
+    def decrypt_codes_batch(self, codes: np.ndarray, key_argname: str, keys: Sequence[Any], **kwargs) -> np.ndarray:
+        """
+        Decrypts data encoded with to_codes with many keys at once.
+
+        :param key_argname:  Name of the key argument which takes values from keys
+        :param kwargs:       Other (fixed) key arguments
+        :return:             Two dimensional array, codes of the text decrypted with i-th key in i-th row
+        """
+        return np.stack([self.decrypt_codes(codes, **{key_argname: key}, **kwargs) for key in keys])
+
+    def swap_positions(self, data: Any, swap: Tuple[int, int], key_argname: str) -> Tuple[Sequence[int], Sequence[int]]:
+        """
+        Positions of decrypted text which exchange their characters when two elements of a key are swapped.
+        Only ciphers which move characters around (i.e. transpositions) can implement this.
+
+        :return: two sequences of positions of equal length, i-th positions of both are swapped
+        """
+        raise NotImplementedError()
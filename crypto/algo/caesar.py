@@ -5,7 +5,7 @@ Caesar cipher implementation:
 from typing import Any, Union, Sequence
 
 from crypto.algo.base import Cipher
-from crypto.algo.utils import from_alphabet
+from crypto.algo.utils import AlphabetTranslator, from_alphabet
 
 
 class CaesarCipher(Cipher):
@@ -15,6 +15,7 @@ class CaesarCipher(Cipher):
 
     def __init__(self, alphabet: Union[str, Sequence[str]]):
         self.alphabet = from_alphabet(alphabet, lower=True)
+        self.translator = AlphabetTranslator(self.alphabet)
 
     def encrypt(self, data: str, key: Union[str, int], **kwargs) -> Any:
         if isinstance(key, str):
@@ -28,15 +29,10 @@ class CaesarCipher(Cipher):
 
     def _encrypt_int(self, data: str, key: int):
         key = key % len(self.alphabet)
-
-        ctext = []
-
-        for c in data:
-            pos = self.alphabet.find(c)
-            if pos == -1:
-                raise RuntimeError(f"Character '{c}' is not in the alphabet")
-            ctext.append(self.alphabet[(pos + key) % len(self.alphabet)])
-        return "".join(ctext)
+        invalid = self.translator.invalid(data)
+        if invalid is not None:
+            raise RuntimeError(f"Character '{invalid}' is not in the alphabet")
+        return self.translator.translate(data, key, lambda pos: (pos + key) % len(self.alphabet))
 
     def _alpha_to_shift(self, key: str):
         if len(key) != 1:
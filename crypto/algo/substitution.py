@@ -0,0 +1,54 @@
+"""
+Simple (monoalphabetic) substitution cipher
+"""
+from typing import Dict, Sequence, Union
+
+from crypto.algo.base import Cipher
+from crypto.algo.utils import AlphabetTranslator, from_alphabet
+
+
+class SubstitutionCipher(Cipher):
+    """
+    Every symbol of the alphabet is replaced with the symbol of the key at the same position:
+    with alphabet "ABC" and key "CAB", A is encrypted as C, B as A and C as B.
+    Keys are permutations of the alphabet (strings or sequences of symbols).
+    """
+
+    def __init__(self, alphabet: Union[str, Sequence[str]]):
+        self.alphabet = from_alphabet(alphabet, lower=True)
+        self.translator = AlphabetTranslator(self.alphabet)
+
+    def to_text(self, data: str) -> str:
+        return data
+
+    def key_positions(self, key: Union[str, Sequence[str]]) -> Sequence[int]:
+        """
+        Alphabet positions of key symbols
+        """
+        key = from_alphabet(key, lower=True)
+        if sorted(key) != sorted(self.alphabet):
+            raise ValueError(f"Key {key} is not a permutation of the alphabet {self.alphabet}")
+        return [self.alphabet.index(symbol) for symbol in key]
+
+    def key_from_mapping(self, mapping: Dict[str, str]) -> str:
+        """
+        Key of a plaintext -> crypttext symbol mapping covering the whole alphabet
+        """
+        return "".join(mapping[symbol] for symbol in self.alphabet)
+
+    def encrypt(self, data: str, key: Union[str, Sequence[str]], **kwargs) -> str:
+        positions = self.key_positions(key)
+        return self._substitute(data, ("encrypt", tuple(positions)), positions.__getitem__)
+
+    def decrypt(self, data: str, key: Union[str, Sequence[str]], **kwargs) -> str:
+        positions = self.key_positions(key)
+        inverse = [0] * len(positions)
+        for position, key_position in enumerate(positions):
+            inverse[key_position] = position
+        return self._substitute(data, ("decrypt", tuple(positions)), inverse.__getitem__)
+
+    def _substitute(self, data: str, key, substitute):
+        invalid = self.translator.invalid(data)
+        if invalid is not None:
+            raise RuntimeError(f"Character '{invalid}' is not in the alphabet")
+        return self.translator.translate(data, key, substitute)
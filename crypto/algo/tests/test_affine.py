@@ -0,0 +1,29 @@
+import unittest
+
+from crypto.algo.affine import AffineEncryptor
+
+
+class TestAffineEncryptor(unittest.TestCase):
+    def setUp(self) -> None:
+        self.cipher = AffineEncryptor("ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+
+    def test_encrypt(self):
+        # E(x) = (5x + 8) mod 26
+        self.assertEqual("IHHWVCSWFRCP", self.cipher.encrypt("AFFINECIPHER", 5, 8))
+
+    def test_encrypt_decrypt(self):
+        plaintext = "THEQUICKBROWNFOXJUMPSOVERTHELAZYDOG"
+        for factor, shift in ((1, 0), (3, 7), (25, -4), (7, 30)):
+            self.assertEqual(plaintext, self.cipher.decrypt(self.cipher.encrypt(plaintext, factor, shift), factor, shift))
+
+    def test_not_invertible_factor(self):
+        with self.assertRaises(ValueError):
+            self.cipher.decrypt("ABC", 13, 1)
+
+    def test_text_not_in_alphabet(self):
+        with self.assertRaises(Exception):
+            self.cipher.encrypt("AB C", 5, 8)
+
+    def test_non_latin_alphabet(self):
+        cipher = AffineEncryptor("АБВГДЕЖ")
+        self.assertEqual("ВГД", cipher.decrypt(cipher.encrypt("ВГД", 3, 2), 3, 2))
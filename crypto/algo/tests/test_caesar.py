@@ -32,3 +32,15 @@ class TestCaesarCipher(unittest.TestCase):
             self.cipher.encrypt(plaintext, "a")
         # test valid char "3" that shifts to two ["1" -> 0 (its index), "2" -> 1 and so on]
         self.assertEqual("143", self.cipher.encrypt(plaintext, "3"))
+
+    def test_character_not_in_alphabet(self):
+        with self.assertRaises(RuntimeError) as context:
+            self.cipher.encrypt("1253", 1)
+        self.assertIn("'5'", str(context.exception))
+        with self.assertRaises(RuntimeError):
+            self.cipher.decrypt("12Б3", 1)
+
+    def test_large_text(self):
+        plaintext = "1234" * 100000
+        self.assertEqual("2341" * 100000, self.cipher.encrypt(plaintext, 1))
+        self.assertEqual(plaintext, self.cipher.decrypt(self.cipher.encrypt(plaintext, 3), 3))
@@ -0,0 +1,34 @@
+import unittest
+
+from crypto.algo.substitution import SubstitutionCipher
+
+
+class TestSubstitutionCipher(unittest.TestCase):
+    def setUp(self) -> None:
+        self.cipher = SubstitutionCipher("ABCD")
+
+    def test_encrypt_decrypt(self):
+        self.assertEqual("CAAB", self.cipher.encrypt("BDDA", "BCDA"))
+        self.assertEqual("BDDA", self.cipher.decrypt("CAAB", "BCDA"))
+        self.assertEqual("ABCD", self.cipher.decrypt(self.cipher.encrypt("ABCD", "DACB"), "DACB"))
+
+    def test_key_from_mapping(self):
+        key = self.cipher.key_from_mapping({"A": "B", "B": "C", "C": "D", "D": "A"})
+        self.assertEqual("BCDA", key)
+
+    def test_invalid_key(self):
+        for key in ("ABC", "ABCE", "AABC"):
+            with self.assertRaises(ValueError):
+                self.cipher.encrypt("ABCD", key)
+
+    def test_invalid_character(self):
+        with self.assertRaises(RuntimeError):
+            self.cipher.encrypt("ABE", "BCDA")
+
+    def test_translation_tables_are_bounded(self):
+        cipher = SubstitutionCipher("ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+        cipher.translator.maxsize = 10
+        keys = [cipher.alphabet[shift:] + cipher.alphabet[:shift] for shift in range(26)]
+        for key in keys:
+            self.assertEqual("HELLO", cipher.decrypt(cipher.encrypt("HELLO", key), key))
+        self.assertEqual(10, len(cipher.translator._tables))
@@ -0,0 +1,47 @@
+import unittest
+
+import numpy as np
+
+from crypto.algo.transpositions import DoubleTranspositionCipher
+from crypto.utils import to_df, to_grid
+
+
+class TestDoubleTranspositionCipher(unittest.TestCase):
+    def setUp(self) -> None:
+        self.cipher = DoubleTranspositionCipher()
+        self.text = "ABCDEFGHIJKL"
+        self.k1, self.k2 = [2, 0, 1], [3, 1, 0, 2]
+
+    def test_decrypt_matches_reindex(self):
+        df = to_df(self.text, (3, 4))
+        expected = df.reindex(index=self.k1, columns=self.k2)
+        actual = self.cipher.decrypt(df, k1=self.k1, k2=self.k2)
+        self.assertTrue(expected.equals(actual))
+        # labels of a decrypted frame are kept, so keys are applied to labels, not positions
+        twice = self.cipher.decrypt(actual, k1=self.k1, k2=self.k2)
+        self.assertTrue(expected.reindex(index=self.k1, columns=self.k2).equals(twice))
+        self.assertEqual("KLIJCDABGHEF", self.cipher.to_text(self.cipher.decrypt(df, k1=[2, 0, 1], k2=[2, 3, 0, 1])))
+
+    def test_decrypt_single_key(self):
+        df = to_df(self.text, (3, 4))
+        self.assertEqual("IJKLABCDEFGH", self.cipher.to_text(self.cipher.decrypt(df, k1=[2, 0, 1])))
+        self.assertEqual("DABCHEFGLIJK", self.cipher.to_text(self.cipher.decrypt(df, k2=[3, 0, 1, 2])))
+
+    def test_grid_engine_matches_frame(self):
+        df, grid = to_df(self.text, (3, 4)), to_grid(self.text, (3, 4))
+        expected = self.cipher.to_text(self.cipher.decrypt(df, k1=self.k1, k2=self.k2))
+        self.assertEqual(expected, self.cipher.to_text(self.cipher.decrypt(grid, k1=self.k1, k2=self.k2)))
+        codes = self.cipher.to_codes(df, lambda text: np.array([ord(c) - ord("A") for c in text]))
+        decrypted = self.cipher.decrypt_codes(codes, k1=self.k1, k2=self.k2)
+        self.assertEqual(expected, "".join(chr(ord("A") + c) for c in decrypted))
+
+    def test_swap_positions(self):
+        grid = to_grid(self.text, (3, 4))
+        key = [0, 1, 2, 3]
+        for key_argname, swapped_key in (("k1", [2, 1, 0]), ("k2", [2, 1, 0, 3])):
+            left, right = self.cipher.swap_positions(grid, swap=(0, 2), key_argname=key_argname)
+            expected = list(self.cipher.to_text(self.cipher.decrypt(grid, **{key_argname: key[:len(swapped_key)]})))
+            for i, j in zip(left, right):
+                expected[i], expected[j] = expected[j], expected[i]
+            self.assertEqual("".join(expected),
+                             self.cipher.to_text(self.cipher.decrypt(grid, **{key_argname: swapped_key})))
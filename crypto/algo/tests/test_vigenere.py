@@ -1,5 +1,7 @@
 import unittest
 
+import numpy as np
+
 from crypto.algo.vigenere import VigenereCipher
 
 
@@ -32,3 +34,24 @@ class TestVigenereCipher(unittest.TestCase):
             self.cipher.encrypt(plaintext, "aa")
         # test valid char "3" that shifts to two ["1" -> 0 (its index), "2" -> 1 and so on]
         self.assertEqual("244311", self.cipher.encrypt(plaintext, "43"))
+
+    def test_decrypt_matches_caesar_slices(self):
+        cipher = VigenereCipher("ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+        crypttext = "LXFOPVEFRNHR"
+        plaintext = cipher.decrypt(crypttext, "LEMON")
+        self.assertEqual("ATTACKATDAWN", plaintext)
+        for i, subkey in enumerate("LEMON"):
+            self.assertEqual(cipher.caesar.decrypt(crypttext[i::5], subkey), plaintext[i::5])
+
+    def test_character_not_in_alphabet(self):
+        with self.assertRaises(RuntimeError):
+            self.cipher.encrypt("3215", "23")
+
+    def test_decrypt_batch(self):
+        crypttext = self.cipher.encrypt("3211234", "23")
+        keys = ["23", [1, 2, 3], "4", "11"]
+        self.assertEqual([self.cipher.decrypt(crypttext, key) for key in keys], self.cipher.decrypt_batch(crypttext, keys))
+        codes = np.array([0, 1, 2, 3, 7, 0])
+        decrypted = self.cipher.decrypt_codes_batch(codes, "key", np.array([[0, 1], [1, 0]]))
+        np.testing.assert_array_equal([[0, 0, 2, 2, 7, 3], [3, 1, 1, 3, 7, 0]], decrypted)
+        np.testing.assert_array_equal(decrypted[1], self.cipher.decrypt_codes(codes, key=[1, 0]))
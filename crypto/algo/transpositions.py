@@ -1,28 +1,85 @@
 from logging import getLogger
-from typing import List, Any
+from typing import List, Any, Tuple, Union, Callable, Sequence
 
+import numpy as np
 import pandas as pd
 
 from crypto.algo.base import Cipher
-from crypto.utils import from_df
+from crypto.utils import from_codepoints
 
 logger = getLogger(__name__)
 
 
 class DoubleTranspositionCipher(Cipher):
+    """
+    Double transposition of a text grid: k1 permutes rows and k2 permutes columns.
+
+    Works with pandas.DataFrame of characters (see crypto.utils.to_df), where keys are index and column labels,
+    or with two dimensional numpy arrays of character codes (see crypto.utils.to_grid), where keys are positions.
+    """
 
     @classmethod
-    def to_text(cls, data: pd.DataFrame) -> str:
-        return "".join(from_df(data))
+    def to_text(cls, data: Union[pd.DataFrame, np.ndarray]) -> str:
+        if isinstance(data, np.ndarray):
+            return from_codepoints(data.ravel())
+        return "".join(data.to_numpy().ravel())
 
     @classmethod
-    def decrypt(cls, data: pd.DataFrame, k1: List[int]=None, k2: List[int]=None):
-        if not k1 and not k2:
+    def decrypt(cls, data: Union[pd.DataFrame, np.ndarray], k1: List[int]=None, k2: List[int]=None):
+        if (k1 is None or not len(k1)) and (k2 is None or not len(k2)):
             logger.warning("No key was passed to decode, leaving as is")
             return data
-        data = data.reindex(index=k1, columns=k2)
-        return data
+        if isinstance(data, np.ndarray):
+            return cls.permute(data, k1, k2)
+        rows = data.index.get_indexer(k1) if k1 is not None else np.arange(data.shape[0])
+        columns = data.columns.get_indexer(k2) if k2 is not None else np.arange(data.shape[1])
+        if np.any(rows < 0) or np.any(columns < 0):
+            # unknown labels produce missing values
+            return data.reindex(index=k1, columns=k2)
+        return pd.DataFrame(cls.permute(data.to_numpy(), rows, columns),
+                            index=data.index[rows], columns=data.columns[columns])
 
     @classmethod
-    def encrypt(cls, data: pd.DataFrame, k1: List[int]=None, k2: List[int]=None):
+    def encrypt(cls, data: Union[pd.DataFrame, np.ndarray], k1: List[int]=None, k2: List[int]=None):
         return cls.decrypt(data, k1, k2)
+
+    @classmethod
+    def permute(cls, grid: np.ndarray, k1: Sequence[int] = None, k2: Sequence[int] = None) -> np.ndarray:
+        """
+        Applies row (k1) and column (k2) permutations to a two dimensional array by their positions
+        """
+        if k1 is not None:
+            grid = np.take(grid, k1, axis=0)
+        if k2 is not None:
+            grid = np.take(grid, k2, axis=1)
+        return grid
+
+    @classmethod
+    def to_codes(cls, data: Union[pd.DataFrame, np.ndarray], encode: Callable[[str], np.ndarray]) -> np.ndarray:
+        return encode(cls.to_text(data)).reshape(data.shape)
+
+    @classmethod
+    def decrypt_codes(cls, codes: np.ndarray, k1: List[int] = None, k2: List[int] = None) -> np.ndarray:
+        return cls.permute(codes, k1, k2).ravel()
+
+    @classmethod
+    def decrypt_codes_batch(cls, codes: np.ndarray, key_argname: str, keys: Sequence[Sequence[int]],
+                            k1: List[int] = None, k2: List[int] = None) -> np.ndarray:
+        keys = np.asarray(keys)
+        if key_argname == "k1":
+            # rows of all keys in one gather: (keys, rows, columns)
+            return cls.permute(codes, None, k2)[keys].reshape(len(keys), -1)
+        if key_argname == "k2":
+            # columns of all keys in one gather: (rows, keys, columns) -> (keys, rows, columns)
+            return cls.permute(codes, k1, None)[:, keys].transpose(1, 0, 2).reshape(len(keys), -1)
+        raise ValueError(f"Unknown key argument: {key_argname}")
+
+    @classmethod
+    def swap_positions(cls, data: pd.DataFrame, swap: Tuple[int, int],
+                       key_argname: str) -> Tuple[np.ndarray, np.ndarray]:
+        rows, columns = data.shape
+        if key_argname == "k1":
+            return swap[0] * columns + np.arange(columns), swap[1] * columns + np.arange(columns)
+        if key_argname == "k2":
+            return np.arange(rows) * columns + swap[0], np.arange(rows) * columns + swap[1]
+        raise ValueError(f"Unknown key argument: {key_argname}")
@@ -1,4 +1,9 @@
-from typing import Union, Sequence
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from crypto.utils import from_codepoints, to_codepoints
 
 
 def from_alphabet(alphabet: Union[str, Sequence[str]], lower: bool = True) -> str:
@@ -8,3 +13,88 @@ def from_alphabet(alphabet: Union[str, Sequence[str]], lower: bool = True) -> st
     if lower:
         alphabet = alphabet.upper()
     return alphabet
+
+
+class AlphabetTranslator:
+    """
+    Substitutions of alphabet symbols done with one ``str.translate`` call per text.
+
+    Translation tables are built once per key and cached with least recently used eviction
+    (key spaces of ciphers like simple substitution are too large to cache them all).
+    Alphabets of single byte (latin-1) characters translate latin-1 texts with ``bytes.translate``
+    and 256 byte tables.
+
+    :param alphabet:  Alphabet with unique characters
+    :param maxsize:   Maximal number of cached translation tables
+    """
+
+    def __init__(self, alphabet: str, maxsize: int = 512):
+        if maxsize <= 0:
+            raise ValueError("Cache size should be a positive number")
+        self.alphabet = alphabet
+        self.maxsize = maxsize
+        self.single_byte = all(ord(c) < 256 for c in alphabet)
+        self._delete = str.maketrans("", "", alphabet)
+        self._delete_bytes = alphabet.encode("latin-1") if self.single_byte else None
+        self._tables: 'OrderedDict[Hashable, Tuple[Dict[int, int], Optional[bytes]]]' = OrderedDict()
+
+    def invalid(self, text: str) -> Optional[str]:
+        """
+        First character of a text which is not in the alphabet (None if there is none)
+        """
+        raw = self._encode(text)
+        rest = raw.translate(None, self._delete_bytes).decode("latin-1") if raw is not None \
+            else text.translate(self._delete)
+        return rest[0] if rest else None
+
+    def translate(self, text: str, key: Hashable, substitute: Callable[[int], int]) -> str:
+        """
+        Replaces every alphabet symbol at position ``pos`` with the symbol at position ``substitute(pos)``.
+        Characters outside of the alphabet are left as is.
+
+        :param key:  Key of the substitution, translation tables are cached by it
+        """
+        if key not in self._tables:
+            substituted = "".join(self.alphabet[substitute(pos)] for pos in range(len(self.alphabet)))
+            byte_table = None
+            if self.single_byte:
+                byte_table = bytes.maketrans(self._delete_bytes, substituted.encode("latin-1"))
+            self._tables[key] = str.maketrans(self.alphabet, substituted), byte_table
+            if len(self._tables) > self.maxsize:
+                self._tables.popitem(last=False)
+        else:
+            self._tables.move_to_end(key)
+        table, byte_table = self._tables[key]
+        raw = self._encode(text) if byte_table is not None else None
+        if raw is not None:
+            return raw.translate(byte_table).decode("latin-1")
+        return text.translate(table)
+
+    def _encode(self, text: str) -> Optional[bytes]:
+        if not self.single_byte:
+            return None
+        try:
+            return text.encode("latin-1")
+        except UnicodeEncodeError:
+            return None
+
+
+def encode_alphabet(text: str, alphabet: str) -> np.ndarray:
+    """
+    Positions of text characters in the alphabet (-1 for characters outside of it)
+    """
+    alphabet_codepoints = to_codepoints(alphabet)
+    lookup = np.full(int(alphabet_codepoints.max(initial=0)) + 1, -1, dtype=np.int64)
+    lookup[alphabet_codepoints] = np.arange(len(alphabet_codepoints))
+    codepoints = to_codepoints(text)
+    codes = np.full(codepoints.shape, -1, dtype=np.int64)
+    known = codepoints < len(lookup)
+    codes[known] = lookup[codepoints[known]]
+    return codes
+
+
+def decode_alphabet(codes: np.ndarray, alphabet: str) -> str:
+    """
+    Text of alphabet characters at positions
+    """
+    return from_codepoints(to_codepoints(alphabet)[codes])
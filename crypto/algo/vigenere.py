@@ -2,16 +2,22 @@
 
 """
 from logging import getLogger
-from typing import Sequence, Union, Any, List, Callable
+from typing import Sequence, Union, Any, List
+
+import numpy as np
 
 from crypto.algo.base import Cipher
 from crypto.algo.caesar import CaesarCipher
-from crypto.algo.utils import from_alphabet
+from crypto.algo.utils import decode_alphabet, encode_alphabet
 
 logger = getLogger(__name__)
 
 
 class VigenereCipher(Cipher):
+    """
+    Text is encoded once as alphabet positions, key shifts are tiled over the whole
+    text and added (subtracted) modulo alphabet size in one operation.
+    """
 
     def __init__(self, alphabet: Union[str, Sequence[str]]):
         self.caesar = CaesarCipher(alphabet)
@@ -30,33 +36,63 @@ class VigenereCipher(Cipher):
         if not len(key):
             raise ValueError("Zero-length key")
 
-    def _crypt(self, data: str, key: Union[str, List[int]], callback: Callable[[str, Union[str, int]], str]) -> str:
+    def shifts(self, key: Union[str, List[int]]) -> np.ndarray:
+        """
+        Shifts of key symbols (characters are mapped to their positions in the alphabet)
+        """
         self._verify_key(key)
-        subtexts = []
-
-        for i, subkey in enumerate(key):
-            subtexts.append(callback(data[i::len(key)], subkey))
-
-        ptext = []
-        for i in range(len(subtexts[0])):
-            for st in subtexts:
-                if i < len(st):
-                    ptext.append(st[i])
-        return "".join(ptext)
+        return np.array([
+            self.caesar._alpha_to_shift(subkey) if isinstance(subkey, str) else subkey
+            for subkey in key
+        ], dtype=np.int64) % len(self.alphabet)
+
+    def _encode(self, data: str) -> np.ndarray:
+        codes = encode_alphabet(data, self.alphabet)
+        if np.any(codes < 0):
+            raise RuntimeError(f"Character '{data[int(np.argmax(codes < 0))]}' is not in the alphabet")
+        return codes
+
+    def _shift(self, codes: np.ndarray, shifts: np.ndarray) -> np.ndarray:
+        # shifts of one key (one dimensional) or a batch of keys of the same length (two dimensional)
+        # are tiled along the text, symbols outside of the alphabet (codes >= len(alphabet)) are kept
+        length = codes.shape[-1]
+        tiled = np.tile(shifts, (1,) * (shifts.ndim - 1) + (-(-length // shifts.shape[-1]),))[..., :length]
+        inside = codes < len(self.alphabet)
+        return np.where(inside, (codes + tiled) % len(self.alphabet), codes)
 
     def encrypt(self, data: str, key: Union[str, List[int]]) -> str:
-        return self._crypt(data, key, self.caesar.encrypt)
+        shifts = self.shifts(key)
+        return decode_alphabet(self._shift(self._encode(data), shifts), self.alphabet)
 
     def decrypt(self, data: str, key: Union[str, List[int]]):
-        self._verify_key(key)
-        subtexts = []
-
-        for i, subkey in enumerate(key):
-            subtexts.append(self.caesar.decrypt(data[i::len(key)], subkey))
-
-        ptext = []
-        for i in range(len(subtexts[0])):
-            for st in subtexts:
-                if i < len(st):
-                    ptext.append(st[i])
-        return "".join(ptext)
+        shifts = self.shifts(key)
+        return decode_alphabet(self._shift(self._encode(data), -shifts), self.alphabet)
+
+    def decrypt_batch(self, data: str, keys: Sequence[Union[str, List[int]]]) -> List[str]:
+        """
+        Decrypts a text with every key, keys of the same length are decrypted at once
+        """
+        codes = self._encode(data)
+        shifts = [self.shifts(key) for key in keys]
+        texts: List[str] = [""] * len(keys)
+        for length in sorted(set(map(len, shifts))):
+            indices = [idx for idx, key_shifts in enumerate(shifts) if len(key_shifts) == length]
+            decrypted = self._shift(codes, -np.stack([shifts[idx] for idx in indices]))
+            for idx, row in zip(indices, decrypted):
+                texts[idx] = decode_alphabet(row, self.alphabet)
+        return texts
+
+    def decrypt_codes(self, codes: np.ndarray, key: Union[str, List[int]] = None, **kwargs) -> np.ndarray:
+        """
+        Decrypts text encoded with alphabet positions (codes past the alphabet are kept as is)
+        """
+        return self._shift(codes, -self.shifts(key))
+
+    def decrypt_codes_batch(self, codes: np.ndarray, key_argname: str, keys: Sequence[Any], **kwargs) -> np.ndarray:
+        """
+        Decrypts encoded text with every key of a batch, keys must have the same length
+        """
+        if key_argname != "key":
+            raise ValueError(f"Unknown key argument {key_argname} of {self.__class__.__name__}")
+        return self._shift(codes, -np.stack([self.shifts(list(key) if isinstance(key, np.ndarray) else key)
+                                             for key in keys]))
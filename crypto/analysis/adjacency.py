@@ -0,0 +1,177 @@
+"""
+Column adjacency of transposition grids.
+
+The decrypted text of a column key is the crypttext grid read row by row with columns
+in key order, so its n-grams are made of n consecutive columns (within rows) and of
+the last and first columns of a key (across rows). Costs (negative log-frequencies) of
+all such joins are precomputed once per grid, then the cost of a key, the sum over all
+n-grams of its text, takes O(columns) lookups instead of decrypting and scoring the text.
+"""
+import itertools
+from typing import Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from crypto.algo.transpositions import DoubleTranspositionCipher
+from crypto.analysis.base import BaseKeyGenerator
+from crypto.analysis.language.frequency import Language
+from crypto.analysis.language.table import NGramTable
+
+
+def column_costs(grid: np.ndarray, table: NGramTable, width: int) -> np.ndarray:
+    """
+    Costs of joining columns of an encoded grid: element ``[c_1, ..., c_width]`` is the sum over rows
+    of negative log-frequencies of n-grams of the row restricted to columns c_1, ..., c_width
+
+    :param grid:   Crypttext encoded with language symbol codes, a row of text per row
+    :param width:  Number of joined columns, at least the order of the table
+    """
+    columns = grid.shape[1]
+    combinations = np.array(list(itertools.product(range(columns), repeat=width)), dtype=np.int64)
+    indices = table.ngram_indices(grid[:, combinations])
+    return -table.log_lookup(indices).sum(axis=(0, 2)).reshape((columns,) * width)
+
+
+def wrap_costs(grid: np.ndarray, table: NGramTable) -> np.ndarray:
+    """
+    Costs of n-grams spanning rows: element ``[l_1, ..., l_{n-1}, f_1, ..., f_{n-1}]`` is the sum over
+    pairs of consecutive rows of negative log-frequencies of n-grams of the last columns l of a row
+    followed by the first columns f of the next row
+    """
+    columns, n = grid.shape[1], table.n
+    combinations = np.array(list(itertools.product(range(columns), repeat=2 * (n - 1))), dtype=np.int64)
+    last, first = combinations[:, :n - 1], combinations[:, n - 1:]
+    joined = np.concatenate((grid[:-1][:, last], grid[1:][:, first]), axis=2)
+    indices = table.ngram_indices(joined)
+    return -table.log_lookup(indices).sum(axis=(0, 2)).reshape((columns,) * (2 * (n - 1)))
+
+
+def append_cost(costs: list, n: int, history: Tuple[int, ...],
+                columns: Sequence[int]) -> Tuple[float, Tuple[int, ...]]:
+    """
+    Cost of n-grams completed by appending columns to a text ending with history columns
+
+    :param costs:    Column costs of order n (see column_costs) as nested lists
+    :param history:  Up to n - 1 last columns of the text
+    :return:         The cost and the new history
+    """
+    cost = 0.0
+    for column in columns:
+        if len(history) == n - 1:
+            element = costs
+            for previous in history:
+                element = element[previous]
+            cost += element[column]
+        history = (*history, column)[-(n - 1):]
+    return cost, history
+
+
+def completion_costs(costs: np.ndarray, blocks: List[List[int]], tail: List[int]) -> np.ndarray:
+    """
+    Minimal costs of completing keys (Held-Karp recursion over sets of blocks): element
+    ``[mask, b_1, ..., b_{n-1}]`` is the cost of in-row n-grams added by appending blocks missing in the bit mask
+    and the tail after a prefix made of blocks of the mask and ending with blocks b_1, ..., b_{n-1}
+
+    :param costs:  Column costs of order n (see column_costs)
+    """
+    size, n = len(blocks), costs.ndim
+    table = costs.tolist()
+    shape = (size,) * (n - 1)
+    # transitions[b_1, ..., b_{n-1}, v]: cost of appending block v after blocks b_1, ..., b_{n-1}
+    transitions = np.zeros(shape + (size,))
+    tail_costs = np.zeros(shape)
+    for previous in itertools.product(range(size), repeat=n - 1):
+        history = tuple(column for block in previous for column in blocks[block])[-(n - 1):]
+        for block in range(size):
+            transitions[previous + (block,)], _ = append_cost(table, n, history, blocks[block])
+        tail_costs[previous], _ = append_cost(table, n, history, tail)
+    to_go = np.full((1 << size,) + shape, np.inf)
+    to_go[-1] = tail_costs
+    masks = np.arange(1 << size)
+    popcounts = np.array([bin(mask).count("1") for mask in range(1 << size)])
+    for count in range(size - 1, n - 2, -1):
+        layer = masks[popcounts == count]
+        for block in range(size):
+            missing = layer[(layer & (1 << block)) == 0]
+            # the block becomes the last one: to_go[mask | block, b_2, ..., b_{n-1}, block]
+            following = to_go[missing | (1 << block)][..., block][:, None]
+            to_go[missing] = np.minimum(to_go[missing], transitions[..., block] + following)
+    return to_go
+
+
+class ColumnAdjacency:
+    """
+    Costs of joining columns of an encoded grid with n-grams of order ``table.n`` (2 for column pairs,
+    3 for triples). Keys are column positions (see DoubleTranspositionCipher.decrypt_codes).
+
+    :param grid:   Crypttext encoded with language symbol codes, a row of text per row
+    :param table:  Language table of n-grams joining columns
+    """
+
+    def __init__(self, grid: np.ndarray, table: NGramTable):
+        self.n = table.n
+        if grid.shape[1] < self.n:
+            raise ValueError(f"Can not join {self.n}-grams of {grid.shape[1]} columns")
+        self.columns = grid.shape[1]
+        self.costs = column_costs(grid, table, width=self.n)
+        """
+        In-row costs of every n columns, see column_costs
+        """
+        self.wraps = (wrap_costs(grid, table) if grid.shape[0] > 1
+                      else np.zeros((self.columns,) * (2 * (self.n - 1))))
+        """
+        Costs of n-grams spanning rows by last and first columns of keys, see wrap_costs
+        """
+        # single keys are scored with nested lists: indexing numpy scalars costs more than the sum itself
+        self._costs = self.costs.tolist()
+
+    @classmethod
+    def from_crypttext(cls, crypttext: Any, language: Language, order: int = 2,
+                       k1: Sequence[int] = None) -> 'ColumnAdjacency':
+        """
+        Adjacency of a crypttext grid (see crypto.utils.to_df) with rows permuted by k1
+        """
+        grid = DoubleTranspositionCipher.permute(DoubleTranspositionCipher.to_codes(crypttext, language.encode), k1)
+        return cls(grid, language.table(order))
+
+    def cost(self, key: Sequence[int]) -> float:
+        """
+        Cost of all n-grams of the text decrypted with a column key
+        """
+        cost, _ = append_cost(self._costs, self.n, (), key)
+        return cost + float(self.wraps[tuple(key[len(key) - self.n + 1:]) + tuple(key[:self.n - 1])])
+
+    def cost_batch(self, keys: np.ndarray) -> np.ndarray:
+        """
+        Costs of column keys given as rows of a two dimensional array
+        """
+        keys = np.asarray(keys, dtype=np.int64)
+        windows = np.lib.stride_tricks.sliding_window_view(keys, self.n, axis=1)
+        in_rows = self.costs[tuple(np.moveaxis(windows, -1, 0))].sum(axis=1)
+        ends = np.concatenate((keys[:, keys.shape[1] - self.n + 1:], keys[:, :self.n - 1]), axis=1)
+        return in_rows + self.wraps[tuple(ends.T)]
+
+    def completion_costs(self, blocks: List[List[int]], tail: List[int]) -> np.ndarray:
+        """
+        Optimistic costs of completing prefixes of keys made of blocks and followed by the tail
+        (see completion_costs): exact in-row costs and the cheapest possible n-grams spanning rows
+        """
+        return completion_costs(self.costs, blocks, tail) + float(self.wraps.min())
+
+    def hill_climbing(self, key: Sequence[int], key_generator: BaseKeyGenerator,
+                      max_rounds: Optional[int] = None) -> Tuple[List[int], float]:
+        """
+        Steepest descent over swapped keys of a key generator (see BaseKeyGenerator.neighbourhood):
+        every round moves to the cheapest key of the neighbourhood, while it is cheaper than the current key
+        """
+        key, cost = list(key), self.cost(key)
+        for _ in itertools.count() if max_rounds is None else range(max_rounds):
+            keys = key_generator.neighbourhood(key)
+            if not len(keys):
+                break
+            costs = self.cost_batch(keys)
+            best = int(np.argmin(costs))
+            if costs[best] >= cost:
+                break
+            key, cost = keys[best].tolist(), float(costs[best])
+        return key, cost
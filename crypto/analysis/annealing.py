@@ -0,0 +1,153 @@
+"""
+Simulated annealing search over swapped keys
+"""
+import math
+import random
+from logging import getLogger
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from crypto.analysis.base import AnalyzerResult
+from crypto.analysis.checkpoint import random_state, set_random_state
+from crypto.analysis.hill import HillClimbingAnalyzer
+from crypto.analysis.language.incremental import IncrementalScorer
+from crypto.utils import swap_elements
+
+logger = getLogger(__name__)
+
+
+def exponential_cooling(initial_temperature: float, step: int, steps: int) -> float:
+    # geometric decay down to 1/1000 of the initial temperature at the last step
+    return initial_temperature * 1e-3 ** (step / steps)
+
+
+def linear_cooling(initial_temperature: float, step: int, steps: int) -> float:
+    return initial_temperature * (1 - step / steps)
+
+
+def logarithmic_cooling(initial_temperature: float, step: int, steps: int) -> float:
+    return initial_temperature / math.log(math.e + step)
+
+
+COOLING_SCHEDULES: Dict[str, Callable[[float, int, int], float]] = {
+    "exponential": exponential_cooling,
+    "linear": linear_cooling,
+    "logarithmic": logarithmic_cooling,
+}
+"""
+Cooling schedules: (initial temperature, step, total steps) -> temperature
+"""
+
+
+class SimulatedAnnealingAnalyzer(HillClimbingAnalyzer):
+    """
+    Same as HillClimbingAnalyzer, but every phase is a simulated annealing run:
+    a random swap of the current key is accepted if it improves the loss, or with
+    probability ``exp(-increase / temperature)`` otherwise, while the temperature cools down.
+    A phase returns the best key seen during the run.
+    """
+
+    def __init__(self, *args, steps: int = 5000,
+                 cooling: Union[str, Callable[[float, int, int], float]] = "exponential",
+                 initial_temperature: float = None, acceptance: float = 0.5, polish: bool = True,
+                 seed: int = None, **kwargs):
+        """
+        :param steps:                Number of proposed swaps in every phase
+        :param cooling:              Name of one of COOLING_SCHEDULES or a schedule function
+        :param initial_temperature:  Starting temperature, by default it is calibrated for every phase,
+                                     so that an average loss increase of a swap is accepted with
+                                     ``acceptance`` probability
+        :param polish:               Finish every phase with hill climbing from the best key of the run
+        :param seed:                 Seed of random swaps (reseeded with master and phase seeds in fit)
+        """
+        super().__init__(*args, **kwargs)
+        self.steps = steps
+        self.cooling = COOLING_SCHEDULES[cooling] if isinstance(cooling, str) else cooling
+        self.initial_temperature = initial_temperature
+        self.acceptance = acceptance
+        self.polish = polish
+        self.random = random.Random(seed)
+
+    def calibrate_temperature(self, crypttext: Any, key: Any, swaps: List[Tuple[int, int]], n: int,
+                              loss: float) -> float:
+        """
+        Temperature at which an average loss increase of swapping key is accepted with acceptance probability
+        """
+        increases = []
+        for swap in self.random.sample(swaps, min(len(swaps), 100)):
+            increase = self.score(crypttext, swap_elements(key, swap=swap), n=n) - loss
+            if increase > 0:
+                increases.append(increase)
+        if not increases:
+            return 1.0
+        return float(np.mean(increases)) / -math.log(self.acceptance)
+
+    def annealing_phase(self, crypttext: Any, starting_key: Any, n: int, starting_loss: float = None):
+        if starting_loss is None:
+            starting_loss = self.score(crypttext, starting_key, n=n)
+        swaps = list(self.key_generator.swaps(starting_key))
+        if not swaps:
+            return starting_key, starting_loss
+        current_key, current_loss = starting_key, starting_loss
+        best_key, best_loss = current_key, current_loss
+        initial_temperature = self.initial_temperature
+        if initial_temperature is None:
+            initial_temperature = self.calibrate_temperature(crypttext, current_key, swaps, n=n, loss=current_loss)
+        scorer = None
+        if self.delta:
+            scorer = IncrementalScorer(self.language.table(n), self.decrypt_codes(crypttext, current_key),
+                                       loss=self.loss_fn)
+        logger.debug(f"Starting annealing from {current_key} ({current_loss:.3f}), "
+                     f"temperature {initial_temperature:.3f}")
+        for step in range(self.steps):
+            temperature = self.cooling(initial_temperature, step, self.steps)
+            swap = self.random.choice(swaps)
+            if scorer is not None:
+                left, right = self.cipher.swap_positions(crypttext, swap=swap, key_argname=self.key_argname)
+                positions = np.concatenate((left, right))
+                values = scorer.codes[np.concatenate((right, left))]
+                self.proposed()
+                loss = scorer.propose(positions, values)
+            else:
+                loss = self.score(crypttext, swap_elements(current_key, swap=swap), n=n)
+            increase = loss - current_loss
+            if increase < 0 or (temperature > 0 and self.random.random() < math.exp(-increase / temperature)):
+                current_key = swap_elements(current_key, swap=swap)
+                current_loss = scorer.commit(positions, values) if scorer is not None else loss
+                if current_loss < best_loss:
+                    logger.debug(f"[{step + 1}/{self.steps}] Found better key: {current_key} "
+                                 f"with loss {current_loss:.3f} (temperature {temperature:.3f})")
+                    best_key, best_loss = current_key, current_loss
+                    if self.metrics is not None:
+                        self.metrics.improvements += 1
+        logger.debug(f"[STOP] best key: {best_key}, best loss {best_loss:.3f}")
+        if self.polish:
+            return self.hill_climbing_phase(crypttext, best_key, n=n, starting_loss=best_loss)
+        return best_key, best_loss
+
+    def search_phase(self, crypttext: Any, starting_key: Any, n: int, starting_loss: float = None):
+        return self.annealing_phase(crypttext, starting_key, n=n, starting_loss=starting_loss)
+
+    def random_states(self) -> Dict[str, Any]:
+        return {**super().random_states(), "analyzer": random_state(self.random)}
+
+    def set_random_states(self, states: Dict[str, Any]):
+        super().set_random_states(states)
+        set_random_state(self.random, states["analyzer"])
+
+    def seed(self, seed: int):
+        self.random.seed(seed)
+
+    def restart_key(self, seed: Optional[int]) -> Any:
+        if seed is not None:
+            self.random.seed(seed)
+        return super().restart_key(seed)
+
+    def fit(self, crypttext: Any, ngrams: int = 3, phases: int = 1, workers: int = None,
+            seed: int = None, **kwargs) -> AnalyzerResult:
+        """
+        :param phases:  Number of annealing runs: first one starts from the initial key,
+                        others from random keys produced by the key generator
+        """
+        return super().fit(crypttext, ngrams=ngrams, phases=phases, workers=workers, seed=seed, **kwargs)
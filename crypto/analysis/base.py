@@ -2,7 +2,11 @@
 Base interface for all analysis tools
 """
 from abc import abstractmethod
-from typing import Any, NamedTuple, Iterable, Sized, Union
+from typing import Any, Dict, List, NamedTuple, Iterable, Optional, Sized, Tuple, Union
+
+import numpy as np
+
+from crypto.analysis.metrics import AnalyzerMetrics
 
 
 class AnalyzerResult(NamedTuple):
@@ -16,9 +20,17 @@ class AnalyzerResult(NamedTuple):
     Best loss after fitting
     """
     score_is_loss: bool = True
+    metrics: Optional[AnalyzerMetrics] = None
+    """
+    Counters and timings of the run, if the analyzer collected them
+    """
 
 
 class BaseAnalyzer:
+    metrics: Optional[AnalyzerMetrics] = None
+    """
+    Instrumentation of the analyzer, disabled (None) by default
+    """
 
     @abstractmethod
     def decrypt(self, crypttext: Any, key: Any, **kwargs) -> str:
@@ -45,6 +57,48 @@ class BaseKeyGenerator:
     def hill_climbing(self, key: Any) -> Iterable[Any]:
         raise NotImplementedError()
 
+    def swaps(self, key: Any) -> Iterable[Tuple[int, int]]:
+        """
+        Pairs of key indices swapped to produce keys of hill_climbing (in the same order)
+        """
+        raise NotImplementedError()
+
+    def neighbourhood(self, key: Any) -> np.ndarray:
+        """
+        All keys of hill_climbing (in the same order) as rows of a two dimensional array
+        """
+        raise NotImplementedError()
+
+    def seed(self, seed: Optional[int]):
+        """
+        Seeds random generator used to produce new keys
+        """
+        raise NotImplementedError()
+
+    def spawn(self, count: int) -> List['BaseKeyGenerator']:
+        """
+        Copies of the generator producing independent streams of keys (e.g. for parallel workers)
+        """
+        raise NotImplementedError()
+
+    def constraints(self) -> Dict[str, Any]:
+        """
+        JSON serializable description of the structure of produced keys (stored in checkpoints)
+        """
+        raise NotImplementedError()
+
+    def get_state(self) -> Any:
+        """
+        JSON serializable state of random generator used to produce new keys
+        """
+        raise NotImplementedError()
+
+    def set_state(self, state: Any):
+        """
+        Restores state of random generator produced by get_state
+        """
+        raise NotImplementedError()
+
     def __iter__(self) -> 'BaseKeyGenerator':
         return self
 
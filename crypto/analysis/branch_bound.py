@@ -0,0 +1,130 @@
+"""
+Exact search of column keys of a double transposition by branch and bound.
+
+Keys are built block by block from column adjacency costs (see crypto.analysis.adjacency),
+branches are pruned when an optimistic bound of their cost can not beat the best keys found so far.
+Keys with the best cost are finally verified with the full loss of the analyzer.
+"""
+import heapq
+import itertools
+from logging import getLogger
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from crypto.analysis.adjacency import append_cost
+from crypto.analysis.base import AnalyzerResult
+from crypto.analysis.hill import HillClimbingAnalyzer
+
+logger = getLogger(__name__)
+
+
+class BranchAndBoundAnalyzer(HillClimbingAnalyzer):
+    """
+    Exact search of column keys (``key_argname="k2"``) of DoubleTranspositionCipher.
+
+    Keys honor the structure of a TranspositionKeyGenerator (see TranspositionKeyGenerator.blocks):
+    blocks are ordered in every possible way and followed by the fixed tail.
+    The search returns keys with the minimal cost of their text n-grams of order ``order``
+    (negative log-likelihood of the text), which is proved by exhausting all keys not pruned by the bound.
+    The ``candidates`` keys with the lowest costs are scored with the loss of the analyzer
+    and the best of them are returned.
+
+    The bound is precomputed for every set of blocks, so the search is meant for keys
+    of up to about 14-16 blocks.
+    """
+
+    def __init__(self, *args, order: int = 2, candidates: int = 10, **kwargs):
+        """
+        :param order:       Order of n-grams in the cost of keys (2 or 3)
+        :param candidates:  Number of keys with the lowest costs verified with the loss
+        """
+        super().__init__(*args, **kwargs)
+        if self.key_argname != "k2":
+            raise ValueError(f"Only column keys (k2) are supported, got {self.key_argname}")
+        if order not in (2, 3):
+            raise ValueError(f"Order of n-grams should be 2 or 3, got {order}")
+        self.order = order
+        self.candidates = candidates
+        self.nodes = 0
+        """
+        Number of partial keys visited by the last search
+        """
+
+    def search(self, crypttext: Any) -> List[Tuple[float, List[int]]]:
+        """
+        Keys with the lowest costs
+
+        :return:  Up to ``candidates`` pairs of cost and key sorted by cost
+        """
+        adjacency = self.column_adjacency(crypttext, self.order)
+        n, wraps = adjacency.n, adjacency.wraps
+        blocks, tail = self.key_generator.blocks()
+        full_mask = (1 << len(blocks)) - 1
+        to_go = adjacency.completion_costs(blocks, tail)
+        costs = adjacency.costs.tolist()
+        best: List[Tuple[float, int, List[int]]] = []  # max-heap by cost of (-cost, counter, key)
+        dominance: Dict[Tuple[int, Tuple[int, ...], Tuple[int, ...]], List[float]] = {}
+        counter = itertools.count()
+        self.nodes = 0
+
+        def threshold() -> float:
+            return -best[0][0] if len(best) >= self.candidates else np.inf
+
+        def visit(key: List[int], history: Tuple[int, ...], cost: float, mask: int, lasts: Tuple[int, ...]):
+            self.nodes += 1
+            if mask == full_mask:
+                tail_cost, _ = append_cost(costs, n, history, tail)
+                key = key + tail
+                cost += tail_cost + wraps[tuple(key[-(n - 1):] + key[:n - 1])]
+                if cost < threshold():
+                    heapq.heappush(best, (-cost, next(counter), key))
+                    if len(best) > self.candidates:
+                        heapq.heappop(best)
+                return
+            # prefixes using the same blocks with the same first and last columns have the same completions
+            # (n-grams spanning rows join both ends): the prefix is pruned when ``candidates`` cheaper
+            # prefixes were already visited
+            seen = dominance.setdefault((mask, tuple(key[:n - 1]), history), [])
+            if len(seen) >= self.candidates and seen[-1] <= cost:
+                return
+            seen.append(cost)
+            seen.sort()
+            del seen[self.candidates:]
+            children = []
+            for idx, block in enumerate(blocks):
+                if not mask & (1 << idx):
+                    block_cost, block_history = append_cost(costs, n, history, block)
+                    child_mask, child_lasts = mask | (1 << idx), (*lasts, idx)[-(n - 1):]
+                    # completions are bounded once the last n - 1 blocks are known
+                    bound = to_go[(child_mask, *child_lasts)] if len(child_lasts) == n - 1 else -np.inf
+                    children.append((cost + block_cost + bound, cost + block_cost, idx, block_history, child_lasts))
+            for bound, child_cost, idx, child_history, child_lasts in sorted(children):
+                if bound >= threshold():
+                    break
+                visit(key + blocks[idx], child_history, child_cost, mask | (1 << idx), child_lasts)
+
+        visit([], (), 0.0, 0, ())
+        logger.debug(f"Visited {self.nodes} partial keys")
+        return sorted(((-cost, key) for cost, _, key in best), key=lambda item: item[0])
+
+    def fit(self, crypttext: Any, ngrams: int = 3, **kwargs) -> AnalyzerResult:
+        """
+        :param ngrams:  Order of n-grams of the loss verifying the best candidates
+        """
+        self.clear_caches()
+        if self.metrics is not None:
+            self.metrics.start()
+        candidates = self.search(crypttext)
+        best_keys, best_loss = [], np.inf
+        for cost, key in candidates:
+            loss = self.full_score(crypttext, key, n=ngrams)
+            logger.info(f"Candidate {key}: cost {cost:.3f}, loss {loss:.3f}")
+            if loss < best_loss:
+                best_keys, best_loss = [key], loss
+            elif np.equal(loss, best_loss):
+                best_keys.append(key)
+        logger.info(f"[END] Keys: {best_keys} Best loss: {best_loss} (visited {self.nodes} partial keys)")
+        if self.metrics is not None:
+            self.metrics.report(force=True)
+        return AnalyzerResult(best_keys, best_score=best_loss, score_is_loss=True, metrics=self.metrics)
@@ -0,0 +1,63 @@
+"""
+Memoization of key scores
+"""
+from collections import OrderedDict
+from typing import Any, Hashable, List, Optional, Tuple
+
+
+class ScoreCache:
+    """
+    Bounded mapping of (n-gram order, key) -> loss with least recently used eviction.
+
+    :param maxsize:  Maximal number of cached scores
+    """
+
+    def __init__(self, maxsize: int = 100_000):
+        if maxsize <= 0:
+            raise ValueError("Cache size should be a positive number")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._scores: 'OrderedDict[Hashable, float]' = OrderedDict()
+
+    @staticmethod
+    def cache_key(key: object, n: int) -> Hashable:
+        return n, tuple(key) if not isinstance(key, (str, int)) else key
+
+    def get(self, key: object, n: int) -> Optional[float]:
+        cache_key = self.cache_key(key, n)
+        loss = self._scores.get(cache_key)
+        if loss is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._scores.move_to_end(cache_key)
+        return loss
+
+    def put(self, key: object, n: int, loss: float):
+        cache_key = self.cache_key(key, n)
+        self._scores[cache_key] = loss
+        self._scores.move_to_end(cache_key)
+        if len(self._scores) > self.maxsize:
+            self._scores.popitem(last=False)
+
+    def items(self) -> List[Tuple[int, Any, float]]:
+        """
+        Cached (n-gram order, key, loss) from the least recently used one, put them back in this order to restore
+        """
+        return [(n, list(key) if isinstance(key, tuple) else key, loss) for (n, key), loss in self._scores.items()]
+
+    def clear(self):
+        self._scores.clear()
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __repr__(self) -> str:
+        return (f"{self.__class__.__name__}(size={len(self)}/{self.maxsize}, hits={self.hits}, "
+                f"misses={self.misses}, hit_rate={self.hit_rate:.2%})")
@@ -2,11 +2,17 @@
 Caesar encrypted text analysis
 """
 import logging
+from time import perf_counter
 from typing import Union, Set
 
+import numpy as np
+
 from crypto.algo.caesar import CaesarCipher
 from crypto.analysis.base import BaseAnalyzer, AnalyzerResult
-from crypto.analysis.language.frequency import Language, coincidence_index
+from crypto.analysis.language.frequency import Language
+from crypto.analysis.metrics import AnalyzerMetrics
+from crypto.analysis.language.table import lookup_codes, symbol_lookup
+from crypto.utils import to_codepoints
 
 
 logger = logging.getLogger(__name__)
@@ -14,20 +20,61 @@ logger = logging.getLogger(__name__)
 
 class CaesarAnalyzer(BaseAnalyzer):
 
-    def __init__(self, language: Language):
+    def __init__(self, language: Language, metrics: AnalyzerMetrics = None):
         self.language = language
+        self.metrics = metrics
         self.caesar_cipher = CaesarCipher(language.alphabet)
+        alphabet = self.caesar_cipher.alphabet
+        self._lookup = symbol_lookup(alphabet)
+        # candidate keys in the order of language monograms and their shifts
+        self._keys = list(language[1])
+        self._shifts = np.array([alphabet.find(char.upper()) for char in self._keys], dtype=np.int64)
+        # coincidence_index of a decrypted text is sum(count * weight) / sum(count * length) over its symbols,
+        # where weight and length are language frequency and length of a mapped symbol
+        coef = 0.01 if language.percentage else 1
+        weights, lengths = [], []
+        for symbol in alphabet:
+            for from_char, to_char in (language.mapping or {}).items():
+                symbol = symbol.replace(from_char, to_char)
+            weights.append(coef * sum(language[1][char] for char in symbol))
+            lengths.append(len(symbol))
+        self._weights = np.array(weights, dtype=np.float64)
+        self._lengths = np.array(lengths, dtype=np.float64)
 
     def decrypt(self, crypttext: str, key: Union[int, str], algorithm: str = None, **kwargs) -> str:
         return self.caesar_cipher.decrypt(crypttext, key=key)
 
+    def scores(self, crypttext: str) -> np.ndarray:
+        """
+        Coincidence index of the text decrypted with every key (in the order of language monograms).
+
+        Letters are counted once: decrypting with a shift k just rolls the counts by k,
+        so all scores are a product of the matrix of rolled counts with monogram frequencies.
+        """
+        codes = lookup_codes(to_codepoints(crypttext), self._lookup)
+        if np.any(codes < 0):
+            raise RuntimeError(f"Character '{crypttext[int(np.argmax(codes < 0))]}' is not in the alphabet")
+        size = len(self.caesar_cipher.alphabet)
+        counts = np.bincount(codes, minlength=size).astype(np.float64)
+        # decrypted symbol j comes from the encrypted symbol (j + k) mod size
+        rolled = counts[(np.arange(size)[None, :] + self._shifts[:, None]) % size]
+        lengths = rolled @ self._lengths
+        return np.divide(rolled @ self._weights, lengths, out=np.zeros(len(self._shifts)), where=lengths > 0)
+
     def fit(self, crypttext: str, **kwargs) -> AnalyzerResult:
         crypttext = crypttext.upper()
         best_keys: Set[str] = set()
         best_score = None
 
-        for char in self.language[1]:
-            score = coincidence_index(self.caesar_cipher.decrypt(crypttext, char), language=self.language)
+        if self.metrics is not None:
+            self.metrics.start()
+        started = perf_counter() if self.metrics is not None else 0.0
+        scores = self.scores(crypttext).tolist()
+        if self.metrics is not None:
+            self.metrics.scores += len(scores)
+            self.metrics.scoring_time += perf_counter() - started
+
+        for char, score in zip(self._keys, scores):
             logger.debug(f"Key {char} has coincidence score {score:.3f}")
 
             if best_score is None or score > best_score:
@@ -36,4 +83,4 @@ class CaesarAnalyzer(BaseAnalyzer):
                 best_keys = {char}
             elif abs(score - best_score) < 0.001:
                 best_keys.add(char)
-        return AnalyzerResult(best_keys, best_score=best_score, score_is_loss=False)
+        return AnalyzerResult(best_keys, best_score=best_score, score_is_loss=False, metrics=self.metrics)
@@ -0,0 +1,77 @@
+"""
+Checkpoints of long analyzer runs
+"""
+import json
+import random
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from crypto.utils import write_atomic
+
+
+@dataclass
+class FitCheckpoint:
+    """
+    Search state of HillClimbingAnalyzer.fit after a number of completed phases
+    """
+    phase: int
+    """
+    Number of completed phases
+    """
+    best_keys: List[Any]
+    best_loss: float
+    ngrams: int
+    seed: Optional[int] = None
+    found: List[Any] = field(default_factory=list)
+    """
+    Keys found by phases, verified at the end of fit with column adjacency
+    """
+    random_states: Dict[str, Any] = field(default_factory=dict)
+    """
+    States of random generators (of the key generator and of the analyzer) after the completed phases
+    """
+    cache: Optional[List[Tuple[int, Any, float]]] = None
+    """
+    Entries of the score cache (see ScoreCache.items), if they are stored
+    """
+    crypttext: Optional[str] = None
+    """
+    Digest of the crypttext (see HillClimbingAnalyzer.crypttext_digest)
+    """
+    key_argname: Optional[str] = None
+    loss_fn: Optional[str] = None
+    """
+    Qualified name of the loss function
+    """
+    initial_key: Optional[Any] = None
+    generator: Optional[Dict[str, Any]] = None
+    """
+    Constraints of keys produced by the key generator (see BaseKeyGenerator.constraints)
+    """
+
+    def save(self, path: Path):
+        """
+        Writes the checkpoint as JSON, the file is replaced at once
+        """
+        write_atomic(path, lambda f: f.write(json.dumps(asdict(self)).encode()))
+
+    @classmethod
+    def load(cls, path: Path) -> 'FitCheckpoint':
+        return cls(**json.loads(path.read_text()))
+
+
+def random_state(generator: random.Random) -> List[Any]:
+    """
+    JSON serializable state of a random generator
+    """
+    version, internal, gauss_next = generator.getstate()
+    return [version, list(internal), gauss_next]
+
+
+def set_random_state(generator: random.Random, state: List[Any]):
+    """
+    Restores a state of a random generator produced by random_state
+    """
+    version, internal, gauss_next = state
+    generator.setstate((version, tuple(internal), gauss_next))
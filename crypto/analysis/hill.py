@@ -1,10 +1,21 @@
-from logging import getLogger
-from typing import Callable, Any, Dict
+import hashlib
+import json
+from concurrent.futures import ProcessPoolExecutor
+from logging import INFO, getLogger
+from pathlib import Path
+from time import perf_counter
+from typing import Callable, Any, Dict, Iterator, List, Optional, Tuple
 
 from crypto.algo.base import Cipher
+from crypto.analysis.adjacency import ColumnAdjacency
 from crypto.analysis.base import AnalyzerResult, BaseAnalyzer, BaseKeyGenerator
+from crypto.analysis.cache import ScoreCache
+from crypto.analysis.checkpoint import FitCheckpoint
+from crypto.analysis.metrics import AnalyzerMetrics
 from crypto.analysis.language.frequency import GramStat, Language, ngram_fitness
-from crypto.analysis.language.utils import log_loss
+from crypto.analysis.language.incremental import IncrementalScorer
+from crypto.analysis.language.utils import TABLE_LOSSES, fast_ngram_fitness, fast_ngram_fitness_batch, log_loss
+from crypto.utils import swap_elements
 
 import numpy as np
 
@@ -15,21 +26,63 @@ class HillClimbingAnalyzer(BaseAnalyzer):
 
     def __init__(self, cipher: Cipher, key_generator: BaseKeyGenerator, key_argname: str,
                  language: Language, loss_fn: Callable[[GramStat, GramStat], float] = log_loss,
-                 decrypt_kwargs: Dict[str, Any] = None):
+                 decrypt_kwargs: Dict[str, Any] = None, vectorized: bool = False, delta: bool = False,
+                 batch_size: int = None, best_improvement: bool = False, cache_size: int = None,
+                 metrics: AnalyzerMetrics = None, adjacency: int = None):
+        """
+        :param vectorized:  Score candidates with fast_ngram_fitness over integer-indexed language tables
+                            instead of building a GramStat for every decrypted text. Ciphers implementing
+                            decrypt_codes decrypt the encoded crypttext directly, without producing text.
+        :param delta:       Score swapped keys incrementally: only n-grams touching swapped positions
+                            are rescored. Requires cipher implementing swap_positions
+                            and key generator implementing swaps.
+        :param batch_size:  Score swapped keys in batches of this size: the whole batch is decrypted with
+                            one gather and scored with one vectorized lookup. Requires key generator implementing
+                            neighbourhood. Rounds stop at the first batch with an improvement.
+        :param best_improvement:  With batches, move to the best key of the whole neighbourhood
+                                  instead of the first improving one.
+        :param cache_size:  Memoize losses of this many most recently scored keys (per crypttext),
+                            so that keys visited again are not decrypted and scored again
+        :param metrics:     Collect counters and timings of runs into this object (returned with results)
+        :param adjacency:   Search with costs of column adjacency of this n-gram order (2 or 3, see ColumnAdjacency)
+                            instead of the loss, keys found by phases are verified with the loss at the end of fit.
+                            Requires column keys (k2) of DoubleTranspositionCipher.
+        """
         self.cipher = cipher
         self.key_generator = key_generator
         self.loss_fn = loss_fn
         self.language = language
         self.decrypt_kwargs = decrypt_kwargs or {}
         self.key_argname = key_argname
+        self.vectorized = vectorized
+        self.delta = delta
+        self.batch_size = batch_size
+        self.best_improvement = best_improvement
+        self._encoded: Tuple[Any, Optional[np.ndarray]] = (None, None)
+        self.cache = ScoreCache(cache_size) if cache_size else None
+        self._cached_crypttext: Any = None
+        self.metrics = metrics
+        if adjacency is not None and key_argname != "k2":
+            raise ValueError(f"Column adjacency requires column keys (k2), got {key_argname}")
+        if adjacency is not None and delta:
+            raise ValueError("Column adjacency costs are not scored incrementally")
+        self.adjacency = adjacency
+        self._adjacency: Tuple[Any, Optional[ColumnAdjacency]] = (None, None)
+        self.evaluations = 0
+        """
+        Number of candidate keys scored by this analyzer (in this process)
+        """
 
     def hill_climbing_round(self, crypttext: Any, current_key: Any, current_loss: float, n: int):
+        if self.batch_size:
+            return self.batch_hill_climbing_round(crypttext, current_key, current_loss=current_loss, n=n)
+        if self.delta:
+            return self.delta_hill_climbing_round(crypttext, current_key, current_loss=current_loss, n=n)
         best_loss = current_loss
         max_iters = len(current_key) * (len(current_key) - 1)
         for idx, key in enumerate(self.key_generator.hill_climbing(current_key)):
             logger.debug(f"[{idx + 1}/{max_iters}] Trying swapped key {key}...")
-            data = self.decrypt(crypttext, key=key)
-            _, loss = ngram_fitness(data, n=n, language=self.language, loss=self.loss_fn)
+            loss = self.score(crypttext, key=key, n=n)
             logger.debug(f"Loss: {loss:.3f}, best: {best_loss:.3f}")
             if loss < best_loss:
                 logger.debug(f"Found better key: {key} with loss {loss:.3f}!")
@@ -37,14 +90,175 @@ class HillClimbingAnalyzer(BaseAnalyzer):
         logger.debug(f"Did not found any better key for {current_key}!")
         return None, None
 
+    def delta_hill_climbing_round(self, crypttext: Any, current_key: Any, current_loss: float, n: int):
+        """
+        Same as hill_climbing_round, but each swapped key is scored by rescoring
+        only n-grams affected by the swap of current key decryption.
+        """
+        scorer = IncrementalScorer(self.language.table(n), self.decrypt_codes(crypttext, current_key),
+                                   loss=self.loss_fn)
+        for swap in self.key_generator.swaps(current_key):
+            left, right = self.cipher.swap_positions(crypttext, swap=swap, key_argname=self.key_argname)
+            positions = np.concatenate((left, right))
+            values = scorer.codes[np.concatenate((right, left))]
+            self.proposed()
+            if scorer.propose(positions, values) < current_loss:
+                key = swap_elements(current_key, swap=swap)
+                loss = self.score(crypttext, key=key, n=n)
+                if loss < current_loss:
+                    logger.debug(f"Found better key: {key} with loss {loss:.3f}!")
+                    return key, loss
+        logger.debug(f"Did not found any better key for {current_key}!")
+        return None, None
+
+    def batch_hill_climbing_round(self, crypttext: Any, current_key: Any, current_loss: float, n: int):
+        """
+        Same as hill_climbing_round, but swapped keys are decrypted and scored in batches
+        """
+        keys = self.key_generator.neighbourhood(current_key)
+        if len(keys) == 0:
+            return None, None
+        batch_size = len(keys) if self.best_improvement else self.batch_size
+        for start in range(0, len(keys), batch_size):
+            losses = self.score_batch(crypttext, keys[start:start + batch_size], n=n)
+            candidates = np.flatnonzero(losses < current_loss)
+            if self.best_improvement:
+                candidates = candidates[np.argsort(losses[candidates], kind="stable")]
+            for idx in candidates:
+                key = keys[start + idx].tolist()
+                loss = self.score(crypttext, key=key, n=n)
+                if loss < current_loss:
+                    logger.debug(f"Found better key: {key} with loss {loss:.3f}!")
+                    return key, loss
+        logger.debug(f"Did not found any better key for {current_key}!")
+        return None, None
+
+    def score_batch(self, crypttext: Any, keys: np.ndarray, n: int) -> np.ndarray:
+        """
+        Losses of a text decrypted with every key of a batch
+        """
+        if self.adjacency is not None:
+            self.proposed(len(keys))
+            return self.column_adjacency(crypttext, self.adjacency).cost_batch(keys)
+        started = perf_counter() if self.metrics is not None else 0.0
+        codes = self.cipher.decrypt_codes_batch(self.encode(crypttext), self.key_argname, keys,
+                                                **(self.decrypt_kwargs or {}))
+        decrypted = perf_counter() if self.metrics is not None else 0.0
+        losses = fast_ngram_fitness_batch(codes, n=n, language=self.language, loss=self.loss_fn)
+        self.evaluations += len(keys)
+        if self.metrics is not None:
+            self.metrics.decrypts += len(keys)
+            self.metrics.scores += len(keys)
+            self.metrics.cipher_time += decrypted - started
+            self.metrics.scoring_time += perf_counter() - decrypted
+        return losses
+
+    def proposed(self, count: int = 1):
+        """
+        Counts candidate keys scored outside of score and score_batch (i.e. incrementally)
+        """
+        self.evaluations += count
+        if self.metrics is not None:
+            self.metrics.scores += count
+
     def decrypt(self, crypttext: Any, key: Any, algorithm: str = None, **kwargs) -> str:
         data = self.cipher.decrypt(crypttext, **{self.key_argname: key}, **(self.decrypt_kwargs or {}))
         return self.cipher.to_text(data)
 
+    def clear_caches(self):
+        """
+        Forgets data computed from crypttexts: encoded crypttext, column adjacency and cached scores.
+        They are matched to crypttexts by identity (crypttexts are treated as immutable),
+        so a crypttext edited in place needs this call before scoring it again. fit calls it at the start.
+        """
+        self._encoded = (None, None)
+        self._adjacency = (None, None)
+        self._cached_crypttext = None
+        if self.cache is not None:
+            self.cache.clear()
+
+    def encode(self, crypttext: Any) -> np.ndarray:
+        """
+        Crypttext encoded with language symbol codes (computed once per crypttext, see clear_caches)
+        """
+        if self._encoded[0] is not crypttext:
+            self._encoded = crypttext, self.cipher.to_codes(crypttext, self.language.encode)
+        return self._encoded[1]
+
+    def decrypt_codes(self, crypttext: Any, key: Any) -> np.ndarray:
+        """
+        Decrypted text encoded with language symbol codes
+        """
+        try:
+            return self.cipher.decrypt_codes(self.encode(crypttext), **{self.key_argname: key},
+                                             **(self.decrypt_kwargs or {}))
+        except NotImplementedError:
+            return self.language.encode(self.decrypt(crypttext, key))
+
+    def column_adjacency(self, crypttext: Any, order: int) -> ColumnAdjacency:
+        """
+        Column adjacency of a crypttext (computed once per crypttext and order, see clear_caches)
+        """
+        crypttext_, adjacency = self._adjacency
+        if crypttext_ is not crypttext or adjacency.n != order:
+            adjacency = ColumnAdjacency.from_crypttext(crypttext, self.language, order=order,
+                                                       k1=self.decrypt_kwargs.get("k1"))
+            self._adjacency = crypttext, adjacency
+        return adjacency
+
+    def score(self, crypttext: Any, key: Any, n: int) -> float:
+        """
+        Loss of a text decrypted with a key
+        """
+        if self.metrics is not None:
+            self.metrics.scores += 1
+        if self.cache is None:
+            return self._score(crypttext, key, n=n)
+        if self._cached_crypttext is not crypttext:
+            self.cache.clear()
+            self._cached_crypttext = crypttext
+        loss = self.cache.get(key, n=n)
+        if loss is None:
+            loss = self._score(crypttext, key, n=n)
+            self.cache.put(key, n=n, loss=loss)
+        elif self.metrics is not None:
+            self.metrics.cache_hits += 1
+        return loss
+
+    def _score(self, crypttext: Any, key: Any, n: int) -> float:
+        self.evaluations += 1
+        if self.adjacency is not None:
+            return self.column_adjacency(crypttext, self.adjacency).cost(key)
+        return self.full_score(crypttext, key, n=n)
+
+    def full_score(self, crypttext: Any, key: Any, n: int) -> float:
+        """
+        Loss of a text decrypted with a key, never replaced by column adjacency costs and not cached
+        """
+        vectorized = self.vectorized and self.loss_fn in TABLE_LOSSES
+        if self.metrics is None:
+            return self._loss(self._decrypt_for_scoring(crypttext, key, vectorized), n=n, vectorized=vectorized)
+        started = perf_counter()
+        decrypted = self._decrypt_for_scoring(crypttext, key, vectorized)
+        decrypted_at = perf_counter()
+        loss = self._loss(decrypted, n=n, vectorized=vectorized)
+        self.metrics.decrypts += 1
+        self.metrics.cipher_time += decrypted_at - started
+        self.metrics.scoring_time += perf_counter() - decrypted_at
+        return loss
+
+    def _decrypt_for_scoring(self, crypttext: Any, key: Any, vectorized: bool) -> Any:
+        return self.decrypt_codes(crypttext, key) if vectorized else self.decrypt(crypttext, key=key)
+
+    def _loss(self, decrypted: Any, n: int, vectorized: bool) -> float:
+        if vectorized:
+            return fast_ngram_fitness(decrypted, n=n, language=self.language, loss=self.loss_fn)
+        _, loss = ngram_fitness(decrypted, n=n, language=self.language, loss=self.loss_fn)
+        return loss
+
     def hill_climbing_phase(self, crypttext: Any, starting_key: Any, n: int, starting_loss: float = None):
         if starting_loss is None:
-            _, starting_loss = ngram_fitness(self.decrypt(crypttext, starting_key), n=n,
-                                             language=self.language, loss=self.loss_fn)
+            starting_loss = self.score(crypttext, starting_key, n=n)
         improved_key = current_key = starting_key
         current_loss = starting_loss
         while improved_key is not None:
@@ -54,34 +268,222 @@ class HillClimbingAnalyzer(BaseAnalyzer):
             logger.debug(f"Improved key: {improved_key} ({improved_loss})")
             if improved_key is not None:
                 current_key, current_loss = improved_key, improved_loss
+                if self.metrics is not None:
+                    self.metrics.improvements += 1
         logger.debug(f"[STOP] best key: {current_key}, best loss {current_loss:.3f} "
                      f"(improved? {current_key != starting_key})")
         return current_key, current_loss
 
-    def fit(self, crypttext: Any, ngrams: int = 3, phases: int = 100, **kwargs) -> AnalyzerResult:
-        starting_key = self.key_generator.initial_key
-        _, starting_loss = ngram_fitness(self.decrypt(crypttext, starting_key), n=ngrams,
-                                         language=self.language, loss=self.loss_fn)
-        best_keys, best_loss = [starting_key], starting_loss
-        current_key, current_loss = starting_key, starting_loss
-        # needed to produce new key
-        for phase in range(phases):
-            if (phase + 1) % int(0.05 * phases) == 0:
+    def search_phase(self, crypttext: Any, starting_key: Any, n: int, starting_loss: float = None):
+        """
+        One phase of fit starting from a key: hill climbing here, other search strategies override it
+        """
+        return self.hill_climbing_phase(crypttext, starting_key, n=n, starting_loss=starting_loss)
+
+    @staticmethod
+    def phase_seeds(seed: Optional[int], phases: int) -> List[int]:
+        """
+        Independent seeds of random generators for each phase derived from a master seed
+        (from OS entropy without it), deterministic for the same master seed
+        """
+        return [int(child.generate_state(1)[0]) for child in np.random.SeedSequence(seed).spawn(phases)]
+
+    def seed(self, seed: int):
+        """
+        Seeds random generators of the analyzer with the master seed of fit
+        (key generator is seeded with phase seeds at restarts)
+        """
+
+    def random_states(self) -> Dict[str, Any]:
+        """
+        JSON serializable states of random generators used by phases (stored in checkpoints)
+        """
+        return {"key_generator": self.key_generator.get_state()}
+
+    def set_random_states(self, states: Dict[str, Any]):
+        self.key_generator.set_state(states["key_generator"])
+
+    def crypttext_digest(self, crypttext: Any) -> str:
+        """
+        Digest of the encoded crypttext and its shape (stored in checkpoints)
+        """
+        codes = np.ascontiguousarray(self.encode(crypttext), dtype=np.int64)
+        return hashlib.sha256(f"{codes.shape}".encode() + codes.tobytes()).hexdigest()
+
+    def checkpoint_parameters(self, crypttext: Any, ngrams: int, seed: Optional[int]) -> Dict[str, Any]:
+        """
+        Parameters of a run stored in checkpoints, a checkpoint is resumed only by a run with the same ones
+        """
+        parameters = {
+            "ngrams": ngrams,
+            "seed": seed,
+            "crypttext": self.crypttext_digest(crypttext),
+            "key_argname": self.key_argname,
+            "loss_fn": f"{self.loss_fn.__module__}.{self.loss_fn.__qualname__}",
+            "initial_key": self.key_generator.initial_key,
+            "generator": self.key_generator.constraints(),
+        }
+        # the same values as loaded from the checkpoint JSON
+        return json.loads(json.dumps(parameters, default=lambda value: value.tolist()))
+
+    def restart_key(self, seed: Optional[int]) -> Any:
+        if seed is not None:
+            self.key_generator.seed(seed)
+        return next(self.key_generator)
+
+    def fit(self, crypttext: Any, ngrams: int = 3, phases: int = 100, workers: int = None,
+            seed: int = None, checkpoint: Path = None, checkpoint_interval: float = 60.0,
+            checkpoint_cache: bool = False, resume: bool = False, time_limit: float = None,
+            **kwargs) -> AnalyzerResult:
+        """
+        :param phases:      Number of hill climbing phases: first one starts from the initial key,
+                            others from random keys produced by the key generator
+        :param workers:     Run phases in a pool of this many processes
+        :param seed:        Master seed of random restarts. Results with the same seed do not depend on workers.
+                            Without it, the seed is drawn from OS entropy (resumed runs use the seed of the checkpoint).
+        :param checkpoint:  Write the search state (see FitCheckpoint) to this file after phases,
+                            at most every checkpoint_interval seconds, and at the end of the run
+        :param checkpoint_cache:  Store entries of the score cache in checkpoints too
+        :param resume:      Continue from the state of the checkpoint file (if it exists) with the same
+                            results as an uninterrupted run. Phases could be increased to extend a finished run.
+                            The run has to match the checkpoint (see checkpoint_parameters), otherwise
+                            ValueError is raised.
+        :param time_limit:  Stop after the phase finishing later than this many seconds after the start,
+                            a long search is split into time-boxed runs with checkpoint and resume
+        """
+        self.clear_caches()
+        if self.metrics is not None:
+            self.metrics.start()
+        started = perf_counter()
+        state = FitCheckpoint.load(checkpoint) if resume and checkpoint is not None and checkpoint.exists() else None
+        if seed is None:
+            # the master seed of an unseeded run is drawn from OS entropy once and stored in checkpoints
+            seed = state.seed if state is not None and state.seed is not None else np.random.SeedSequence().entropy
+            logger.info(f"Master seed: {seed}")
+        self.seed(seed)
+        parameters = self.checkpoint_parameters(crypttext, ngrams, seed) if checkpoint is not None else {}
+        if state is not None:
+            differences = [name for name, value in parameters.items() if getattr(state, name) != value]
+            if differences:
+                raise ValueError(f"Checkpoint {str(checkpoint)} was written by a run with other "
+                                 f"{', '.join(differences)}, could not resume it")
+            logger.info(f"Resuming after phase {state.phase} from {str(checkpoint)}: "
+                        f"{state.best_keys} ({state.best_loss:.3f})")
+            self.set_random_states(state.random_states)
+            if self.cache is not None and state.cache is not None:
+                # cached losses belong to this crypttext: its digest matches the checkpoint
+                self.cache.clear()
+                self._cached_crypttext = crypttext
+                for n, key, loss in state.cache:
+                    self.cache.put(key, n=n, loss=loss)
+            first_phase, best_keys, best_loss, found = state.phase, state.best_keys, state.best_loss, state.found
+            starting_loss = None
+        else:
+            starting_key = self.key_generator.initial_key
+            starting_loss = self.score(crypttext, starting_key, n=ngrams)
+            first_phase, best_keys, best_loss, found = 0, [starting_key], starting_loss, [starting_key]
+        seeds = self.phase_seeds(seed, phases)
+        # decrypted text of the last best key for progress logging, decrypted again only when best keys change
+        decoded = None
+        written = perf_counter()
+        phase_results = self._phases(crypttext, ngrams, starting_loss, seeds, workers, first_phase=first_phase)
+        for phase, (new_key, new_loss) in enumerate(phase_results, start=first_phase):
+            if self.adjacency is not None:
+                found.append(new_key)
+            if (phase + 1) % max(1, int(0.05 * phases)) == 0:
                 logger.info(f"Phase [{phase + 1}/{phases} {100 * (phase + 1) / phases:.2f}%]...")
-                logger.info(f"Decoded so far: '{self.decrypt(crypttext, best_keys[-1])}' ({best_loss:.3f})")
-            # logger.debug(f"Trying key {current_key}...")
-            new_key, new_loss = self.hill_climbing_phase(crypttext, current_key, starting_loss=current_loss, n=ngrams)
+                if logger.isEnabledFor(INFO):
+                    if decoded is None:
+                        decoded = self.decrypt(crypttext, best_keys[-1])
+                    logger.info(f"Decoded so far: '{decoded}' ({best_loss:.3f})")
             if new_loss < best_loss:
                 logger.info(f"[GREAT SUCCESS] Best key is updated: {new_key} ({new_loss:.3f})")
                 best_keys, best_loss = [new_key], new_loss
-            elif np.equal(new_loss, best_loss):
+                decoded = None
+            elif np.equal(new_loss, best_loss) and new_key not in best_keys:
                 logger.info(f"[SUCCESS] Best key is added: {new_key} ({new_loss:.3f})")
                 best_keys.append(new_key)
+                decoded = None
+            if self.metrics is not None:
+                self.metrics.report()
+            timed_out = time_limit is not None and perf_counter() - started >= time_limit
+            if checkpoint is not None and (perf_counter() - written >= checkpoint_interval
+                                           or phase + 1 == phases or timed_out):
+                # random generators are in the state after this phase: the next restart key is not drawn yet
+                FitCheckpoint(phase + 1, best_keys, best_loss, found=found, random_states=self.random_states(),
+                              cache=self.cache.items() if checkpoint_cache and self.cache is not None else None,
+                              **parameters).save(checkpoint)
+                written = perf_counter()
+            if timed_out and phase + 1 < phases:
+                logger.info(f"Time limit of {time_limit}s is reached after phase {phase + 1}/{phases}")
+                break
+        if self.adjacency is not None:
+            best_keys, best_loss = self.verify(crypttext, found, n=ngrams)
+        logger.info(f"[END] Keys: {best_keys} Best loss: {best_loss}"
+                    + (f" Cache: {self.cache}" if self.cache is not None else "")
+                    + (f" Metrics: {self.metrics.as_dict()}" if self.metrics is not None else ""))
+        if self.metrics is not None:
+            self.metrics.report(force=True)
+        return AnalyzerResult(best_keys, best_score=best_loss, score_is_loss=True, metrics=self.metrics)
+
+    def verify(self, crypttext: Any, keys: List[Any], n: int) -> Tuple[List[Any], float]:
+        """
+        Keys with the best loss (full_score) among candidate keys
+        """
+        best_keys, best_loss = [], np.inf
+        for key in dict.fromkeys(map(tuple, keys)):
+            loss = self.full_score(crypttext, list(key), n=n)
+            if loss < best_loss:
+                best_keys, best_loss = [list(key)], loss
+            elif np.equal(loss, best_loss):
+                best_keys.append(list(key))
+        logger.info(f"Verified {len(best_keys)} best of {len(keys)} keys: {best_keys} ({best_loss:.3f})")
+        return best_keys, best_loss
+
+    def _phases(self, crypttext: Any, ngrams: int, starting_loss: Optional[float], seeds: List[Optional[int]],
+                workers: Optional[int], first_phase: int = 0) -> Iterator[Tuple[Any, float]]:
+        # results of hill climbing phases in order from first_phase: phase 0 starts with the initial key
+        if first_phase >= len(seeds):
+            return
+        if first_phase == 0:
+            yield self.search_phase(crypttext, self.key_generator.initial_key, starting_loss=starting_loss, n=ngrams)
+        restarts = seeds[max(first_phase, 1):]
+        if workers is None or workers <= 1:
+            for seed in restarts:
+                current_key = self.restart_key(seed)
+                current_loss = self.score(crypttext, current_key, n=ngrams)
+                logger.debug(f"Generated new key: {current_key} ({current_loss:.3f})")
+                if self.metrics is not None:
+                    self.metrics.restarts += 1
+                yield self.search_phase(crypttext, current_key, starting_loss=current_loss, n=ngrams)
+            return
+        # analyzer (with language tables) is sent to every worker once, tasks are just seeds
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(self, crypttext, ngrams)) as executor:
+            try:
+                for key, loss, metrics in executor.map(_restart_phase, restarts,
+                                                       chunksize=max(1, len(seeds) // (4 * workers))):
+                    if metrics is not None:
+                        self.metrics.merge(metrics)
+                    yield key, loss
+            finally:
+                # phases not started yet are dropped when fit stops early (time limit)
+                executor.shutdown(cancel_futures=True)
+
+
+_worker_state: Optional[Tuple[HillClimbingAnalyzer, Any, int]] = None
+
+
+def _init_worker(analyzer: HillClimbingAnalyzer, crypttext: Any, ngrams: int):
+    global _worker_state
+    _worker_state = analyzer, crypttext, ngrams
+
 
-            # produce new key
-            current_key = next(self.key_generator)
-            _, current_loss = ngram_fitness(self.decrypt(crypttext, current_key), n=ngrams,
-                                            language=self.language, loss=self.loss_fn)
-            logger.debug(f"Generated new key: {current_key} ({current_loss:.3f})")
-        logger.info(f"[END] Keys: {best_keys} Best loss: {best_loss}")
-        return AnalyzerResult(best_keys, best_score=best_loss, score_is_loss=True)
+def _restart_phase(seed: int) -> Tuple[Any, float, Optional[AnalyzerMetrics]]:
+    analyzer, crypttext, ngrams = _worker_state
+    if analyzer.metrics is not None:
+        # counters of this phase only, they are merged into metrics of the main process
+        analyzer.metrics = AnalyzerMetrics(restarts=1)
+    key = analyzer.restart_key(seed)
+    key, loss = analyzer.search_phase(crypttext, key, n=ngrams)
+    return key, loss, analyzer.metrics.snapshot() if analyzer.metrics is not None else None
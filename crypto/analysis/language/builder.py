@@ -0,0 +1,170 @@
+"""
+Streaming builder of n-gram statistics from text corpora.
+
+Corpora are read in chunks, normalized with a language mapping, filtered to the alphabet
+and encoded as integers. Counts of every order are kept in dense integer arrays indexed
+like NGramTable, so memory does not depend on the size of a corpus.
+"""
+import json
+from concurrent.futures import ProcessPoolExecutor
+from logging import getLogger
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Sequence, Union
+
+import numpy as np
+
+from .table import DENSE_TABLE_LIMIT, lookup_codes, symbol_lookup
+from crypto.utils import to_codepoints
+
+logger = getLogger(__name__)
+
+CHUNK_SIZE = 1 << 24
+"""
+Number of characters read from a corpus at once
+"""
+
+
+class NGramCounter:
+    """
+    Counts of n-grams of orders 1..max_n over an alphabet.
+
+    Text is fed in chunks: the last ``max_n - 1`` symbols of a chunk are carried over,
+    so n-grams across chunk boundaries are counted exactly once.
+    Characters outside of the alphabet (after mapping) are dropped.
+
+    :param alphabet:  Symbols to count
+    :param max_n:     Maximal n-gram order
+    :param mapping:   Replacements applied to text before filtering (i.e. Language.mapping)
+    :param upper:     Upper-case text before mapping
+    """
+
+    def __init__(self, alphabet: Union[str, Sequence[str]], max_n: int = 4, mapping: Dict[str, str] = None,
+                 upper: bool = True):
+        self.alphabet = "".join(alphabet)
+        if len(self.alphabet) ** max_n > DENSE_TABLE_LIMIT:
+            raise ValueError(f"Too many symbols ({len(self.alphabet)}) to count {max_n}-grams")
+        self.max_n = max_n
+        self.mapping = mapping
+        self.upper = upper
+        self.counts = {n: np.zeros(len(self.alphabet) ** n, dtype=np.int64) for n in range(1, max_n + 1)}
+        self._lookup = symbol_lookup(self.alphabet)
+        self._carry = np.zeros(0, dtype=np.int64)
+
+    def update(self, text: str):
+        """
+        Counts n-grams of the next chunk of a text
+        """
+        if self.upper:
+            text = text.upper()
+        if self.mapping:
+            for from_char, to_char in self.mapping.items():
+                text = text.replace(from_char, to_char)
+        codes = lookup_codes(to_codepoints(text), self._lookup)
+        codes = np.concatenate((self._carry, codes[codes >= 0]))
+        for n, counts in self.counts.items():
+            # windows lying entirely in the carried over symbols were counted with the previous chunk
+            start = max(len(self._carry) - n + 1, 0)
+            width = len(codes) - n + 1 - start
+            if width <= 0:
+                continue
+            indices = codes[start:start + width].copy()
+            for i in range(1, n):
+                indices *= len(self.alphabet)
+                indices += codes[start + i:start + i + width]
+            counts += np.bincount(indices, minlength=len(counts))
+        self._carry = codes[max(len(codes) - self.max_n + 1, 0):]
+
+    def reset(self):
+        """
+        Ends the current text: n-grams of the next update do not continue it
+        """
+        self._carry = self._carry[:0]
+
+    def merge(self, other: 'NGramCounter') -> 'NGramCounter':
+        for n, counts in other.counts.items():
+            self.counts[n] += counts
+        return self
+
+    def ngrams(self, n: int) -> Dict[str, int]:
+        """
+        Counted n-grams of order n sorted by count (most frequent first)
+        """
+        counts = self.counts[n]
+        indices = np.flatnonzero(counts)
+        indices = indices[np.argsort(-counts[indices], kind="stable")]
+        digits = indices[:, None] // len(self.alphabet) ** np.arange(n - 1, -1, -1) % len(self.alphabet)
+        symbols = np.array(list(self.alphabet))
+        return {"".join(gram): int(count) for gram, count in zip(symbols[digits], counts[indices].tolist())}
+
+    @property
+    def coincidence(self) -> float:
+        """
+        Index of coincidence of counted text: sum(p^2) of monograms
+        """
+        counts = self.counts[1]
+        total = counts.sum()
+        return float(np.sum((counts / total) ** 2)) if total else 0.0
+
+    def count_file(self, path: Path, encoding: str = None, chunk_size: int = CHUNK_SIZE) -> 'NGramCounter':
+        for chunk in read_chunks(path, encoding=encoding, chunk_size=chunk_size):
+            self.update(chunk)
+        self.reset()
+        return self
+
+
+def read_chunks(path: Path, encoding: str = None, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    with path.open(encoding=encoding) as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+def _count_shard(path: Path, alphabet: str, max_n: int, mapping: Dict[str, str], upper: bool,
+                 encoding: str, chunk_size: int) -> Dict[int, np.ndarray]:
+    counter = NGramCounter(alphabet, max_n=max_n, mapping=mapping, upper=upper)
+    return counter.count_file(path, encoding=encoding, chunk_size=chunk_size).counts
+
+
+def count_corpus(sources: Iterable[Path], alphabet: Union[str, Sequence[str]], max_n: int = 4,
+                 mapping: Dict[str, str] = None, upper: bool = True, encoding: str = None,
+                 chunk_size: int = CHUNK_SIZE, workers: int = None) -> NGramCounter:
+    """
+    Counts n-grams of corpus files (shards). N-grams do not span different shards.
+
+    :param workers:  Count shards in a pool of this many processes
+    """
+    counter = NGramCounter(alphabet, max_n=max_n, mapping=mapping, upper=upper)
+    sources: List[Path] = list(sources)
+    if workers is None or workers <= 1:
+        for path in sources:
+            logger.info(f"Counting n-grams of {str(path)}...")
+            counter.count_file(path, encoding=encoding, chunk_size=chunk_size)
+        return counter
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_count_shard, path, counter.alphabet, max_n, mapping, upper, encoding, chunk_size)
+                   for path in sources]
+        for path, future in zip(sources, futures):
+            for n, counts in future.result().items():
+                counter.counts[n] += counts
+            logger.info(f"Counted n-grams of {str(path)}")
+    return counter
+
+
+def write_language(counter: NGramCounter, name: str, root: Path, grams: Dict[str, int], encoding: str = None):
+    """
+    Writes '<ngram> <count>' tables ``{name}_{gram}.txt`` and ``{name}.json`` with coincidence index
+
+    :param grams:  Names of n-gram orders (i.e. Language.GRAMS)
+    """
+    root.mkdir(parents=True, exist_ok=True)
+    for gram, n in grams.items():
+        if n > counter.max_n:
+            continue
+        path = root / f"{name}_{gram}.txt"
+        logger.info(f"Writing {gram} to {str(path)}")
+        with path.open("w", encoding=encoding) as f:
+            for ngram, count in counter.ngrams(n).items():
+                f.write(f"{ngram} {count}\n")
+    (root / f"{name}.json").write_text(json.dumps({"coincidence": {"natural": counter.coincidence}}, indent=2))
@@ -0,0 +1,134 @@
+"""
+Precompiled binary n-gram tables.
+
+Text n-gram tables are parsed once and stored next to the source file as a
+``.npy`` artifact, which is memory-mapped on the next load instead of being parsed again.
+Writing an artifact removes stale artifacts of the same source and options (older contents),
+artifacts of other options are kept.
+"""
+import hashlib
+import json
+import os
+import re
+from logging import getLogger
+from pathlib import Path
+from typing import Dict, Iterator, Mapping, Optional, Tuple
+
+import numpy as np
+
+logger = getLogger(__name__)
+
+CACHE_VERSION = 1
+"""
+Bump this every time the layout of a compiled table changes
+"""
+
+
+class CompiledGrams(Mapping):
+    """
+    Read-only n-gram -> frequency mapping backed by a (memory-mapped) structured array.
+
+    Iteration order is the order of the compiled table. String lookups build
+    a dictionary index on first use only, so loading a table costs almost nothing.
+    """
+
+    def __init__(self, table: np.ndarray):
+        self.table = table
+        self._index: Optional[Dict[str, float]] = None
+
+    @property
+    def grams(self) -> np.ndarray:
+        return self.table["gram"]
+
+    @property
+    def frequencies(self) -> np.ndarray:
+        return self.table["frequency"]
+
+    @property
+    def index(self) -> Dict[str, float]:
+        if self._index is None:
+            self._index = dict(zip(self.grams.tolist(), self.frequencies.tolist()))
+        return self._index
+
+    def __getitem__(self, item: str) -> float:
+        return self.index[item]
+
+    def __contains__(self, item: object) -> bool:
+        return item in self.index
+
+    def get(self, item: str, default=None):
+        return self.index.get(item, default)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.grams.tolist())
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def min_item(self) -> Tuple[str, float]:
+        idx = int(np.argmin(self.frequencies))
+        return str(self.grams[idx]), float(self.frequencies[idx])
+
+    def max_item(self) -> Tuple[str, float]:
+        idx = int(np.argmax(self.frequencies))
+        return str(self.grams[idx]), float(self.frequencies[idx])
+
+
+def cache_path(source: Path, encoding: str = None, mapping: Dict[str, str] = None,
+               percentage: bool = True, sort: bool = False) -> Path:
+    """
+    Path of the compiled artifact for a text table and its loading options.
+
+    :param source:  Text table in '<ngram> <count>' format
+    :return:        Path next to the source keyed by the hash of the options and the hash of the file contents
+    """
+    options = hashlib.sha256(json.dumps({
+        "version": CACHE_VERSION,
+        "encoding": encoding,
+        "mapping": sorted((mapping or {}).items()),
+        "percentage": percentage,
+        "sort": sort,
+    }).encode()).hexdigest()[:16]
+    contents = hashlib.sha256(source.read_bytes()).hexdigest()[:16]
+    return source.with_name(f"{source.stem}.{options}.{contents}.npy")
+
+
+def compile_grams(ngrams: Mapping, path: Path) -> CompiledGrams:
+    """
+    Writes n-gram table to a binary artifact (atomically) and returns it memory-mapped.
+    If the artifact cannot be written, an in-memory table is returned instead.
+    """
+    width = max((len(ngram) for ngram in ngrams), default=1)
+    table = np.empty(len(ngrams), dtype=[("gram", f"<U{width}"), ("frequency", "<f8")])
+    table["gram"] = list(ngrams.keys())
+    table["frequency"] = list(ngrams.values())
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        with tmp_path.open("wb") as f:
+            np.save(f, table, allow_pickle=False)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"Cannot write compiled n-gram table {str(path)}: {e}")
+        tmp_path.unlink(missing_ok=True)
+        return CompiledGrams(table)
+    remove_stale(path)
+    return load_grams(path)
+
+
+def remove_stale(path: Path):
+    """
+    Removes artifacts of older contents of the same source with the same options as an artifact
+    (and artifacts of the former single hash naming)
+    """
+    stem, options, _, _ = path.name.rsplit(".", 3)
+    pattern = re.compile(rf"{re.escape(stem)}\.(?:{options}\.)?[0-9a-f]{{16}}\.npy")
+    for sibling in path.parent.glob(f"{stem}.*.npy"):
+        if sibling != path and pattern.fullmatch(sibling.name):
+            try:
+                sibling.unlink()
+            except OSError as e:
+                logger.warning(f"Cannot remove stale compiled n-gram table {str(sibling)}: {e}")
+
+
+def load_grams(path: Path) -> CompiledGrams:
+    return CompiledGrams(np.load(path, mmap_mode="r", allow_pickle=False))
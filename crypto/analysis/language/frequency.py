@@ -1,11 +1,18 @@
 # Loads in the following format from here:
 # http://practicalcryptography.com/cryptanalysis/letter-frequencies-various-languages/
 import json
-from collections import OrderedDict, defaultdict
+from collections import Counter, OrderedDict, defaultdict
 from dataclasses import dataclass, field
 from logging import getLogger
 from pathlib import Path
-from typing import Dict, Tuple, Union, Callable, Iterable, Any, Sequence, Optional
+from typing import Dict, Tuple, Union, Callable, Iterable, Any, List, Sequence, Optional
+
+import numpy as np
+
+from .builder import CHUNK_SIZE, count_corpus, write_language
+from .compiled import CompiledGrams, cache_path, compile_grams, load_grams
+from .table import NGramTable
+from crypto.utils import write_atomic
 
 logger = getLogger(__name__)
 
@@ -17,6 +24,10 @@ class GramStat:
     max_frequency: Tuple[str, float] = field(init=False, default=None)
 
     def __post_init__(self):
+        if isinstance(self.ngrams, CompiledGrams):
+            self.min_frequency = self.ngrams.min_item()
+            self.max_frequency = self.ngrams.max_item()
+            return
         self.min_frequency = min(self.items(), key=lambda x: x[1])
         self.max_frequency = max(self.items(), key=lambda x: x[1])
 
@@ -55,7 +66,25 @@ class GramStat:
 
     @classmethod
     def from_file(cls, path: Path, encoding: str = None, mapping: Dict[str, str] = None,
-                  percentage: bool = True, sort: bool = False) -> 'GramStat':
+                  percentage: bool = True, sort: bool = False, cache: bool = False) -> 'GramStat':
+        """
+        Loads n-gram statistics from a text file with '<ngram> <count>' lines.
+
+        :param cache:  If set, the parsed table is compiled into a binary artifact next to the file
+                       (keyed by file contents and loading options) and memory-mapped on later loads.
+        """
+        if cache:
+            compiled_path = cache_path(path, encoding=encoding, mapping=mapping, percentage=percentage, sort=sort)
+            try:
+                grams = load_grams(compiled_path)
+                logger.debug(f"Loaded compiled table @ {str(compiled_path)}")
+                return cls(grams)
+            except OSError:
+                # missing, or removed as stale by another process after a newer compile
+                pass
+            stat = cls.from_file(path, encoding=encoding, mapping=mapping, percentage=percentage, sort=sort)
+            logger.debug(f"Compiling table to {str(compiled_path)}")
+            return cls(compile_grams(stat.ngrams, compiled_path))
         ngrams = defaultdict(int)
         total_count = 0
         with path.open(encoding=encoding) as f:
@@ -76,12 +105,8 @@ class GramStat:
         if mapping:
             for from_char, to_char in mapping.items():
                 text = text.replace(from_char, to_char)
-        ngrams = zip(*[text[i:] for i in range(n)])
-        ngrams = ["".join(ngram) for ngram in ngrams]
-        counts = defaultdict(int)
-        for ngram in ngrams:
-            counts[ngram] += 1
-        total_count = len(ngrams)
+        counts = Counter(text[i:i + n] for i in range(len(text) - n + 1))
+        total_count = max(len(text) - n + 1, 0)
         return counts, total_count, text
 
     @classmethod
@@ -113,33 +138,177 @@ class Language:
     encoding: str = None
     percentage: bool = True
     sort: bool = True
+    cache: bool = True
+    shared_root: Path = None
+    """
+    Directory with tables published by another process (see publish): they are memory-mapped read-only
+    instead of being built, and are not copied when the language is sent to worker processes
+    """
     language_data: Dict[str, Any] = field(init=False)
     grams: Dict[str, GramStat] = field(init=False)
+    tables: Dict[str, NGramTable] = field(init=False)
     coincidence: IndicesOfCoincidence = field(init=False)
 
     def __post_init__(self):
         """
-        Loads all language statistics
+        Loads language data, n-gram statistics of every order are loaded on first access
         """
         self.grams = {}
+        self.tables = {}
         logger.debug(f"Loading language data from json file")
         self.language_data = json.loads((self.root / f"{self.name}.json").read_text())
         self.coincidence = IndicesOfCoincidence(**self.language_data["coincidence"])
-        for gram in self.GRAMS:
-            path = self.root / f"{self.name}_{gram}.txt"
-            logger.debug(f"Trying to load gram {gram} @ {str(path)}")
-            self.grams[gram] = GramStat.from_file(path, encoding=self.encoding, mapping=self.mapping,
-                                                  percentage=self.percentage, sort=self.sort)
 
-    def __getitem__(self, ngram: Union[str, int]) -> GramStat:
+    @classmethod
+    def _gram_name(cls, ngram: Union[str, int]) -> str:
         if isinstance(ngram, int):
-            for gram, n in self.GRAMS.items():
+            for gram, n in cls.GRAMS.items():
                 if n == ngram:
-                    ngram = gram
-                    break
-            else:
-                raise KeyError(f"Cannot find ngram '{ngram}' (int value)")
-        return self.grams[ngram]
+                    return gram
+            raise KeyError(f"Cannot find ngram '{ngram}' (int value)")
+        return ngram
+
+    def gram_path(self, ngram: Union[str, int]) -> Path:
+        return self.root / f"{self.name}_{self._gram_name(ngram)}.txt"
+
+    @property
+    def available_grams(self) -> List[str]:
+        """
+        N-gram orders with statistics available for the language (loaded or present on disk)
+        """
+        return [gram for gram in self.GRAMS if gram in self]
+
+    def __contains__(self, ngram: Union[str, int]) -> bool:
+        try:
+            gram = self._gram_name(ngram)
+        except KeyError:
+            return False
+        return gram in self.GRAMS and (gram in self.grams or self.gram_path(gram).exists())
+
+    def __getitem__(self, ngram: Union[str, int]) -> GramStat:
+        gram = self._gram_name(ngram)
+        if gram not in self.grams:
+            if gram not in self:
+                raise KeyError(f"N-gram statistics '{gram}' are not available for language {self.name} "
+                               f"(available: {self.available_grams})")
+            path = self.gram_path(gram)
+            logger.debug(f"Loading gram {gram} @ {str(path)}")
+            self.grams[gram] = GramStat.from_file(path, encoding=self.encoding, mapping=self.mapping,
+                                                  percentage=self.percentage, sort=self.sort, cache=self.cache)
+        return self.grams[gram]
+
+    def table(self, ngram: Union[str, int]) -> NGramTable:
+        """
+        Integer-indexed table of n-gram frequencies and log-frequencies (built on first access)
+        """
+        gram = self._gram_name(ngram)
+        if gram not in self.tables and self.shared_root is not None:
+            shared = self._shared_table(gram)
+            if shared is not None:
+                self.tables[gram] = shared
+        if gram not in self.tables:
+            stat = self[gram]
+            self.tables[gram] = NGramTable.from_grams(stat.ngrams, n=self.GRAMS[gram], symbols=self.alphabet,
+                                                      floor=stat.min_frequency[1],
+                                                      scale=100.0 if self.percentage else 1.0)
+        return self.tables[gram]
+
+    def preload(self, *ngrams: Union[str, int]) -> 'Language':
+        """
+        Loads statistics and tables of n-gram orders (all available ones by default) ahead of use
+        """
+        for gram in ngrams or self.available_grams:
+            self.table(gram)
+        return self
+
+    @classmethod
+    def build(cls, name: str, root: Path, sources: Iterable[Path], alphabet: Union[str, Sequence[str]],
+              max_n: int = 4, mapping: Dict[str, str] = None, encoding: str = None,
+              chunk_size: int = CHUNK_SIZE, workers: int = None, **kwargs) -> 'Language':
+        """
+        Builds language data files from corpus files (streamed in chunks) and loads the language.
+
+        :param sources:   Corpus files, counted independently (optionally in workers processes)
+        :param alphabet:  Symbols of the language, other characters (after mapping) are dropped
+        :param max_n:     Maximal n-gram order to count (up to 4)
+        """
+        counter = count_corpus(sources, alphabet, max_n=max_n, mapping=mapping, encoding=encoding,
+                               chunk_size=chunk_size, workers=workers)
+        write_language(counter, name, root, grams=cls.GRAMS, encoding=encoding)
+        return cls(name, root, mapping=mapping, encoding=encoding, **kwargs)
+
+    def publish(self, root: Path) -> Path:
+        """
+        Writes tables of all available orders to memory-mappable files,
+        so that languages of other processes created with ``shared_root=root`` share them.
+        The manifest with parameters of the tables is written last: tables of an unfinished
+        publish are not attached, tables of a language with other parameters are refused.
+
+        :return:  Shared root directory
+        """
+        root.mkdir(parents=True, exist_ok=True)
+        manifest = self._manifest_path(root)
+        manifest.unlink(missing_ok=True)
+        for gram in self.available_grams:
+            self.table(gram).save(root / f"{self.name}_{gram}")
+        write_atomic(manifest, lambda f: f.write(json.dumps(self._published_parameters()).encode()))
+        return root
+
+    def _manifest_path(self, root: Path) -> Path:
+        return root / f"{self.name}.published.json"
+
+    def _published_parameters(self) -> Dict[str, Any]:
+        """
+        Parameters determining tables of the language: source files (by size and modification time),
+        loading options and the alphabet
+        """
+        sources = {}
+        for gram in self.available_grams:
+            stat = self.gram_path(gram).stat()
+            sources[gram] = [stat.st_size, stat.st_mtime_ns]
+        return json.loads(json.dumps({
+            "name": self.name,
+            "root": str(self.root.resolve()),
+            "sources": sources,
+            "mapping": sorted((self.mapping or {}).items()),
+            "encoding": self.encoding,
+            "percentage": self.percentage,
+            "sort": self.sort,
+            "alphabet": list(self.alphabet),
+        }))
+
+    def _shared_table(self, gram: str) -> Optional[NGramTable]:
+        """
+        Published table of an n-gram order, None if it is not published (completely)
+        """
+        manifest = self._manifest_path(self.shared_root)
+        prefix = self.shared_root / f"{self.name}_{gram}"
+        if not manifest.exists() or not prefix.with_name(f"{prefix.name}.json").exists():
+            return None
+        published = json.loads(manifest.read_text())
+        expected = self._published_parameters()
+        if published != expected:
+            different = sorted(key for key in expected if published.get(key) != expected[key])
+            raise ValueError(f"Tables published @ {str(self.shared_root)} do not match language {self.name} "
+                             f"(different {', '.join(different)})")
+        logger.debug(f"Attaching shared table {gram} @ {str(prefix)}")
+        return NGramTable.load(prefix, mmap=True)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        if self.shared_root is not None:
+            # tables are attached again on first use in the receiving process, loaded statistics are kept
+            state["tables"] = {}
+        return state
+
+    def encode(self, text: str) -> np.ndarray:
+        """
+        Applies language mapping and encodes text as symbol codes shared by all tables
+        """
+        if self.mapping:
+            for from_char, to_char in self.mapping.items():
+                text = text.replace(from_char, to_char)
+        return self.table(1).encode(text)
 
     @property
     def alphabet(self) -> Sequence[str]:
@@ -0,0 +1,156 @@
+"""
+Incremental n-gram scoring.
+
+Keeps counts of all n-grams of an encoded text, so that the loss of the same text with
+a few symbols replaced is recomputed from the affected n-gram windows only.
+"""
+from typing import Callable, Dict
+
+import numpy as np
+
+from .frequency import GramStat
+from .table import DENSE_TABLE_LIMIT, NGramTable
+from .utils import TABLE_LOSSES, abs_loss, log_loss
+
+
+def _log_terms(frequencies: np.ndarray, log_frequencies: np.ndarray, counts: np.ndarray,
+               total: int, scale: float) -> np.ndarray:
+    return np.where(counts > 0, -log_frequencies, 0.0)
+
+
+def _abs_terms(frequencies: np.ndarray, log_frequencies: np.ndarray, counts: np.ndarray,
+               total: int, scale: float) -> np.ndarray:
+    return np.where(counts > 0, np.abs(scale * counts / total - frequencies), 0.0)
+
+
+INCREMENTAL_TERMS: Dict[Callable[[GramStat, GramStat], float], Callable[..., np.ndarray]] = {
+    log_loss: _log_terms,
+    abs_loss: _abs_terms,
+}
+"""
+Per distinct n-gram loss terms (as a function of n-gram count) of GramStat losses
+"""
+
+
+def _firsts(values: np.ndarray) -> np.ndarray:
+    # mask of first elements of runs of equal values in a sorted array
+    firsts = np.empty(len(values), dtype=bool)
+    firsts[:1] = True
+    np.not_equal(values[1:], values[:-1], out=firsts[1:])
+    return firsts
+
+
+class IncrementalScorer:
+    """
+    Loss of an encoded text which supports cheap "what if" replacement of symbols.
+
+    :param table:  Language table of order n
+    :param codes:  Text encoded with Language.encode
+    :param loss:   One of the losses in INCREMENTAL_TERMS
+    """
+
+    def __init__(self, table: NGramTable, codes: np.ndarray, loss: Callable[[GramStat, GramStat], float]):
+        if loss not in INCREMENTAL_TERMS:
+            raise ValueError(f"Loss {loss} does not support incremental scoring")
+        self.table = table
+        self.n = table.n
+        self.terms = INCREMENTAL_TERMS[loss]
+        self.table_loss = TABLE_LOSSES[loss]
+        self.codes = np.array(codes, dtype=np.int64)
+        self.base = max(len(table.symbols), int(self.codes.max(initial=0)) + 1)
+        if self.base ** self.n > DENSE_TABLE_LIMIT:
+            raise ValueError(f"Too many symbols ({self.base}) for incremental scoring of {self.n}-grams")
+        self.powers = self.base ** np.arange(self.n - 1, -1, -1, dtype=np.int64)
+        self.total = max(len(self.codes) - self.n + 1, 0)
+        self.keys = self.codes[np.arange(self.total)[:, None] + np.arange(self.n)] @ self.powers
+        self.counts = np.bincount(self.keys, minlength=self.base ** self.n)
+        self.frequencies, self.log_frequencies = table.by_key(self.base)
+        self.loss = self.table_loss(self.codes, self.table)
+
+    def windows(self, positions: np.ndarray) -> np.ndarray:
+        """
+        Starts of distinct n-gram windows touching any of the positions
+        """
+        positions = np.asarray(positions)
+        starts = np.sort((positions[:, None] - np.arange(self.n)).ravel())
+        return starts[(starts >= 0) & (starts < self.total) & _firsts(starts)]
+
+    def _new_keys(self, starts: np.ndarray, positions: np.ndarray, values: np.ndarray) -> np.ndarray:
+        old_values = self.codes[positions]
+        self.codes[positions] = values
+        keys = self.codes[starts[:, None] + np.arange(self.n)] @ self.powers
+        self.codes[positions] = old_values
+        return keys
+
+    def propose(self, positions: np.ndarray, values: np.ndarray, windows: np.ndarray = None) -> float:
+        """
+        Loss of the text with symbols at positions replaced by values, the state is left unchanged.
+
+        :param windows:  Windows of positions (see windows), if they are precomputed
+        """
+        positions, values = np.asarray(positions), np.asarray(values)
+        if not len(positions):
+            return self.loss
+        starts = self.windows(positions) if windows is None else windows
+        # old windows are removed, new ones are added: sum up the count changes of every distinct key
+        keys = np.concatenate((self.keys[starts], self._new_keys(starts, positions, values)))
+        order = np.argsort(keys)
+        keys = keys[order]
+        firsts = np.flatnonzero(_firsts(keys))
+        keys = keys[firsts]
+        delta = np.add.reduceat(np.where(order < len(starts), -1, 1), firsts)
+        old_counts = self.counts[keys]
+        new_counts = old_counts + delta
+        frequencies, log_frequencies = self.frequencies[keys], self.log_frequencies[keys]
+        change = (self.terms(frequencies, log_frequencies, new_counts, self.total, self.table.scale)
+                  - self.terms(frequencies, log_frequencies, old_counts, self.total, self.table.scale))
+        return self.loss + float(np.sum(change))
+
+    def propose_exchanges(self, first: np.ndarray, second: np.ndarray, windows: np.ndarray,
+                          owners: np.ndarray) -> np.ndarray:
+        """
+        Losses of the text with all occurrences of symbols first[i] and second[i] exchanged,
+        scored for every exchange i in one pass, the state is left unchanged.
+
+        :param windows:  Windows (see windows) touching all occurrences of both symbols of every exchange,
+                         concatenated
+        :param owners:   Index of the exchange of every window
+        """
+        first, second = np.asarray(first), np.asarray(second)
+        windows, owners = np.asarray(windows), np.asarray(owners)
+        losses = np.full(len(first), self.loss)
+        if not len(windows):
+            return losses
+        codes = self.codes[windows[:, None] + np.arange(self.n)]
+        a, b = first[owners][:, None], second[owners][:, None]
+        new_keys = np.where(codes == a, b, np.where(codes == b, a, codes)) @ self.powers
+        # as in propose, but count changes are summed up per distinct (exchange, key) pair
+        size = self.base ** self.n
+        pairs = np.concatenate((owners, owners)) * size + np.concatenate((self.keys[windows], new_keys))
+        order = np.argsort(pairs)
+        pairs = pairs[order]
+        firsts = np.flatnonzero(_firsts(pairs))
+        pairs = pairs[firsts]
+        delta = np.add.reduceat(np.where(order < len(windows), -1, 1), firsts)
+        keys = pairs % size
+        old_counts = self.counts[keys]
+        new_counts = old_counts + delta
+        frequencies, log_frequencies = self.frequencies[keys], self.log_frequencies[keys]
+        change = (self.terms(frequencies, log_frequencies, new_counts, self.total, self.table.scale)
+                  - self.terms(frequencies, log_frequencies, old_counts, self.total, self.table.scale))
+        return losses + np.bincount(pairs // size, weights=change, minlength=len(first))
+
+    def commit(self, positions: np.ndarray, values: np.ndarray, windows: np.ndarray = None) -> float:
+        """
+        Replaces symbols at positions by values and returns the new (exactly recomputed) loss.
+        """
+        positions, values = np.asarray(positions), np.asarray(values)
+        if len(positions):
+            starts = self.windows(positions) if windows is None else windows
+            new_keys = self._new_keys(starts, positions, values)
+            np.subtract.at(self.counts, self.keys[starts], 1)
+            np.add.at(self.counts, new_keys, 1)
+            self.keys[starts] = new_keys
+            self.codes[positions] = values
+        self.loss = self.table_loss(self.codes, self.table)
+        return self.loss
@@ -0,0 +1,251 @@
+"""
+Integer-indexed n-gram tables.
+
+Symbols of an alphabet are mapped to small integers and every n-gram
+to an integer index ``sum(code_i * len(alphabet) ** (n - i - 1))``, so scoring
+turns into array indexing instead of string lookups.
+"""
+import json
+from dataclasses import dataclass, field
+from logging import getLogger
+from pathlib import Path
+from typing import Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from crypto.utils import to_codepoints, write_atomic
+
+logger = getLogger(__name__)
+
+DENSE_TABLE_LIMIT = 2 ** 24
+"""
+Maximum number of entries in a dense table, larger tables are stored sparse
+"""
+
+
+def symbol_lookup(symbols: str) -> np.ndarray:
+    """
+    Code point -> symbol code lookup array, -1 marks characters outside of the alphabet
+    """
+    codepoints = to_codepoints(symbols)
+    lookup = np.full(int(codepoints.max(initial=0)) + 1, -1, dtype=np.int64)
+    lookup[codepoints] = np.arange(len(codepoints))
+    return lookup
+
+
+def lookup_codes(codepoints: np.ndarray, lookup: np.ndarray) -> np.ndarray:
+    codes = np.full(codepoints.shape, -1, dtype=np.int64)
+    known = codepoints < len(lookup)
+    codes[known] = lookup[codepoints[known]]
+    return codes
+
+
+@dataclass
+class NGramTable:
+    """
+    Frequencies (and their logarithms) of order-n n-grams indexed by integer n-gram index.
+
+    Dense tables hold ``len(symbols) ** n`` entries, sparse tables hold only known
+    n-grams with their indices in the sorted ``index`` array.
+    Unknown n-grams get the ``floor`` frequency (the minimal frequency of the source table).
+    """
+    n: int
+    symbols: str
+    frequencies: np.ndarray
+    floor: float
+    index: Optional[np.ndarray] = None
+    scale: float = 100.0
+    """
+    Scale of frequencies: 100 for percentages, 1 for probabilities
+    """
+    log_frequencies: np.ndarray = None
+    """
+    Logarithms of frequencies, computed from frequencies if not passed
+    """
+    log_floor: float = field(init=False)
+
+    def __post_init__(self):
+        if self.log_frequencies is None:
+            self.log_frequencies = np.log(self.frequencies)
+        self.log_floor = float(np.log(self.floor))
+        self._lookup = symbol_lookup(self.symbols)
+        self._by_key = {}
+
+    @property
+    def dense(self) -> bool:
+        return self.index is None
+
+    @property
+    def powers(self) -> np.ndarray:
+        return len(self.symbols) ** np.arange(self.n - 1, -1, -1, dtype=np.int64)
+
+    @classmethod
+    def from_grams(cls, ngrams: Mapping[str, float], n: int, symbols: Union[str, Sequence[str]],
+                   floor: float, scale: float = 100.0, max_dense_size: int = DENSE_TABLE_LIMIT) -> 'NGramTable':
+        """
+        Builds a table from n-gram -> frequency mapping (i.e. GramStat.ngrams).
+        N-grams with symbols outside of the alphabet are skipped.
+        """
+        symbols = "".join(symbols)
+        grams = getattr(ngrams, "grams", None)
+        if grams is None:
+            grams = np.array(list(ngrams.keys()), dtype=f"<U{n}")
+            frequencies = np.fromiter(ngrams.values(), dtype=np.float64, count=len(grams))
+        else:
+            frequencies = np.asarray(ngrams.frequencies, dtype=np.float64)
+        codepoints = np.ascontiguousarray(grams, dtype=f"<U{n}").view("<u4")
+        codes = lookup_codes(codepoints, symbol_lookup(symbols)).reshape(-1, n)
+        valid = np.all((codes >= 0) & (codes < len(symbols)), axis=1)
+        if not np.all(valid):
+            logger.warning(f"Skipping {np.count_nonzero(~valid)} {n}-grams with symbols outside of the alphabet")
+        indices = codes[valid] @ (len(symbols) ** np.arange(n - 1, -1, -1, dtype=np.int64))
+        frequencies = frequencies[valid]
+        size = len(symbols) ** n
+        if size <= max_dense_size:
+            table = np.full(size, floor, dtype=np.float64)
+            table[indices] = frequencies
+            return cls(n=n, symbols=symbols, frequencies=table, floor=floor, scale=scale)
+        order = np.argsort(indices)
+        return cls(n=n, symbols=symbols, frequencies=frequencies[order], floor=floor, index=indices[order],
+                   scale=scale)
+
+    def save(self, prefix: Path):
+        """
+        Writes table arrays to ``{prefix}.<array>.npy`` files and its parameters to ``{prefix}.json``.
+        Files are replaced atomically, so readers never see a partially written table.
+        """
+        arrays = {"frequencies": self.frequencies, "log_frequencies": self.log_frequencies}
+        if self.index is not None:
+            arrays["index"] = self.index
+        for name, array in arrays.items():
+            write_atomic(prefix.with_name(f"{prefix.name}.{name}.npy"),
+                          lambda f, array=array: np.save(f, np.ascontiguousarray(array), allow_pickle=False))
+        parameters = {"n": self.n, "symbols": self.symbols, "floor": self.floor, "scale": self.scale,
+                      "arrays": sorted(arrays)}
+        write_atomic(prefix.with_name(f"{prefix.name}.json"), lambda f: f.write(json.dumps(parameters).encode()))
+
+    @classmethod
+    def load(cls, prefix: Path, mmap: bool = True) -> 'NGramTable':
+        """
+        Loads a table written by save. With mmap arrays are memory-mapped read-only,
+        so processes loading the same table share its pages instead of holding copies.
+        """
+        parameters = json.loads(prefix.with_name(f"{prefix.name}.json").read_text())
+        arrays = {
+            name: np.load(prefix.with_name(f"{prefix.name}.{name}.npy"), mmap_mode="r" if mmap else None,
+                          allow_pickle=False)
+            for name in parameters.pop("arrays")
+        }
+        return cls(**parameters, **arrays)
+
+    def encode(self, text: str) -> np.ndarray:
+        """
+        Encodes text as an array of symbol codes.
+        Characters outside of the alphabet get distinct codes starting from ``len(symbols)``.
+        """
+        codepoints = to_codepoints(text)
+        codes = lookup_codes(codepoints, self._lookup)
+        unknown = codes < 0
+        if np.any(unknown):
+            _, inverse = np.unique(codepoints[unknown], return_inverse=True)
+            codes[unknown] = len(self.symbols) + inverse
+        return codes
+
+    def ngram_indices(self, codes: np.ndarray) -> np.ndarray:
+        """
+        Table indices of all n-grams of an encoded text (along the last axis),
+        n-grams with symbols outside of the alphabet get index -1
+        """
+        indices = self._rolling(codes, len(self.symbols))
+        outside = codes >= len(self.symbols)
+        if np.any(outside):
+            indices[self._rolling(outside.astype(np.int64), 1) > 0] = -1
+        return indices
+
+    def _rolling(self, codes: np.ndarray, base: int) -> np.ndarray:
+        # n shifted views of the same buffer: index = ((c0 * base + c1) * base + c2) ...
+        width = max(codes.shape[-1] - self.n + 1, 0)
+        indices = codes[..., :width].astype(np.int64)
+        for i in range(1, self.n):
+            indices *= base
+            indices += codes[..., i:i + width]
+        return indices
+
+    def distinct(self, codes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Distinct n-grams of an encoded text with their counts.
+        N-grams with symbols outside of the alphabet are distinguished by their symbols, but get index -1.
+
+        :return: table indices and counts of distinct n-grams
+        """
+        indices = self.ngram_indices(codes)
+        base = int(codes.max(initial=0)) + 1
+        if base <= len(self.symbols):
+            indices = np.sort(indices)
+            starts = np.flatnonzero(np.diff(indices, prepend=indices[:1] - 1))
+            return indices[starts], np.diff(starts, append=len(indices))
+        keys = self._rolling(codes, base)
+        order = np.argsort(keys)
+        keys = keys[order]
+        starts = np.flatnonzero(np.diff(keys, prepend=keys[:1] - 1))
+        return indices[order[starts]], np.diff(starts, append=len(keys))
+
+    def distinct_rows(self, codes: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Distinct n-grams of every row of a batch of encoded texts (two dimensional array) with their counts.
+
+        :return: row numbers, table indices and counts of distinct n-grams
+        """
+        indices = self.ngram_indices(codes)
+        base = max(int(codes.max(initial=0)) + 1, len(self.symbols))
+        size = base ** self.n
+        # keys of the same n-gram in different rows differ by multiples of size
+        offsets = np.arange(len(codes), dtype=np.int64)[:, None] * size
+        if base == len(self.symbols):
+            keys = np.sort((indices + offsets).ravel())
+            starts = np.flatnonzero(np.diff(keys, prepend=-1))
+            return keys[starts] // size, keys[starts] % size, np.diff(starts, append=len(keys))
+        keys = (self._rolling(codes, base) + offsets).ravel()
+        order = np.argsort(keys)
+        keys = keys[order]
+        starts = np.flatnonzero(np.diff(keys, prepend=-1))
+        return keys[starts] // size, indices.ravel()[order[starts]], np.diff(starts, append=len(keys))
+
+    def by_key(self, base: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Frequencies and log-frequencies of all n-grams over ``base`` symbols indexed by
+        ``sum(code_i * base ** (n - i - 1))``, symbols past the alphabet get the floor.
+        """
+        if base == len(self.symbols) and self.dense:
+            return self.frequencies, self.log_frequencies
+        if base not in self._by_key:
+            keys = np.arange(base ** self.n, dtype=np.int64)
+            indices = np.zeros_like(keys)
+            outside = np.zeros(keys.shape, dtype=bool)
+            for power in base ** np.arange(self.n - 1, -1, -1, dtype=np.int64):
+                digit = keys // power % base
+                outside |= digit >= len(self.symbols)
+                indices = indices * len(self.symbols) + digit
+            indices[outside] = -1
+            self._by_key[base] = self.lookup(indices), self.log_lookup(indices)
+        return self._by_key[base]
+
+    def _positions(self, indices: np.ndarray):
+        if self.dense:
+            return indices, indices >= 0
+        positions = np.minimum(np.searchsorted(self.index, indices), len(self.index) - 1)
+        return positions, (indices >= 0) & (self.index[positions] == indices)
+
+    def lookup(self, indices: np.ndarray) -> np.ndarray:
+        """
+        Frequencies of n-grams by their indices (floor for unknown ones)
+        """
+        positions, found = self._positions(indices)
+        return np.where(found, self.frequencies[np.where(found, positions, 0)], self.floor)
+
+    def log_lookup(self, indices: np.ndarray) -> np.ndarray:
+        """
+        Logarithms of frequencies of n-grams by their indices (log of floor for unknown ones)
+        """
+        positions, found = self._positions(indices)
+        return np.where(found, self.log_frequencies[np.where(found, positions, 0)], self.log_floor)
@@ -1,9 +1,12 @@
 """
 Utils for crypto analysis
 """
+from typing import Callable, Dict, Union
+
 import numpy as np
 
-from .frequency import GramStat
+from .frequency import GramStat, Language, ngram_fitness
+from .table import NGramTable
 
 
 def log_loss(predicted: GramStat, actual: GramStat) -> float:
@@ -21,3 +24,85 @@ def abs_loss(predicted: GramStat, actual: GramStat) -> float:
     for pred_label, pred_freq in predicted.items():
         loss += np.abs(pred_freq - actual.get(pred_label, actual.min_frequency[1]))
     return loss
+
+
+def table_log_loss(codes: np.ndarray, table: NGramTable) -> float:
+    """
+    Same as log_loss, but over an encoded text and integer-indexed language table
+    """
+    indices, _ = table.distinct(codes)
+    return -float(np.sum(table.log_lookup(indices)))
+
+
+def table_abs_loss(codes: np.ndarray, table: NGramTable) -> float:
+    """
+    Same as abs_loss, but over an encoded text and integer-indexed language table
+    """
+    indices, counts = table.distinct(codes)
+    return float(np.sum(np.abs(table.scale * counts / counts.sum() - table.lookup(indices))))
+
+
+def table_log_losses(codes: np.ndarray, table: NGramTable) -> np.ndarray:
+    """
+    table_log_loss of every row of a batch of encoded texts
+    """
+    rows, indices, _ = table.distinct_rows(codes)
+    return -np.bincount(rows, weights=table.log_lookup(indices), minlength=len(codes))
+
+
+def table_abs_losses(codes: np.ndarray, table: NGramTable) -> np.ndarray:
+    """
+    table_abs_loss of every row of a batch of encoded texts
+    """
+    rows, indices, counts = table.distinct_rows(codes)
+    total = max(codes.shape[1] - table.n + 1, 0)
+    return np.bincount(rows, weights=np.abs(table.scale * counts / total - table.lookup(indices)),
+                       minlength=len(codes))
+
+
+TABLE_LOSSES: Dict[Callable[[GramStat, GramStat], float], Callable[[np.ndarray, NGramTable], float]] = {
+    log_loss: table_log_loss,
+    abs_loss: table_abs_loss,
+}
+"""
+Vectorized counterparts of GramStat losses
+"""
+
+TABLE_BATCH_LOSSES: Dict[Callable[[GramStat, GramStat], float], Callable[[np.ndarray, NGramTable], np.ndarray]] = {
+    log_loss: table_log_losses,
+    abs_loss: table_abs_losses,
+}
+"""
+Vectorized counterparts of GramStat losses over batches of texts
+"""
+
+
+def fast_ngram_fitness(data: Union[str, np.ndarray], n: int, language: Language,
+                       loss: Callable[[GramStat, GramStat], float]) -> float:
+    """
+    Vectorized ngram_fitness: returns the same loss without building a GramStat for the data.
+    Losses without vectorized counterpart in TABLE_LOSSES fall back to ngram_fitness.
+
+    :param data:  Text or text already encoded with Language.encode
+    """
+    table_loss = TABLE_LOSSES.get(loss)
+    if table_loss is None:
+        if not isinstance(data, str):
+            raise ValueError(f"Loss {loss} has no vectorized counterpart and requires text data")
+        _, value = ngram_fitness(data, n=n, language=language, loss=loss)
+        return value
+    codes = language.encode(data) if isinstance(data, str) else data
+    return table_loss(codes, language.table(n))
+
+
+def fast_ngram_fitness_batch(codes: np.ndarray, n: int, language: Language,
+                             loss: Callable[[GramStat, GramStat], float]) -> np.ndarray:
+    """
+    Vectorized ngram_fitness of a batch of texts of equal length encoded with Language.encode
+
+    :param codes:  Two dimensional array, a text per row
+    :return:       Losses of all texts
+    """
+    if loss not in TABLE_BATCH_LOSSES:
+        raise ValueError(f"Loss {loss} has no vectorized counterpart")
+    return TABLE_BATCH_LOSSES[loss](codes, language.table(n))
@@ -0,0 +1,109 @@
+"""
+Instrumentation of analyzers
+"""
+import json
+import time
+from dataclasses import dataclass, field, fields
+from typing import Any, Dict, Optional, TextIO
+
+
+@dataclass
+class AnalyzerMetrics:
+    """
+    Counters and timers of an analyzer run.
+
+    Analyzers update it only if it is passed to them (``metrics`` is None by default),
+    so disabled instrumentation costs one attribute check per call.
+
+    :param output:    Stream for periodic JSON-lines reports
+    :param interval:  Minimal number of seconds between two reports
+    :param label:     Label added to every report (i.e. name of a run)
+    """
+    decrypts: int = 0
+    scores: int = 0
+    cache_hits: int = 0
+    improvements: int = 0
+    restarts: int = 0
+    cipher_time: float = 0.0
+    """
+    Seconds spent decrypting candidate keys
+    """
+    scoring_time: float = 0.0
+    """
+    Seconds spent scoring decrypted texts
+    """
+    output: Optional[TextIO] = field(default=None, repr=False, compare=False)
+    interval: float = field(default=10.0, repr=False, compare=False)
+    label: Optional[str] = field(default=None, repr=False, compare=False)
+    started: Optional[float] = field(default=None, repr=False, compare=False)
+    """
+    Time of the start of the first run (see start)
+    """
+    _reported: float = field(default=0.0, init=False, repr=False, compare=False)
+
+    COUNTERS = ("decrypts", "scores", "cache_hits", "improvements", "restarts", "cipher_time", "scoring_time")
+
+    def start(self) -> 'AnalyzerMetrics':
+        """
+        Marks the start of a run, elapsed time is counted from the first one
+        """
+        if self.started is None:
+            self.started = time.perf_counter()
+        return self
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started if self.started is not None else 0.0
+
+    @property
+    def evaluations(self) -> int:
+        """
+        Number of candidate keys scored without a cache hit
+        """
+        return self.scores - self.cache_hits
+
+    @property
+    def evaluations_per_second(self) -> float:
+        elapsed = self.elapsed
+        return self.evaluations / elapsed if elapsed > 0 else 0.0
+
+    def merge(self, other: 'AnalyzerMetrics') -> 'AnalyzerMetrics':
+        """
+        Adds counters of another run (i.e. of a worker process)
+        """
+        for name in self.COUNTERS:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        return self
+
+    def snapshot(self) -> 'AnalyzerMetrics':
+        """
+        Copy of counters only, which can be sent between processes
+        """
+        return AnalyzerMetrics(**{name: getattr(self, name) for name in self.COUNTERS})
+
+    def as_dict(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {"label": self.label} if self.label is not None else {}
+        data.update({name: getattr(self, name) for name in self.COUNTERS})
+        data.update(elapsed=self.elapsed, evaluations=self.evaluations,
+                    evaluations_per_second=self.evaluations_per_second)
+        return data
+
+    def report(self, force: bool = False):
+        """
+        Writes a JSON line to the output if the report interval has passed since the last one
+        """
+        if self.output is None:
+            return
+        now = time.perf_counter()
+        if not force and now - self._reported < self.interval:
+            return
+        self._reported = now
+        self.output.write(json.dumps({"time": time.time(), **self.as_dict()}) + "\n")
+        self.output.flush()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # streams cannot be sent to worker processes
+        return {f.name: getattr(self, f.name) for f in fields(self) if f.name != "output"}
+
+    def __setstate__(self, state: Dict[str, Any]):
+        self.__dict__.update(state, output=None)
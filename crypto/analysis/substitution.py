@@ -0,0 +1,211 @@
+"""
+Simple substitution encrypted text analysis
+"""
+import random
+from logging import getLogger
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+from crypto.algo.substitution import SubstitutionCipher
+from crypto.analysis.base import AnalyzerResult, BaseAnalyzer
+from crypto.analysis.language.frequency import GramStat, Language
+from crypto.analysis.language.incremental import IncrementalScorer
+from crypto.analysis.language.utils import log_loss
+from crypto.analysis.metrics import AnalyzerMetrics
+from crypto.language import ranked_mappings
+
+logger = getLogger(__name__)
+
+Swap = Tuple[int, int, np.ndarray, np.ndarray, np.ndarray]
+
+
+class SubstitutionAnalyzer(BaseAnalyzer):
+    """
+    Hill climbing over substitution keys: every round scores all swaps of two symbols of the key
+    and commits the improving ones starting from the best, phases restart from random keys.
+
+    Decryption is kept as a mapping of crypttext symbol codes to plaintext symbol codes.
+    Positions of every crypttext symbol are indexed once per crypttext, so a swap of two
+    symbols of the key is scored incrementally (see IncrementalScorer) from n-grams touching
+    positions of these two symbols only, all swaps of a round are scored in one vectorized pass.
+    """
+
+    def __init__(self, language: Language, loss_fn: Callable[[GramStat, GramStat], float] = log_loss,
+                 metrics: AnalyzerMetrics = None, seed: int = None):
+        """
+        :param loss_fn:  One of the losses supported by IncrementalScorer
+        :param seed:     Seed of random restarts (reseeded by seed of fit)
+        """
+        self.language = language
+        self.loss_fn = loss_fn
+        self.metrics = metrics
+        self.cipher = SubstitutionCipher(language.alphabet)
+        self.random = random.Random(seed)
+        self.evaluations = 0
+        """
+        Number of candidate keys scored by this analyzer
+        """
+
+    def decrypt(self, crypttext: str, key: str, **kwargs) -> str:
+        """
+        Crypttext is read the same way as by fit: upper-cased with the language mapping applied,
+        symbols out of the alphabet are kept as they are
+        """
+        text = crypttext.upper()
+        if self.language.mapping:
+            for from_char, to_char in self.language.mapping.items():
+                text = text.replace(from_char, to_char)
+        alphabet = self.cipher.alphabet
+        key = "".join(alphabet[position] for position in self.cipher.key_positions(key))
+        return text.translate(str.maketrans(key, alphabet))
+
+    def key(self, mapping: np.ndarray) -> str:
+        """
+        Cipher key of a mapping of crypttext symbol codes to plaintext symbol codes
+        """
+        key = [""] * len(mapping)
+        for code, plain_code in enumerate(mapping.tolist()):
+            key[plain_code] = self.cipher.alphabet[code]
+        return "".join(key)
+
+    def mapping(self, key: str) -> np.ndarray:
+        """
+        Mapping of crypttext symbol codes to plaintext symbol codes of a cipher key
+        """
+        mapping = np.empty(len(self.cipher.alphabet), dtype=np.int64)
+        mapping[self.cipher.key_positions(key)] = np.arange(len(mapping))
+        return mapping
+
+    def letter_positions(self, codes: np.ndarray) -> List[np.ndarray]:
+        """
+        Positions of every alphabet symbol in an encoded text
+        """
+        size = len(self.cipher.alphabet)
+        order = np.argsort(codes, kind="stable")
+        counts = np.bincount(codes[codes < size], minlength=size)
+        return np.split(order[:counts.sum()], np.cumsum(counts)[:-1])
+
+    def frequency_mappings(self, codes: np.ndarray, count: int = 1) -> List[np.ndarray]:
+        """
+        Mappings of crypttext symbols to plaintext symbols ranked by the distance of their frequencies
+        (see crypto.language.ranked_mappings), the first one matches symbols of the same frequency rank
+        """
+        alphabet = self.cipher.alphabet
+        counts = np.bincount(codes[codes < len(alphabet)], minlength=len(alphabet))
+        observed = counts / max(counts.sum(), 1)
+        monograms = self.language[1]
+        expected = np.array([monograms.get(symbol, 0.0) for symbol in alphabet])
+        expected = expected / max(expected.sum(), 1e-12)
+        candidates = ranked_mappings(dict(zip(alphabet, observed.tolist())), dict(zip(alphabet, expected.tolist())),
+                                     count=count)
+        return [np.array([alphabet.index(matched[symbol]) for symbol in alphabet], dtype=np.int64)
+                for _, matched in candidates]
+
+    def decrypt_codes(self, codes: np.ndarray, mapping: np.ndarray) -> np.ndarray:
+        inside = codes < len(mapping)
+        return np.where(inside, mapping[np.where(inside, codes, 0)], codes)
+
+    def swaps(self, positions: List[np.ndarray], scorer: IncrementalScorer) -> List[Swap]:
+        """
+        Swaps of two symbols of the key which change the decrypted text (at least one of them occurs in it)
+        with positions of the text they change, a mask of positions of the first symbol
+        and n-gram windows touching these positions (the same for all keys)
+        """
+        swaps = []
+        for a in range(len(positions)):
+            for b in range(a + 1, len(positions)):
+                if len(positions[a]) or len(positions[b]):
+                    changed = np.concatenate((positions[a], positions[b]))
+                    swaps.append((a, b, changed, np.arange(len(changed)) < len(positions[a]),
+                                  scorer.windows(changed)))
+        return swaps
+
+    def hill_climbing_phase(self, scorer: IncrementalScorer, mapping: np.ndarray,
+                            swaps: List[Swap]) -> Tuple[np.ndarray, float]:
+        """
+        Hill climbing from a mapping, scorer holds the text decrypted with it.
+
+        Every round scores all swaps at once (see IncrementalScorer.propose_exchanges)
+        and commits the improving ones starting from the best.
+        """
+        mapping = mapping.copy()
+        if not swaps:
+            return mapping, scorer.loss
+        symbols = np.array([(a, b) for a, b, *_ in swaps], dtype=np.int64)
+        windows = np.concatenate([swap[4] for swap in swaps])
+        owners = np.repeat(np.arange(len(swaps)), [len(swap[4]) for swap in swaps])
+        while True:
+            # positions of symbol a are decrypted as mapping[a], after the swap as mapping[b] and vice versa
+            losses = scorer.propose_exchanges(mapping[symbols[:, 0]], mapping[symbols[:, 1]], windows, owners)
+            self.evaluations += len(swaps)
+            if self.metrics is not None:
+                self.metrics.scores += len(swaps)
+            # the margin keeps rounding errors of incremental losses from cycling
+            improving = np.flatnonzero(losses < scorer.loss - 1e-9)
+            if not len(improving):
+                return mapping, scorer.loss
+            # improving swaps are tried from the best one, after the first commit the text has changed,
+            # so the rest are rescored one by one
+            for rank, index in enumerate(improving[np.argsort(losses[improving], kind="stable")].tolist()):
+                a, b, positions, first, swap_windows = swaps[index]
+                values = np.where(first, mapping[b], mapping[a])
+                if rank:
+                    self.evaluations += 1
+                    if self.metrics is not None:
+                        self.metrics.scores += 1
+                    if not scorer.propose(positions, values, windows=swap_windows) < scorer.loss - 1e-9:
+                        continue
+                scorer.commit(positions, values, windows=swap_windows)
+                mapping[a], mapping[b] = mapping[b], mapping[a]
+                if self.metrics is not None:
+                    self.metrics.improvements += 1
+
+    def fit(self, crypttext: str, ngrams: int = 4, phases: int = 100, seed: int = None,
+            initial_key: Optional[str] = None, frequency_starts: int = 1,
+            **kwargs) -> AnalyzerResult:
+        """
+        :param ngrams:            Order of n-grams of the loss
+        :param phases:            Number of hill climbing phases: first ones start from frequency matches,
+                                  others from random keys
+        :param initial_key:       Key of the first phase, by default symbols are matched by frequency ranks
+        :param frequency_starts:  Number of phases starting from frequency matches ranked by their distance,
+                                  the initial key replaces the first one
+        """
+        if seed is not None:
+            self.random.seed(seed)
+        if self.metrics is not None:
+            self.metrics.start()
+        codes = self.language.encode(crypttext.upper())
+        positions = self.letter_positions(codes)
+        table = self.language.table(ngrams)
+        swaps = None
+        initial = self.frequency_mappings(codes, count=frequency_starts) if frequency_starts > 0 else []
+        if initial_key is not None:
+            initial[:1] = [self.mapping(initial_key)]
+        best_keys: List[str] = []
+        best_loss = np.inf
+        for phase in range(phases):
+            if phase < len(initial):
+                mapping = initial[phase]
+            else:
+                size = len(self.cipher.alphabet)
+                mapping = np.array(self.random.sample(range(size), size), dtype=np.int64)
+            if phase and self.metrics is not None:
+                self.metrics.restarts += 1
+            scorer = IncrementalScorer(table, self.decrypt_codes(codes, mapping), loss=self.loss_fn)
+            if swaps is None:
+                swaps = self.swaps(positions, scorer)
+            mapping, loss = self.hill_climbing_phase(scorer, mapping, swaps)
+            key = self.key(mapping)
+            if loss < best_loss:
+                logger.info(f"[{phase + 1}/{phases}] Best key is updated: {key} ({loss:.3f})")
+                best_keys, best_loss = [key], loss
+            elif np.equal(loss, best_loss) and key not in best_keys:
+                best_keys.append(key)
+            if self.metrics is not None:
+                self.metrics.report()
+        logger.info(f"[END] Keys: {best_keys} Best loss: {best_loss}")
+        if self.metrics is not None:
+            self.metrics.report(force=True)
+        return AnalyzerResult(best_keys, best_score=best_loss, score_is_loss=True, metrics=self.metrics)
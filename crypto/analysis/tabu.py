@@ -0,0 +1,106 @@
+"""
+Tabu search over swapped keys
+"""
+from collections import deque
+from logging import getLogger
+from typing import Any, List, Tuple
+
+import numpy as np
+
+from crypto.analysis.hill import HillClimbingAnalyzer
+from crypto.analysis.language.incremental import IncrementalScorer
+from crypto.utils import swap_elements
+
+logger = getLogger(__name__)
+
+
+class TabuSearchAnalyzer(HillClimbingAnalyzer):
+    """
+    Same as HillClimbingAnalyzer, but every phase is a tabu search:
+    each iteration moves to the best swap of the current key even if it makes the loss worse,
+    except for recently made swaps which are tabu (unless they lead to a new best key).
+    A phase returns the best key seen during the search.
+    """
+
+    def __init__(self, *args, iterations: int = 100, tenure: int = None, patience: int = None, **kwargs):
+        """
+        :param iterations:  Maximal number of moves in every phase
+        :param tenure:      Number of iterations a made swap stays tabu,
+                            by default square root of the number of distinct swaps
+        :param patience:    Stop a phase after this many iterations without a new best key
+        """
+        super().__init__(*args, **kwargs)
+        self.iterations = iterations
+        self.tenure = tenure
+        self.patience = patience
+
+    def distinct_swaps(self, key: Any) -> List[Tuple[int, int]]:
+        """
+        Swaps of a key without their mirrored duplicates ((i, j) and (j, i) produce the same key)
+        """
+        return list(dict.fromkeys(tuple(sorted(swap)) for swap in self.key_generator.swaps(key)))
+
+    def swap_losses(self, crypttext: Any, key: Any, swaps: List[Tuple[int, int]], n: int) -> np.ndarray:
+        """
+        Losses of a text decrypted with every swapped key
+        """
+        if self.batch_size:
+            keys = np.array([swap_elements(key, swap=swap) for swap in swaps])
+            return np.concatenate([self.score_batch(crypttext, keys[start:start + self.batch_size], n=n)
+                                   for start in range(0, len(keys), self.batch_size)])
+        if self.delta:
+            scorer = IncrementalScorer(self.language.table(n), self.decrypt_codes(crypttext, key), loss=self.loss_fn)
+            losses = np.empty(len(swaps))
+            for idx, swap in enumerate(swaps):
+                left, right = self.cipher.swap_positions(crypttext, swap=swap, key_argname=self.key_argname)
+                self.proposed()
+                losses[idx] = scorer.propose(np.concatenate((left, right)), scorer.codes[np.concatenate((right, left))])
+            return losses
+        return np.array([self.score(crypttext, swap_elements(key, swap=swap), n=n) for swap in swaps])
+
+    def tabu_phase(self, crypttext: Any, starting_key: Any, n: int, starting_loss: float = None):
+        if starting_loss is None:
+            starting_loss = self.score(crypttext, starting_key, n=n)
+        swaps = self.distinct_swaps(starting_key)
+        if not swaps:
+            return starting_key, starting_loss
+        tenure = self.tenure if self.tenure is not None else max(1, int(len(swaps) ** 0.5))
+        tabu = deque(maxlen=tenure)
+        current_key = best_key = starting_key
+        best_loss = starting_loss
+        stalled = 0
+        for iteration in range(self.iterations):
+            losses = self.swap_losses(crypttext, current_key, swaps, n=n)
+            move = None
+            for idx in np.argsort(losses, kind="stable"):
+                if swaps[idx] not in tabu:
+                    move = idx
+                    break
+                if losses[idx] < best_loss:
+                    # aspiration: tabu swap is allowed if it gives a new best key
+                    move = idx
+                    break
+            if move is None:
+                logger.debug(f"All swaps of {current_key} are tabu!")
+                break
+            current_key = swap_elements(current_key, swap=swaps[move])
+            tabu.append(swaps[move])
+            if losses[move] < best_loss:
+                # verify approximate (incremental or batch) loss with a full scoring
+                current_loss = self.score(crypttext, current_key, n=n)
+                if current_loss < best_loss:
+                    logger.debug(f"[{iteration + 1}/{self.iterations}] Found better key: {current_key} "
+                                 f"with loss {current_loss:.3f}!")
+                    best_key, best_loss = current_key, current_loss
+                    stalled = 0
+                    if self.metrics is not None:
+                        self.metrics.improvements += 1
+                    continue
+            stalled += 1
+            if self.patience is not None and stalled >= self.patience:
+                break
+        logger.debug(f"[STOP] best key: {best_key}, best loss {best_loss:.3f}")
+        return best_key, best_loss
+
+    def search_phase(self, crypttext: Any, starting_key: Any, n: int, starting_loss: float = None):
+        return self.tabu_phase(crypttext, starting_key, n=n, starting_loss=starting_loss)
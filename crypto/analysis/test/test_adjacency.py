@@ -0,0 +1,62 @@
+import random
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from crypto.algo.transpositions import DoubleTranspositionCipher
+from crypto.analysis.adjacency import ColumnAdjacency
+from crypto.analysis.hill import HillClimbingAnalyzer
+from crypto.analysis.language.frequency import Language
+from crypto.analysis.test.test_hill import CRYPTTEXT
+from crypto.analysis.transposition import TranspositionKeyGenerator
+from crypto.utils import to_df
+
+
+class TestColumnAdjacency(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.language = Language("english", Path(__file__).parent / "files" / "english")
+        cls.crypttext = to_df(CRYPTTEXT, (10, 11))
+        generator = random.Random(5)
+        cls.keys = [generator.sample(range(11), 11) for _ in range(20)]
+
+    def analyzer(self, **kwargs) -> HillClimbingAnalyzer:
+        key_generator = TranspositionKeyGenerator(list(range(11)), linked_groups=[[-1, -2]])
+        return HillClimbingAnalyzer(DoubleTranspositionCipher(), key_generator=key_generator, key_argname="k2",
+                                    language=self.language, vectorized=True, **kwargs)
+
+    def test_cost_is_text_likelihood(self):
+        analyzer = self.analyzer()
+        for order in (2, 3):
+            adjacency = ColumnAdjacency.from_crypttext(self.crypttext, self.language, order=order)
+            table = self.language.table(order)
+            for key in self.keys:
+                codes = analyzer.decrypt_codes(self.crypttext, key)
+                expected = -np.sum(table.log_lookup(table.ngram_indices(codes)))
+                self.assertAlmostEqual(expected, adjacency.cost(key))
+            np.testing.assert_allclose([adjacency.cost(key) for key in self.keys], adjacency.cost_batch(self.keys))
+
+    def test_hill_climbing(self):
+        adjacency = ColumnAdjacency.from_crypttext(self.crypttext, self.language, order=3)
+        key_generator = TranspositionKeyGenerator(list(range(11)), linked_groups=[[-1, -2]])
+        starting_key = [6, 2, 5, 0, 8, 3, 1, 7, 4, 9, 10]
+        key, cost = adjacency.hill_climbing(starting_key, key_generator)
+        self.assertLess(cost, adjacency.cost(starting_key))
+        self.assertAlmostEqual(cost, adjacency.cost(key))
+        self.assertGreaterEqual(adjacency.cost_batch(key_generator.neighbourhood(key)).min(), cost)
+
+    def test_fit_verifies_keys(self):
+        for kwargs in ({}, {"batch_size": 1000, "best_improvement": True}):
+            analyzer = self.analyzer(adjacency=3, **kwargs)
+            result = analyzer.fit(self.crypttext, ngrams=3, phases=10, seed=3)
+            for key in result.best_keys:
+                self.assertAlmostEqual(result.best_score, self.analyzer().score(self.crypttext, key, n=3))
+
+    def test_requires_column_keys(self):
+        with self.assertRaises(ValueError):
+            HillClimbingAnalyzer(DoubleTranspositionCipher(), key_generator=TranspositionKeyGenerator(list(range(10))),
+                                 key_argname="k1", language=self.language, adjacency=2)
+        with self.assertRaises(ValueError):
+            self.analyzer(adjacency=2, delta=True)
@@ -0,0 +1,45 @@
+import unittest
+from pathlib import Path
+
+from crypto.algo.transpositions import DoubleTranspositionCipher
+from crypto.analysis.annealing import COOLING_SCHEDULES, SimulatedAnnealingAnalyzer
+from crypto.analysis.base import AnalyzerResult
+from crypto.analysis.language.frequency import Language
+from crypto.analysis.test.test_hill import CRYPTTEXT
+from crypto.analysis.transposition import TranspositionKeyGenerator
+from crypto.utils import to_df
+
+
+class TestSimulatedAnnealingAnalyzer(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.language = Language("english", Path(__file__).parent / "files" / "english")
+        cls.crypttext = to_df(CRYPTTEXT, (10, 11))
+
+    def analyzer(self, **kwargs) -> SimulatedAnnealingAnalyzer:
+        key_generator = TranspositionKeyGenerator(list(range(11)), linked_groups=[[-1, -2]])
+        return SimulatedAnnealingAnalyzer(DoubleTranspositionCipher(), key_generator=key_generator, key_argname="k2",
+                                          language=self.language, steps=500, **kwargs)
+
+    def test_cooling_schedules(self):
+        for name, cooling in COOLING_SCHEDULES.items():
+            temperatures = [cooling(10.0, step, 100) for step in range(100)]
+            self.assertAlmostEqual(10.0, temperatures[0], msg=name)
+            self.assertTrue(all(a >= b for a, b in zip(temperatures, temperatures[1:])), name)
+
+    def test_fit_is_reproducible(self):
+        for cooling in COOLING_SCHEDULES:
+            analyzer = self.analyzer(cooling=cooling, delta=True)
+            result = analyzer.fit(self.crypttext, ngrams=3, phases=2, seed=3)
+            self.assertIsInstance(result, AnalyzerResult)
+            self.assertLessEqual(result.best_score, analyzer.score(self.crypttext, analyzer.key_generator.initial_key, 3))
+            other = self.analyzer(cooling=cooling, delta=True).fit(self.crypttext, ngrams=3, phases=2, seed=3)
+            self.assertEqual(result.best_keys, other.best_keys)
+            self.assertAlmostEqual(result.best_score, other.best_score)
+
+    def test_delta_matches_full_scoring(self):
+        full = self.analyzer(polish=False).fit(self.crypttext, ngrams=3, phases=1, seed=5)
+        delta = self.analyzer(polish=False, delta=True).fit(self.crypttext, ngrams=3, phases=1, seed=5)
+        self.assertEqual(full.best_keys, delta.best_keys)
+        self.assertAlmostEqual(full.best_score, delta.best_score)
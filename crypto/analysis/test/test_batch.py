@@ -0,0 +1,85 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from crypto.algo.vigenere import VigenereCipher
+from crypto.analysis.base import AnalyzerResult
+from crypto.analysis.language.frequency import Language
+from crypto.analysis.test.test_hill import CRYPTTEXT
+from crypto.analysis.vigenere import VigenereAnalyzer
+from crypto.batch import InvalidJob, Job, crack_stream, read_jobs, to_record
+from crypto.__main__ import main
+
+PLAINTEXT = ("THEQUICKBROWNFOXJUMPSOVERTHELAZYDOGANDKEEPSRUNNINGTHROUGHTHEFORESTUNTILTHEEVENINGCOMES"
+             "ANDTHESUNGOESDOWNBEHINDTHEHILLSWHERETHERIVERMEETSTHESEA")
+
+
+class TestBatch(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.root = Path(__file__).parent / "files" / "english"
+        cls.language = Language("english", cls.root)
+        cipher = VigenereCipher(cls.language.alphabet)
+        cls.lines = [json.dumps({"id": key, "cipher": "vigenere", "crypttext": cipher.encrypt(PLAINTEXT, key),
+                                 "fit": {"min_key_length": len(key), "max_key_length": len(key)}})
+                     for key in ("KEY", "LEMON", "CAT", "DOG")]
+        cls.lines.append(json.dumps({"id": "grid", "cipher": "transposition", "crypttext": CRYPTTEXT,
+                                     "size": [10, 11], "generator": {"linked_groups": [[-1, -2]]},
+                                     "fit": {"ngrams": 3, "phases": 2, "seed": 1}}))
+        cls.lines.append(json.dumps({"id": "bad", "crypttext": "ABC"}))
+
+    def test_read_jobs(self):
+        jobs = list(read_jobs(["", *self.lines], cipher="caesar"))
+        self.assertEqual(6, len(jobs))
+        self.assertEqual([10, 11], jobs[4].size)
+        self.assertEqual("caesar", jobs[5].cipher)
+        with self.assertRaises(ValueError):
+            Job.from_json('{"crypttext": "ABC", "unknown": 1}')
+
+    def test_read_invalid_jobs(self):
+        lines = [self.lines[0], "{not json", "", '["ABC"]', '{"crypttext": "ABC", "unknown": 1}', self.lines[1]]
+        jobs = list(read_jobs(lines))
+        self.assertEqual(5, len(jobs))
+        self.assertEqual(["KEY", "LEMON"], [jobs[0].id, jobs[4].id])
+        self.assertEqual([2, 4, 5], [job.line for job in jobs[1:4]])
+        self.assertTrue(all(isinstance(job, InvalidJob) for job in jobs[1:4]))
+        records = list(crack_stream(iter(jobs), self.language, workers=2))
+        self.assertEqual(PLAINTEXT, records[4]["plaintext"])
+        self.assertEqual([2, 4, 5], [record["line"] for record in records[1:4]])
+        self.assertIn("Unknown job fields", records[3]["error"])
+
+    def test_record_of_failed_decryption(self):
+        job = Job("ABC D!", "vigenere", id=1)
+        record = to_record(job, VigenereAnalyzer(self.language), job.crypttext, AnalyzerResult(["KEY"], 1.0))
+        self.assertEqual(["KEY"], record["best_keys"])
+        self.assertIsNone(record["plaintext"])
+        self.assertIn("RuntimeError", record["plaintext_error"])
+
+    def test_crack_stream(self):
+        expected = None
+        for workers, max_in_flight, ordered in ((1, None, True), (2, 1, True), (2, 3, True), (3, None, False)):
+            jobs = read_jobs(self.lines, cipher="rot")
+            records = list(crack_stream(jobs, self.language, workers=workers, max_in_flight=max_in_flight,
+                                        ordered=ordered))
+            if ordered:
+                self.assertEqual(list(range(len(self.lines))), [record["index"] for record in records])
+            records = sorted(records, key=lambda record: record["index"])
+            for record in records[:4]:
+                self.assertEqual([record["id"]], record["best_keys"])
+                self.assertEqual(PLAINTEXT, record["plaintext"])
+            self.assertIn("Unknown cipher rot", records[5]["error"])
+            results = [(record.get("best_keys"), record.get("best_score")) for record in records]
+            if expected is None:
+                expected = results
+            self.assertEqual(expected, results)
+
+    def test_main(self):
+        with tempfile.TemporaryDirectory() as root:
+            jobs, output = Path(root) / "jobs.jsonl", Path(root) / "results.jsonl"
+            jobs.write_text("\n".join(self.lines[:2]))
+            self.assertEqual(0, main([str(jobs), "--data", str(self.root), "--workers", "1",
+                                      "--output", str(output)]))
+            records = [json.loads(line) for line in output.read_text(encoding="utf-8").splitlines()]
+        self.assertEqual([PLAINTEXT, PLAINTEXT], [record["plaintext"] for record in records])
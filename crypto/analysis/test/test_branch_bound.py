@@ -0,0 +1,81 @@
+import itertools
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from crypto.algo.transpositions import DoubleTranspositionCipher
+from crypto.analysis.branch_bound import BranchAndBoundAnalyzer
+from crypto.analysis.hill import HillClimbingAnalyzer
+from crypto.analysis.language.frequency import Language
+from crypto.analysis.test.test_hill import CRYPTTEXT
+from crypto.analysis.transposition import TranspositionKeyGenerator
+from crypto.utils import to_df
+
+
+class TestBranchAndBoundAnalyzer(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.language = Language("english", Path(__file__).parent / "files" / "english")
+        cls.crypttext = to_df(CRYPTTEXT, (10, 11))
+
+    def analyzer(self, key_generator: TranspositionKeyGenerator, **kwargs) -> BranchAndBoundAnalyzer:
+        return BranchAndBoundAnalyzer(DoubleTranspositionCipher(), key_generator=key_generator, key_argname="k2",
+                                      language=self.language, vectorized=True, **kwargs)
+
+    def brute_force(self, analyzer: BranchAndBoundAnalyzer):
+        # costs of all keys: negative log-frequencies of all n-grams of decrypted texts
+        blocks, tail = analyzer.key_generator.blocks()
+        keys = [[column for block in order for column in block] + tail for order in itertools.permutations(blocks)]
+        table = self.language.table(analyzer.order)
+        codes = np.stack([analyzer.decrypt_codes(self.crypttext, key) for key in keys])
+        costs = -table.log_lookup(table.ngram_indices(codes)).sum(axis=1)
+        return keys, costs
+
+    def test_blocks_follow_generated_keys(self):
+        for outer in (False, True):
+            key_generator = TranspositionKeyGenerator(list(range(11)), linked_groups=[[0, 1], [-1, -2]],
+                                                      permutation_indices=range(2, 9),
+                                                      shuffle_linked_groups_outer=outer, seed=3)
+            blocks, tail = key_generator.blocks()
+            lengths = {block[0]: len(block) for block in blocks}
+            for _ in range(20):
+                key = next(key_generator)
+                self.assertEqual(tail, key[len(key) - len(tail):])
+                # the rest of a key is made of blocks
+                parts, start = [], 0
+                while start < len(key) - len(tail):
+                    parts.append(key[start:start + lengths[key[start]]])
+                    start += len(parts[-1])
+                self.assertCountEqual(blocks, parts)
+
+    def test_search_matches_brute_force(self):
+        generators = [
+            lambda: TranspositionKeyGenerator(list(range(11)), linked_groups=[[7, 8], [-1, -2]]),
+            lambda: TranspositionKeyGenerator(list(range(11)), linked_groups=[[0, 1, 2], [-1, -2]],
+                                              shuffle_linked_groups_outer=True),
+        ]
+        for make_generator, order in itertools.product(generators, (2, 3)):
+            analyzer = self.analyzer(make_generator(), order=order, candidates=5)
+            candidates = analyzer.search(self.crypttext)
+            keys, costs = self.brute_force(analyzer)
+            expected = np.sort(costs)[:5]
+            np.testing.assert_allclose(expected, [cost for cost, _ in candidates])
+            for cost, key in candidates:
+                self.assertAlmostEqual(cost, costs[keys.index(key)])
+
+    def test_fit_is_not_worse_than_hill_climbing(self):
+        key_generator = TranspositionKeyGenerator(list(range(11)), linked_groups=[[-1, -2]])
+        result = self.analyzer(key_generator, order=3).fit(self.crypttext, ngrams=3)
+        hill = HillClimbingAnalyzer(DoubleTranspositionCipher(), key_generator=key_generator, key_argname="k2",
+                                    language=self.language, vectorized=True)
+        for key in result.best_keys:
+            self.assertAlmostEqual(result.best_score, hill.score(self.crypttext, key, n=3))
+        self.assertLessEqual(result.best_score, hill.fit(self.crypttext, ngrams=3, phases=3, seed=1).best_score)
+
+    def test_only_column_keys(self):
+        key_generator = TranspositionKeyGenerator(list(range(10)))
+        with self.assertRaises(ValueError):
+            BranchAndBoundAnalyzer(DoubleTranspositionCipher(), key_generator=key_generator, key_argname="k1",
+                                   language=self.language)
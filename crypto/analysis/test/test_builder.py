@@ -0,0 +1,59 @@
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from crypto.analysis.language.builder import NGramCounter, count_corpus
+from crypto.analysis.language.frequency import GramStat, Language, coincidence_index
+
+ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+CORPUS = ("It was the best of times, it was the worst of times, it was the age of wisdom, "
+          "it was the age of foolishness, it was the epoch of belief, it was the epoch of incredulity.")
+
+
+class TestNGramCounter(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.root = Path(tempfile.mkdtemp())
+        self.text = "".join(c for c in CORPUS.upper() if c in ALPHABET)
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.root)
+
+    def test_chunks_match_whole_text(self):
+        counter = NGramCounter(ALPHABET, max_n=4)
+        for start in range(0, len(CORPUS), 7):
+            counter.update(CORPUS[start:start + 7])
+        for n in range(1, 5):
+            counts, _, _ = GramStat.frequencies(self.text, n=n)
+            self.assertEqual(dict(counts), counter.ngrams(n))
+        self.assertEqual(sorted(counter.ngrams(2).values(), reverse=True), list(counter.ngrams(2).values()))
+
+    def test_mapping(self):
+        counter = NGramCounter("АБВЕ", max_n=2, mapping={"Ё": "Е"})
+        counter.update("аЁб в-ё")
+        self.assertEqual({"Е": 2, "А": 1, "Б": 1, "В": 1}, counter.ngrams(1))
+        self.assertEqual({"АЕ", "ЕБ", "БВ", "ВЕ"}, set(counter.ngrams(2)))
+
+    def test_shards_in_workers(self):
+        sources = []
+        for idx, part in enumerate((CORPUS[:80], CORPUS[80:])):
+            sources.append(self.root / f"shard{idx}.txt")
+            sources[-1].write_text(part)
+        serial = count_corpus(sources, ALPHABET, max_n=3, chunk_size=5)
+        parallel = count_corpus(sources, ALPHABET, max_n=3, workers=2)
+        for n in range(1, 4):
+            self.assertEqual(serial.ngrams(n), parallel.ngrams(n))
+
+    def test_build_language(self):
+        source = self.root / "corpus.txt"
+        source.write_text(CORPUS)
+        language = Language.build("dickens", self.root / "dickens", [source], ALPHABET, chunk_size=16, cache=False)
+        self.assertEqual(["monograms", "bigrams", "trigrams", "quadgrams"], language.available_grams)
+        expected = GramStat.from_text(self.text, n=3)
+        self.assertEqual(set(expected.keys()), set(language[3].keys()))
+        self.assertAlmostEqual(expected["WAS"], language[3]["WAS"])
+        data = json.loads((self.root / "dickens" / "dickens.json").read_text())
+        self.assertAlmostEqual(coincidence_index(self.text, language=None), data["coincidence"]["natural"])
+        self.assertAlmostEqual(language.coincidence.natural, data["coincidence"]["natural"])
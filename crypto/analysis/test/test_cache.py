@@ -0,0 +1,23 @@
+import unittest
+
+from crypto.analysis.cache import ScoreCache
+
+
+class TestScoreCache(unittest.TestCase):
+
+    def test_lru_eviction(self):
+        cache = ScoreCache(maxsize=2)
+        cache.put([1, 0], n=3, loss=1.0)
+        cache.put([0, 1], n=3, loss=2.0)
+        self.assertEqual(1.0, cache.get([1, 0], n=3))
+        cache.put([0, 1], n=4, loss=3.0)
+        self.assertEqual(2, len(cache))
+        self.assertIsNone(cache.get([0, 1], n=3))
+        self.assertEqual(1.0, cache.get((1, 0), n=3))
+        self.assertEqual(3.0, cache.get([0, 1], n=4))
+        self.assertEqual((3, 1), (cache.hits, cache.misses))
+        self.assertAlmostEqual(0.75, cache.hit_rate)
+
+    def test_invalid_size(self):
+        with self.assertRaises(ValueError):
+            ScoreCache(maxsize=0)
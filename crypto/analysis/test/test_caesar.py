@@ -1,14 +1,35 @@
 import unittest
 from pathlib import Path
 
+from crypto.algo.caesar import CaesarCipher
 from crypto.analysis.caesar import CaesarAnalyzer
-from crypto.analysis.language.frequency import Language
+from crypto.analysis.language.frequency import Language, coincidence_index
 
 
 class TestCaesarAnalyzer(unittest.TestCase):
 
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.language = Language("english", Path(__file__).parent / "files" / "english")
+
+    def test_scores_match_coincidence_index(self):
+        analyzer = CaesarAnalyzer(self.language)
+        crypttext = CaesarCipher(self.language.alphabet).encrypt("DEFENDTHEEASTWALLOFTHECASTLE", key="K")
+        scores = analyzer.scores(crypttext)
+        for char, score in zip(self.language[1], scores):
+            self.assertAlmostEqual(coincidence_index(analyzer.decrypt(crypttext, char), language=self.language), score)
+
     def test_fit_correct_key(self):
         language = Language("english", Path(__file__).parent / "files" / "english")
         analyzer = CaesarAnalyzer(language)
         result = analyzer.fit("efgfoeuiffbtuxbmmpguifdbtumf")
         self.assertIn("B", result.best_keys)
+
+    def test_fit_encrypted_text(self):
+        analyzer = CaesarAnalyzer(self.language)
+        crypttext = CaesarCipher(self.language.alphabet).encrypt("DEFENDTHEEASTWALLOFTHECASTLE", key="K")
+        self.assertEqual({"K"}, analyzer.fit(crypttext.lower()).best_keys)
+
+    def test_fit_character_not_in_alphabet(self):
+        with self.assertRaises(RuntimeError):
+            CaesarAnalyzer(self.language).fit("DEFEND THE EAST")
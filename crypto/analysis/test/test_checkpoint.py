@@ -0,0 +1,98 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from crypto.algo.transpositions import DoubleTranspositionCipher
+from crypto.analysis.annealing import SimulatedAnnealingAnalyzer
+from crypto.analysis.checkpoint import FitCheckpoint
+from crypto.analysis.hill import HillClimbingAnalyzer
+from crypto.analysis.language.frequency import Language
+from crypto.analysis.language.utils import abs_loss
+from crypto.analysis.test.test_hill import CRYPTTEXT
+from crypto.analysis.transposition import TranspositionKeyGenerator
+from crypto.utils import to_df
+
+
+class TestFitCheckpoint(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.language = Language("english", Path(__file__).parent / "files" / "english")
+        cls.crypttext = to_df(CRYPTTEXT, (10, 11))
+
+    def setUp(self) -> None:
+        self.root = tempfile.TemporaryDirectory()
+        self.checkpoint = Path(self.root.name) / "fit.json"
+
+    def tearDown(self) -> None:
+        self.root.cleanup()
+
+    def analyzer(self, analyzer_class=HillClimbingAnalyzer, **kwargs) -> HillClimbingAnalyzer:
+        key_generator = TranspositionKeyGenerator(list(range(11)), linked_groups=[[-1, -2]], seed=7)
+        return analyzer_class(DoubleTranspositionCipher(), key_generator=key_generator, key_argname="k2",
+                              language=self.language, vectorized=True, **kwargs)
+
+    def sliced_fit(self, make_analyzer, phases: int, **kwargs):
+        # every run is stopped by the time limit after one phase and resumed by a new analyzer
+        slices = 0
+        while not self.checkpoint.exists() or FitCheckpoint.load(self.checkpoint).phase < phases:
+            result = make_analyzer().fit(self.crypttext, ngrams=3, phases=phases, checkpoint=self.checkpoint,
+                                         resume=True, time_limit=0, **kwargs)
+            slices += 1
+        self.assertEqual(phases, slices)
+        return result
+
+    def test_resume_is_deterministic(self):
+        for make_analyzer, kwargs in ((self.analyzer, {"seed": 5}), (self.analyzer, {}),
+                                      (lambda: self.analyzer(SimulatedAnnealingAnalyzer, steps=300, seed=4), {})):
+            self.checkpoint.unlink(missing_ok=True)
+            result = self.sliced_fit(make_analyzer, phases=4, **kwargs)
+            # runs without a seed are resumed with the master seed drawn by the first one
+            seed = FitCheckpoint.load(self.checkpoint).seed
+            self.assertEqual(kwargs.get("seed", seed), seed)
+            expected = make_analyzer().fit(self.crypttext, ngrams=3, phases=4, seed=seed)
+            self.assertEqual(expected.best_keys, result.best_keys)
+            self.assertAlmostEqual(expected.best_score, result.best_score)
+
+    def test_checkpoint_cache(self):
+        self.analyzer(cache_size=1000).fit(self.crypttext, ngrams=3, phases=2, checkpoint=self.checkpoint,
+                                           checkpoint_cache=True)
+        state = FitCheckpoint.load(self.checkpoint)
+        self.assertEqual(2, state.phase)
+        analyzer = self.analyzer(cache_size=1000)
+        # a finished run is extended by more phases
+        analyzer.fit(self.crypttext, ngrams=3, phases=3, checkpoint=self.checkpoint, resume=True)
+        self.assertGreater(analyzer.cache.hits, 0)
+        self.assertEqual(3, FitCheckpoint.load(self.checkpoint).phase)
+
+    def test_resume_with_other_seed(self):
+        self.analyzer().fit(self.crypttext, ngrams=3, phases=2, seed=1, checkpoint=self.checkpoint)
+        with self.assertRaises(ValueError):
+            self.analyzer().fit(self.crypttext, ngrams=3, phases=2, seed=2, checkpoint=self.checkpoint, resume=True)
+
+    def test_resume_other_run(self):
+        self.analyzer(cache_size=1000).fit(self.crypttext, ngrams=3, phases=2, seed=1, checkpoint=self.checkpoint,
+                                           checkpoint_cache=True)
+        other_generator = TranspositionKeyGenerator(list(range(11)), seed=7)
+        for crypttext, analyzer in ((to_df(CRYPTTEXT[::-1], (10, 11)), self.analyzer(cache_size=1000)),
+                                    (to_df(CRYPTTEXT, (11, 10)), self.analyzer()),
+                                    (self.crypttext, self.analyzer(loss_fn=abs_loss)),
+                                    (self.crypttext, HillClimbingAnalyzer(
+                                        DoubleTranspositionCipher(), key_generator=other_generator, key_argname="k2",
+                                        language=self.language, vectorized=True))):
+            with self.assertRaises(ValueError):
+                analyzer.fit(crypttext, ngrams=3, phases=3, seed=1, checkpoint=self.checkpoint, resume=True)
+        self.assertEqual(2, FitCheckpoint.load(self.checkpoint).phase)
+        self.analyzer().fit(self.crypttext, ngrams=3, phases=3, seed=1, checkpoint=self.checkpoint, resume=True)
+        self.assertEqual(3, FitCheckpoint.load(self.checkpoint).phase)
+
+    def test_unseeded_parallel_run_is_repeatable(self):
+        # restarts in workers are seeded with phase seeds of the master seed drawn by fit
+        def make_analyzer():
+            return self.analyzer(SimulatedAnnealingAnalyzer, steps=300)
+
+        result = make_analyzer().fit(self.crypttext, ngrams=3, phases=3, workers=2, checkpoint=self.checkpoint)
+        expected = make_analyzer().fit(self.crypttext, ngrams=3, phases=3,
+                                       seed=FitCheckpoint.load(self.checkpoint).seed)
+        self.assertEqual(expected.best_keys, result.best_keys)
+        self.assertAlmostEqual(expected.best_score, result.best_score)
@@ -0,0 +1,58 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from crypto.analysis.language.compiled import CompiledGrams, cache_path
+from crypto.analysis.language.frequency import GramStat
+
+FILES = Path(__file__).parent / "files" / "english"
+
+
+class TestCompiledGrams(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.root = Path(tempfile.mkdtemp())
+        self.path = self.root / "english_bigrams.txt"
+        shutil.copy(FILES / "english_bigrams.txt", self.path)
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.root)
+
+    def test_compiled_matches_parsed(self):
+        parsed = GramStat.from_file(self.path, sort=True)
+        compiled = GramStat.from_file(self.path, sort=True, cache=True)
+        self.assertTrue(cache_path(self.path, sort=True).exists())
+        cached = GramStat.from_file(self.path, sort=True, cache=True)
+        self.assertIsInstance(cached.ngrams, CompiledGrams)
+        for stat in (compiled, cached):
+            self.assertEqual(list(parsed.keys()), list(stat.keys()))
+            self.assertEqual(parsed["TH"], stat["TH"])
+            self.assertEqual(parsed.min_frequency, stat.min_frequency)
+            self.assertEqual(parsed.max_frequency, stat.max_frequency)
+
+    def test_stale_artifacts_are_removed(self):
+        GramStat.from_file(self.path, sort=True, cache=True)
+        old_path = cache_path(self.path, sort=True)
+        with self.path.open("a") as f:
+            f.write("ZZ 1\n")
+        GramStat.from_file(self.path, sort=True, cache=True)
+        self.assertNotEqual(old_path, cache_path(self.path, sort=True))
+        self.assertEqual([cache_path(self.path, sort=True)], list(self.root.glob("*.npy")))
+
+    def test_artifacts_of_other_options_are_kept(self):
+        for _ in range(2):
+            GramStat.from_file(self.path, cache=True)
+            GramStat.from_file(self.path, mapping={"Q": "K"}, cache=True)
+        expected = {cache_path(self.path), cache_path(self.path, mapping={"Q": "K"})}
+        self.assertEqual(expected, set(self.root.glob("*.npy")))
+
+    def test_removed_artifact_is_compiled_again(self):
+        compiled = GramStat.from_file(self.path, cache=True)
+        cache_path(self.path).unlink()
+        self.assertEqual(compiled["TH"], GramStat.from_file(self.path, cache=True)["TH"])
+        self.assertTrue(cache_path(self.path).exists())
+
+    def test_cache_key_depends_on_options(self):
+        self.assertNotEqual(cache_path(self.path, sort=True), cache_path(self.path, sort=False))
+        self.assertNotEqual(cache_path(self.path), cache_path(self.path, mapping={"Q": "K"}))
@@ -0,0 +1,77 @@
+import random
+import unittest
+from pathlib import Path
+
+from crypto.analysis.language.frequency import Language, ngram_fitness
+from crypto.analysis.language.incremental import IncrementalScorer
+from crypto.analysis.language.utils import abs_loss, fast_ngram_fitness, log_loss
+
+
+class TestFastNgramFitness(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.language = Language("english", Path(__file__).parent / "files" / "english")
+
+    def test_same_loss_as_ngram_fitness(self):
+        rng = random.Random(42)
+        texts = ["DEFENDTHEEASTWALLOFTHECASTLE", "TSEHVAIESSRYIYQ", "AAAA", "THE-END--OF-THE-TEXT"]
+        texts += ["".join(rng.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ-") for _ in range(200)) for _ in range(5)]
+        for text in texts:
+            for n in range(1, 5):
+                for loss in (log_loss, abs_loss):
+                    _, expected = ngram_fitness(text, n=n, language=self.language, loss=loss)
+                    self.assertAlmostEqual(expected, fast_ngram_fitness(text, n=n, language=self.language, loss=loss))
+
+    def test_encoded_data(self):
+        text = "DEFENDTHEEASTWALLOFTHECASTLE"
+        self.assertEqual(fast_ngram_fitness(text, n=3, language=self.language, loss=log_loss),
+                         fast_ngram_fitness(self.language.encode(text), n=3, language=self.language, loss=log_loss))
+
+    def test_fallback_loss(self):
+        def count_loss(predicted, actual):
+            return float(len(predicted.ngrams))
+
+        self.assertEqual(3.0, fast_ngram_fitness("ABCAB", n=2, language=self.language, loss=count_loss))
+        with self.assertRaises(ValueError):
+            fast_ngram_fitness(self.language.encode("ABCAB"), n=2, language=self.language, loss=count_loss)
+
+
+class TestIncrementalScorer(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.language = Language("english", Path(__file__).parent / "files" / "english")
+
+    def test_propose_and_commit(self):
+        text = "DEFENDTHEEASTWALLOFTHECASTLE-AT-DAWN"
+        for loss in (log_loss, abs_loss):
+            scorer = IncrementalScorer(self.language.table(4), self.language.encode(text), loss=loss)
+            for left, right in ((0, 5), (3, 4), (10, 28), (0, len(text) - 1)):
+                chars = list(text)
+                chars[left], chars[right] = chars[right], chars[left]
+                swapped = "".join(chars)
+                expected = fast_ngram_fitness(swapped, n=4, language=self.language, loss=loss)
+                values = scorer.codes[[right, left]]
+                self.assertAlmostEqual(expected, scorer.propose([left, right], values))
+                self.assertAlmostEqual(expected, scorer.commit([left, right], values))
+                text = swapped
+
+    def test_propose_exchanges(self):
+        text = "DEFENDTHEEASTWALLOFTHECASTLE-AT-DAWN"
+        exchanges = [("E", "T"), ("A", "Z"), ("D", "W"), ("Q", "X")]
+        for loss in (log_loss, abs_loss):
+            scorer = IncrementalScorer(self.language.table(4), self.language.encode(text), loss=loss)
+            first, second, windows, owners, expected = [], [], [], [], []
+            for index, (a, b) in enumerate(exchanges):
+                first.append(self.language.encode(a)[0])
+                second.append(self.language.encode(b)[0])
+                starts = scorer.windows([position for position, char in enumerate(text) if char in (a, b)])
+                windows.extend(starts.tolist())
+                owners.extend([index] * len(starts))
+                exchanged = text.translate(str.maketrans(a + b, b + a))
+                expected.append(fast_ngram_fitness(exchanged, n=4, language=self.language, loss=loss))
+            losses = scorer.propose_exchanges(first, second, windows, owners)
+            for expected_loss, exchange_loss in zip(expected, losses.tolist()):
+                self.assertAlmostEqual(expected_loss, exchange_loss)
+            self.assertAlmostEqual(fast_ngram_fitness(text, n=4, language=self.language, loss=loss), scorer.loss)
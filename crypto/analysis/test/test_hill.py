@@ -0,0 +1,96 @@
+import unittest
+from pathlib import Path
+
+from crypto.algo.transpositions import DoubleTranspositionCipher
+from crypto.analysis.hill import HillClimbingAnalyzer
+from crypto.analysis.language.frequency import Language
+from crypto.analysis.language.utils import abs_loss, log_loss
+from crypto.analysis.transposition import TranspositionKeyGenerator
+from crypto.utils import to_df
+
+CRYPTTEXT = ("TNOSSKAIMAGAEITMHETHTSRH--IHEU-D-NUEIDSATDTDDSARAHHENTTTDSOUIOEART"
+             "FHDAOMWYWFERTNEONFDYAHSEIMEDGRWTATISURUARTHJ")
+
+
+class TestHillClimbingAnalyzer(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.language = Language("english", Path(__file__).parent / "files" / "english")
+        cls.crypttext = to_df(CRYPTTEXT, (10, 11))
+
+    def analyzer(self, **kwargs) -> HillClimbingAnalyzer:
+        key_generator = TranspositionKeyGenerator(list(range(11)), linked_groups=[[-1, -2]])
+        return HillClimbingAnalyzer(DoubleTranspositionCipher(), key_generator=key_generator, key_argname="k2",
+                                    language=self.language, **kwargs)
+
+    def test_phase_modes_agree(self):
+        starting_key = [6, 2, 5, 0, 8, 3, 1, 7, 4, 9, 10]
+        for loss in (log_loss, abs_loss):
+            key, loss_value = self.analyzer(loss_fn=loss).hill_climbing_phase(self.crypttext, starting_key, n=3)
+            for kwargs in ({"vectorized": True}, {"delta": True}, {"batch_size": 16}, {"batch_size": 1000}):
+                other_key, other_loss = self.analyzer(loss_fn=loss, **kwargs).hill_climbing_phase(
+                    self.crypttext, starting_key, n=3)
+                self.assertEqual(key, other_key)
+                self.assertAlmostEqual(loss_value, other_loss)
+
+    def test_best_improvement_batches(self):
+        analyzer = self.analyzer(batch_size=1, best_improvement=True)
+        starting_key = [6, 2, 5, 0, 8, 3, 1, 7, 4, 9, 10]
+        starting_loss = analyzer.score(self.crypttext, starting_key, n=3)
+        key, loss = analyzer.hill_climbing_round(self.crypttext, starting_key, current_loss=starting_loss, n=3)
+        losses = [analyzer.score(self.crypttext, k, n=3) for k in analyzer.key_generator.hill_climbing(starting_key)]
+        self.assertAlmostEqual(min(losses), loss)
+
+    def test_best_keys_are_distinct(self):
+        # restarts of this seed climb to the same key
+        for workers in (None, 2):
+            result = self.analyzer(batch_size=64, best_improvement=True).fit(self.crypttext, ngrams=3, phases=8,
+                                                                               seed=3, workers=workers)
+            self.assertEqual(1, len(result.best_keys))
+
+    def test_neighbourhood_matches_hill_climbing(self):
+        key_generator = TranspositionKeyGenerator(list(range(11)), linked_groups=[[-1, -2]])
+        key = [6, 2, 5, 0, 8, 3, 1, 7, 4, 9, 10]
+        self.assertEqual(list(key_generator.hill_climbing(key)), key_generator.neighbourhood(key).tolist())
+
+    def test_parallel_restarts_are_reproducible(self):
+        serial = self.analyzer(delta=True).fit(self.crypttext, ngrams=3, phases=20, seed=7)
+        parallel = self.analyzer(delta=True).fit(self.crypttext, ngrams=3, phases=20, seed=7, workers=2)
+        self.assertEqual(serial.best_keys, parallel.best_keys)
+        self.assertEqual(serial.best_score, parallel.best_score)
+
+    def test_phase_seeds(self):
+        self.assertEqual(HillClimbingAnalyzer.phase_seeds(7, 5), HillClimbingAnalyzer.phase_seeds(7, 5))
+        unseeded = HillClimbingAnalyzer.phase_seeds(None, 5)
+        self.assertEqual(5, len(set(unseeded)))
+        self.assertNotEqual(unseeded, HillClimbingAnalyzer.phase_seeds(None, 5))
+
+    def test_score_cache(self):
+        plain = self.analyzer(vectorized=True)
+        cached = self.analyzer(vectorized=True, cache_size=10_000)
+        expected = plain.fit(self.crypttext, ngrams=3, phases=20, seed=7)
+        result = cached.fit(self.crypttext, ngrams=3, phases=20, seed=7)
+        self.assertEqual(expected.best_keys, result.best_keys)
+        self.assertAlmostEqual(expected.best_score, result.best_score)
+        self.assertGreater(cached.cache.hits, 0)
+        self.assertEqual(cached.cache.misses, cached.evaluations)
+        self.assertLess(cached.evaluations, plain.evaluations)
+
+    def test_fit_after_in_place_edit(self):
+        crypttext = self.crypttext.copy()
+        analyzer = self.analyzer(vectorized=True, cache_size=1000)
+        analyzer.fit(crypttext, ngrams=3, phases=2, seed=1)
+        crypttext.iloc[:, :] = to_df(CRYPTTEXT[::-1], (10, 11)).values
+        result = analyzer.fit(crypttext, ngrams=3, phases=2, seed=1)
+        for key in result.best_keys:
+            self.assertAlmostEqual(result.best_score, self.analyzer().score(to_df(CRYPTTEXT[::-1], (10, 11)), key, 3))
+
+    def test_empty_neighbourhood(self):
+        key_generator = TranspositionKeyGenerator([0, 1, 2], linked_groups=[[0, 1, 2]])
+        crypttext = to_df(CRYPTTEXT[:30], (10, 3))
+        for kwargs in ({}, {"batch_size": 8}, {"batch_size": 8, "best_improvement": True}):
+            analyzer = HillClimbingAnalyzer(DoubleTranspositionCipher(), key_generator=key_generator, key_argname="k2",
+                                            language=self.language, vectorized=True, **kwargs)
+            result = analyzer.fit(crypttext, ngrams=3, phases=2, seed=1)
+            self.assertEqual([[0, 1, 2]], result.best_keys[:1])
@@ -0,0 +1,69 @@
+import pickle
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from crypto.analysis.language.frequency import Language
+
+FILES = Path(__file__).parent / "files" / "english"
+
+
+class TestLanguage(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.root = Path(tempfile.mkdtemp())
+        for name in ("english.json", "english_monograms.txt", "english_bigrams.txt"):
+            shutil.copy(FILES / name, self.root / name)
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.root)
+
+    def test_orders_are_loaded_lazily(self):
+        language = Language("english", self.root, cache=False)
+        self.assertEqual({}, language.grams)
+        self.assertIn("E", language[1].keys())
+        self.assertEqual(["monograms"], list(language.grams))
+        self.assertIs(language[1], language["monograms"])
+
+    def test_missing_orders_are_unavailable(self):
+        language = Language("english", self.root, cache=False)
+        self.assertEqual(["monograms", "bigrams"], language.available_grams)
+        self.assertIn(2, language)
+        self.assertNotIn(3, language)
+        self.assertNotIn("pentagrams", language)
+        with self.assertRaises(KeyError):
+            language.table("trigrams")
+
+    def test_preload(self):
+        language = Language("english", self.root, cache=False).preload()
+        self.assertEqual(["monograms", "bigrams"], list(language.tables))
+        language = Language("english", self.root, cache=False).preload(2)
+        self.assertEqual(["bigrams"], list(language.tables))
+
+    def test_shared_tables(self):
+        published = Language("english", self.root, cache=False)
+        shared_root = published.publish(self.root / "shared")
+        language = Language("english", self.root, cache=False, shared_root=shared_root)
+        table = language.table(2)
+        self.assertIsInstance(table.frequencies, np.memmap)
+        np.testing.assert_array_equal(published.table(2).frequencies, table.frequencies)
+        # only monograms are loaded (to verify the alphabet), bigram statistics are not needed
+        self.assertEqual(["monograms"], list(language.grams))
+        received = pickle.loads(pickle.dumps(language))
+        self.assertEqual({}, received.tables)
+        self.assertEqual(["monograms"], list(received.grams))
+        self.assertIsInstance(received.table(2).frequencies, np.memmap)
+
+    def test_shared_tables_are_verified(self):
+        shared_root = Language("english", self.root, cache=False).publish(self.root / "shared")
+        with self.assertRaises(ValueError):
+            Language("english", self.root, cache=False, mapping={"Q": "K"}, shared_root=shared_root).table(2)
+        with self.assertRaises(ValueError):
+            Language("english", self.root, cache=False, percentage=False, shared_root=shared_root).table(2)
+        # tables of an unfinished publish are not attached
+        (shared_root / "english.published.json").unlink()
+        table = Language("english", self.root, cache=False, shared_root=shared_root).table(2)
+        self.assertNotIsInstance(table.frequencies, np.memmap)
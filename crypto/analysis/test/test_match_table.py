@@ -0,0 +1,38 @@
+import itertools
+import unittest
+
+from crypto.language import ENGLISH_FREQUENCY_TABLE, assign_table, match_table, ranked_mappings
+
+
+class TestMatchTable(unittest.TestCase):
+
+    def test_match_table(self):
+        a = {"X": 0.5, "Y": 0.3, "Z": 0.2}
+        b = {"A": 0.52, "B": 0.31, "C": 0.29, "D": 0.01}
+        mapping = match_table(a, b, rtol=0.05, atol=0.01)
+        self.assertEqual(["A"], mapping["X"])
+        self.assertEqual(["C", "B"], mapping["Y"])
+        with self.assertLogs("crypto.language", level="WARNING"):
+            self.assertEqual([], match_table({"Z": 0.2}, b)["Z"])
+
+    def test_assign_table_is_optimal(self):
+        a = {"X": 0.5, "Y": 0.3, "Z": 0.1}
+        b = {"A": 0.55, "B": 0.35, "C": 0.3, "D": 0.05}
+        distance = lambda mapping: sum(abs(a[key] - b[value]) for key, value in mapping.items())
+        best = min(distance(dict(zip(a, values))) for values in itertools.permutations(b, len(a)))
+        mapping = assign_table(a, b)
+        self.assertAlmostEqual(best, distance(mapping))
+        self.assertEqual({"X": "A", "Y": "C", "Z": "D"}, mapping)
+        # letters of a larger table are left out
+        self.assertEqual({value: key for key, value in mapping.items()}, assign_table(b, a))
+
+    def test_ranked_mappings(self):
+        candidates = ranked_mappings(ENGLISH_FREQUENCY_TABLE, ENGLISH_FREQUENCY_TABLE, count=10)
+        self.assertEqual(10, len(candidates))
+        self.assertEqual((0.0, {letter: letter for letter in ENGLISH_FREQUENCY_TABLE}), candidates[0])
+        distances = [distance for distance, _ in candidates]
+        self.assertEqual(sorted(distances), distances)
+        for distance, mapping in candidates:
+            self.assertEqual(sorted(ENGLISH_FREQUENCY_TABLE), sorted(mapping.values()))
+            self.assertAlmostEqual(distance, sum(abs(ENGLISH_FREQUENCY_TABLE[key] - ENGLISH_FREQUENCY_TABLE[value])
+                                                 for key, value in mapping.items()))
@@ -0,0 +1,64 @@
+import io
+import json
+import pickle
+import unittest
+from pathlib import Path
+
+from crypto.algo.transpositions import DoubleTranspositionCipher
+from crypto.analysis.caesar import CaesarAnalyzer
+from crypto.analysis.hill import HillClimbingAnalyzer
+from crypto.analysis.language.frequency import Language
+from crypto.analysis.metrics import AnalyzerMetrics
+from crypto.analysis.test.test_hill import CRYPTTEXT
+from crypto.analysis.transposition import TranspositionKeyGenerator
+from crypto.utils import to_df
+
+
+class TestAnalyzerMetrics(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.language = Language("english", Path(__file__).parent / "files" / "english")
+        cls.crypttext = to_df(CRYPTTEXT, (10, 11))
+
+    def analyzer(self, **kwargs) -> HillClimbingAnalyzer:
+        key_generator = TranspositionKeyGenerator(list(range(11)), linked_groups=[[-1, -2]])
+        return HillClimbingAnalyzer(DoubleTranspositionCipher(), key_generator=key_generator, key_argname="k2",
+                                    language=self.language, vectorized=True, **kwargs)
+
+    def test_hill_climbing_counters(self):
+        output = io.StringIO()
+        analyzer = self.analyzer(cache_size=1000, metrics=AnalyzerMetrics(output=output, label="test"))
+        result = analyzer.fit(self.crypttext, ngrams=3, phases=5, seed=1)
+        metrics = result.metrics
+        self.assertIs(analyzer.metrics, metrics)
+        self.assertEqual(4, metrics.restarts)
+        self.assertGreater(metrics.improvements, 0)
+        self.assertGreater(metrics.cache_hits, 0)
+        self.assertEqual(analyzer.evaluations, metrics.evaluations)
+        self.assertEqual(analyzer.evaluations, metrics.decrypts)
+        self.assertGreater(metrics.cipher_time, 0)
+        self.assertGreater(metrics.scoring_time, 0)
+        report = json.loads(output.getvalue().splitlines()[-1])
+        self.assertEqual("test", report["label"])
+        self.assertEqual(metrics.scores, report["scores"])
+        self.assertGreater(report["evaluations_per_second"], 0)
+
+    def test_worker_counters_are_merged(self):
+        serial = self.analyzer(metrics=AnalyzerMetrics()).fit(self.crypttext, ngrams=3, phases=4, seed=1)
+        parallel = self.analyzer(metrics=AnalyzerMetrics()).fit(self.crypttext, ngrams=3, phases=4, seed=1, workers=2)
+        for name in ("decrypts", "scores", "improvements", "restarts"):
+            self.assertEqual(getattr(serial.metrics, name), getattr(parallel.metrics, name), name)
+
+    def test_disabled_by_default(self):
+        result = self.analyzer().fit(self.crypttext, ngrams=3, phases=1)
+        self.assertIsNone(result.metrics)
+
+    def test_pickle_drops_output(self):
+        metrics = pickle.loads(pickle.dumps(AnalyzerMetrics(scores=3, output=io.StringIO())))
+        self.assertEqual(3, metrics.scores)
+        self.assertIsNone(metrics.output)
+
+    def test_caesar_scores(self):
+        result = CaesarAnalyzer(self.language, metrics=AnalyzerMetrics()).fit("WKHTXLFNEURZQ")
+        self.assertEqual(len(self.language.alphabet), result.metrics.scores)
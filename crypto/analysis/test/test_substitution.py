@@ -0,0 +1,56 @@
+import unittest
+from pathlib import Path
+
+from crypto.analysis.language.frequency import Language
+from crypto.analysis.language.utils import fast_ngram_fitness, log_loss
+from crypto.analysis.substitution import SubstitutionAnalyzer
+
+CRYPTTEXT = ("EMGLOSUDCGDNCUSWYSFHNSFCYKDPUMLWGYICOXYSIPJCKQPKUGKMGOLICGINCGACKSNISACYKZSCKXECJCKSHYSXCG"
+             "OIDPKZCNKSHICGIWYGKKGKGOLDSILKGOIUSIGLEDSPWZUGFZCCNDGYYSFUSZCNXEOJNCGYEOWEUPXEZGACGNFGLKNS"
+             "ACIGOIYCKXCJUCIUZCFZCCNDGYYSFEUEKUZCSOCFZCCNCIACZEJNCSHFZEJZEGMXCYHCJUMGKUCY")
+
+
+class TestSubstitutionAnalyzer(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.language = Language("english", Path(__file__).parent / "files" / "english")
+
+    def test_letter_positions(self):
+        analyzer = SubstitutionAnalyzer(self.language)
+        codes = self.language.encode("ABA-C")
+        positions = analyzer.letter_positions(codes)
+        self.assertEqual([0, 2], positions[0].tolist())
+        self.assertEqual([1], positions[1].tolist())
+        self.assertEqual([4], positions[2].tolist())
+        self.assertEqual(0, len(positions[3]))
+
+    def test_key_mapping_roundtrip(self):
+        analyzer = SubstitutionAnalyzer(self.language)
+        key = "QWERTYUIOPASDFGHJKLZXCVBNM"
+        self.assertEqual(key, analyzer.key(analyzer.mapping(key)))
+
+    def test_decrypt_keeps_other_symbols(self):
+        analyzer = SubstitutionAnalyzer(self.language)
+        key = "QWERTYUIOPASDFGHJKLZXCVBNM"
+        crypttext = analyzer.cipher.encrypt("HELLOWORLD", key)
+        self.assertEqual(analyzer.cipher.decrypt(crypttext, key), analyzer.decrypt(crypttext, key))
+        self.assertEqual("HELLO, WORLD!", analyzer.decrypt(f"{crypttext[:5].lower()}, {crypttext[5:]}!", key))
+
+    def test_fit(self):
+        analyzer = SubstitutionAnalyzer(self.language)
+        result = analyzer.fit(CRYPTTEXT, ngrams=4, phases=5, seed=1)
+        for key in result.best_keys:
+            plaintext = analyzer.decrypt(CRYPTTEXT, key)
+            self.assertTrue(plaintext.startswith("IMAYNOTBEABLETOGROWFLOWERS"))
+            self.assertAlmostEqual(result.best_score, fast_ngram_fitness(plaintext, n=4, language=self.language,
+                                                                         loss=log_loss))
+
+    def test_fit_from_ranked_frequency_matches(self):
+        analyzer = SubstitutionAnalyzer(self.language)
+        codes = self.language.encode(CRYPTTEXT)
+        mappings = analyzer.frequency_mappings(codes, count=5)
+        self.assertEqual(5, len(mappings))
+        self.assertEqual(5, len({tuple(mapping.tolist()) for mapping in mappings}))
+        result = analyzer.fit(CRYPTTEXT, ngrams=4, phases=5, seed=1, frequency_starts=5)
+        self.assertTrue(analyzer.decrypt(CRYPTTEXT, result.best_keys[0]).startswith("IMAYNOTBEABLETOGROWFLOWERS"))
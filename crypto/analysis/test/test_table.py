@@ -0,0 +1,58 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from crypto.analysis.language.frequency import Language
+from crypto.analysis.language.table import NGramTable
+
+
+class TestNGramTable(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.language = Language("english", Path(__file__).parent / "files" / "english")
+
+    def test_lookup_matches_gram_stat(self):
+        text = "THEQUICKBROWNFOXJUMPSOVERTHELAZYDOGQZQZ"
+        for n in range(1, 5):
+            stat, table = self.language[n], self.language.table(n)
+            indices = table.ngram_indices(self.language.encode(text))
+            expected = [stat.get(text[i:i + n], stat.min_frequency[1]) for i in range(len(text) - n + 1)]
+            np.testing.assert_array_equal(expected, table.lookup(indices))
+            np.testing.assert_allclose(np.log(expected), table.log_lookup(indices))
+
+    def test_out_of_alphabet_symbols(self):
+        table = self.language.table(2)
+        codes = self.language.encode("A-B_A-")
+        self.assertEqual(codes[1], codes[5])
+        self.assertNotEqual(codes[1], codes[3])
+        self.assertTrue(np.all(codes[[1, 3]] >= len(table.symbols)))
+        self.assertTrue(np.all(table.ngram_indices(codes) == -1))
+        np.testing.assert_array_equal(table.lookup(table.ngram_indices(codes)), table.floor)
+
+    def test_sparse_matches_dense(self):
+        stat = self.language[3]
+        dense = self.language.table(3)
+        sparse = NGramTable.from_grams(stat.ngrams, n=3, symbols=self.language.alphabet,
+                                       floor=stat.min_frequency[1], max_dense_size=0)
+        self.assertFalse(sparse.dense)
+        indices = dense.ngram_indices(self.language.encode("THEZZQXQJAND-THE"))
+        np.testing.assert_array_equal(dense.lookup(indices), sparse.lookup(indices))
+        np.testing.assert_array_equal(dense.log_lookup(indices), sparse.log_lookup(indices))
+
+    def test_save_load(self):
+        stat = self.language[3]
+        sparse = NGramTable.from_grams(stat.ngrams, n=3, symbols=self.language.alphabet,
+                                       floor=stat.min_frequency[1], max_dense_size=0)
+        with tempfile.TemporaryDirectory() as root:
+            for table in (self.language.table(2), sparse):
+                prefix = Path(root) / f"table_{table.dense}"
+                table.save(prefix)
+                loaded = NGramTable.load(prefix)
+                self.assertIsInstance(loaded.frequencies, np.memmap)
+                self.assertEqual((table.n, table.symbols, table.floor, table.dense),
+                                 (loaded.n, loaded.symbols, loaded.floor, loaded.dense))
+                indices = table.ngram_indices(self.language.encode("THEZZQXQJAND-THE"))
+                np.testing.assert_array_equal(table.log_lookup(indices), loaded.log_lookup(indices))
@@ -0,0 +1,43 @@
+import unittest
+from pathlib import Path
+
+from crypto.algo.transpositions import DoubleTranspositionCipher
+from crypto.analysis.language.frequency import Language
+from crypto.analysis.tabu import TabuSearchAnalyzer
+from crypto.analysis.test.test_hill import CRYPTTEXT
+from crypto.analysis.transposition import TranspositionKeyGenerator
+from crypto.utils import to_df
+
+
+class TestTabuSearchAnalyzer(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.language = Language("english", Path(__file__).parent / "files" / "english")
+        cls.crypttext = to_df(CRYPTTEXT, (10, 11))
+
+    def analyzer(self, **kwargs) -> TabuSearchAnalyzer:
+        key_generator = TranspositionKeyGenerator(list(range(11)), linked_groups=[[-1, -2]])
+        return TabuSearchAnalyzer(DoubleTranspositionCipher(), key_generator=key_generator, key_argname="k2",
+                                  language=self.language, iterations=30, **kwargs)
+
+    def test_distinct_swaps(self):
+        swaps = self.analyzer().distinct_swaps(list(range(11)))
+        self.assertEqual(9 * 8 // 2, len(swaps))
+        self.assertTrue(all(i < j for i, j in swaps))
+
+    def test_phase_modes_agree(self):
+        starting_key = [6, 2, 5, 0, 8, 3, 1, 7, 4, 9, 10]
+        key, loss = self.analyzer().tabu_phase(self.crypttext, starting_key, n=3)
+        self.assertLess(loss, self.analyzer().score(self.crypttext, starting_key, n=3))
+        for kwargs in ({"vectorized": True}, {"delta": True}, {"batch_size": 16}):
+            other_key, other_loss = self.analyzer(**kwargs).tabu_phase(self.crypttext, starting_key, n=3)
+            self.assertEqual(key, other_key)
+            self.assertAlmostEqual(loss, other_loss)
+
+    def test_escapes_hill_climbing_optimum(self):
+        analyzer = self.analyzer(delta=True)
+        starting_key = [6, 2, 5, 0, 8, 3, 1, 7, 4, 9, 10]
+        hill_key, hill_loss = analyzer.hill_climbing_phase(self.crypttext, starting_key, n=3)
+        key, loss = analyzer.tabu_phase(self.crypttext, hill_key, n=3, starting_loss=hill_loss)
+        self.assertLess(loss, hill_loss)
@@ -0,0 +1,47 @@
+import json
+import unittest
+
+from crypto.analysis.transposition import TranspositionKeyGenerator
+
+
+class TestTranspositionKeyGenerator(unittest.TestCase):
+
+    def generator(self, seed=3, **kwargs) -> TranspositionKeyGenerator:
+        kwargs = {"linked_groups": [[0, 1], [-1, -2]], "permutation_indices": range(2, 9), **kwargs}
+        return TranspositionKeyGenerator(list(range(11)), seed=seed, **kwargs)
+
+    def test_sample_honors_constraints(self):
+        for outer in (False, True):
+            generator = self.generator(shuffle_linked_groups_outer=outer)
+            keys = generator.sample(200)
+            self.assertEqual((200, 11), keys.shape)
+            for key in keys.tolist():
+                self.assertEqual(list(range(11)), sorted(key))
+                # linked groups keep relative positions of their elements
+                self.assertEqual(key.index(0) + 1, key.index(1))
+                self.assertEqual(key.index(9) + 1, key.index(10))
+                if not outer:
+                    self.assertEqual([0, 1, 9, 10], key[-4:])
+            self.assertGreater(len({tuple(key) for key in keys.tolist()}), 150)
+
+    def test_reproducible(self):
+        keys = self.generator().sample(20)
+        self.assertEqual(keys.tolist(), self.generator().sample(20).tolist())
+        generator = self.generator()
+        self.assertEqual(keys.tolist(), [next(generator) for _ in range(20)])
+        generator.seed(3)
+        self.assertEqual(keys.tolist(), generator.sample(20).tolist())
+
+    def test_state(self):
+        generator = self.generator()
+        next(generator)
+        state = json.loads(json.dumps(generator.get_state()))
+        keys = generator.sample(5)
+        other = self.generator(seed=4)
+        other.set_state(state)
+        self.assertEqual(keys.tolist(), other.sample(5).tolist())
+
+    def test_spawn(self):
+        streams = [generator.sample(10).tolist() for generator in self.generator().spawn(3)]
+        self.assertEqual(streams, [generator.sample(10).tolist() for generator in self.generator().spawn(3)])
+        self.assertEqual(3, len({str(stream) for stream in streams}))
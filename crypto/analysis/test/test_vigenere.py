@@ -1,7 +1,7 @@
 import unittest
 from pathlib import Path
 
-from crypto.analysis.language.frequency import Language
+from crypto.analysis.language.frequency import Language, coincidence_index
 from crypto.analysis.vigenere import VigenereAnalyzer
 
 
@@ -27,3 +27,31 @@ class TestCaesarAnalyzer(unittest.TestCase):
                               "PEEWEVKAKOEWADREMXMTBHHCHRTKDNVRZCHRCLQOHP"
                               "WQAIIWXNRMGWOIIFKEE")
         self.assertIn("JANET", result.best_keys)
+
+
+class TestVigenereKeyLengths(unittest.TestCase):
+    CRYPTTEXT = ("QPWKALVRXCQZIKGRBPFAEOMFLJMSDZVDHXCXJYEBIMTRQWNMEA"
+                 "IZRVKCVKVLXNEICFZPZCZZHKMLVZVZIZRRQWDKECHOSNYXXLSP"
+                 "MYKVQXJTDCIOMEEXDQVSRXLRLKZHOV")
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.analyzer = VigenereAnalyzer(Language("english", Path(__file__).parent / "files" / "english"))
+
+    def test_fit_lengths_match_coincidence_index(self):
+        lengths = self.analyzer.fit_lengths(self.CRYPTTEXT, min_key_length=1, max_key_length=12)
+        self.assertEqual(list(range(1, 13)), sorted(lengths))
+        for key_length, index in lengths.items():
+            indices = [coincidence_index(self.CRYPTTEXT[i::key_length], language=None) for i in range(key_length)]
+            self.assertAlmostEqual(sum(indices) / len(indices), index)
+        self.assertEqual(sorted(lengths.values(), reverse=True), list(lengths.values()))
+
+    def test_autocorrelation_lengths(self):
+        lengths = self.analyzer.autocorrelation_lengths(self.CRYPTTEXT, min_key_length=1, max_key_length=12)
+        for key_length, rate in lengths.items():
+            matches = sum(a == b for a, b in zip(self.CRYPTTEXT, self.CRYPTTEXT[key_length:]))
+            self.assertAlmostEqual(matches / (len(self.CRYPTTEXT) - key_length), rate)
+
+    def test_fit_with_autocorrelation(self):
+        result = self.analyzer.fit(self.CRYPTTEXT, length_estimator="autocorrelation")
+        self.assertIn("EVERY", result.best_keys)
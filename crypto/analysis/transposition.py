@@ -1,6 +1,8 @@
+import copy
 import itertools
-import random
-from typing import Tuple, List, Iterator, Iterable, Set, Any
+from typing import Tuple, Dict, List, Iterator, Iterable, Set, Any, Optional, Union
+
+import numpy as np
 
 from crypto.analysis.base import BaseKeyGenerator
 from crypto.utils import swap_elements
@@ -32,6 +34,9 @@ class TranspositionKeyGenerator(BaseKeyGenerator):
     Note: restrictions on those indices apply:
     - should not intersect with linked groups
     - linked groups and permutation indices should produce a list of all indices
+
+    :param seed: seed (or numpy SeedSequence) of the numpy random generator owned by the key generator,
+    keys produced with the same seed are the same
     """
 
     @classmethod
@@ -75,7 +80,7 @@ class TranspositionKeyGenerator(BaseKeyGenerator):
 
     def __init__(self, initial_key: List[int], linked_groups: List[Iterable[int]] = None,
                  permutation_indices: Iterable[int] = None,
-                 shuffle_linked_groups_outer: bool = False):
+                 shuffle_linked_groups_outer: bool = False, seed: Union[int, np.random.SeedSequence] = None):
         self._initial_key = initial_key
         self.linked_groups = linked_groups
         self.permutation_indices = permutation_indices
@@ -84,29 +89,89 @@ class TranspositionKeyGenerator(BaseKeyGenerator):
         self.permutation_indices = self._verify_permutation_indices(self.initial_key,
                                                                     self.permutation_indices,
                                                                     self.linked_groups)
+        self.seed(seed)
+        # layout of shuffled blocks in keys: elements, their blocks and offsets in blocks
+        blocks, self._tail = self.blocks()
+        self._block_lengths = np.array([len(block) for block in blocks], dtype=np.int64)
+        self._elements = np.array([element for block in blocks for element in block], dtype=np.int64)
+        self._element_blocks = np.repeat(np.arange(len(blocks)), self._block_lengths)
+        self._element_offsets = (np.arange(len(self._elements))
+                                 - np.repeat(np.cumsum(self._block_lengths) - self._block_lengths, self._block_lengths))
 
     @property
     def initial_key(self) -> Any:
         return self._initial_key
 
+    def seed(self, seed: Union[int, np.random.SeedSequence, None]):
+        self._seed_sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        self.random = np.random.default_rng(self._seed_sequence)
+
+    def spawn(self, count: int) -> List['TranspositionKeyGenerator']:
+        generators = []
+        for seed_sequence in self._seed_sequence.spawn(count):
+            generator = copy.copy(self)
+            generator.seed(seed_sequence)
+            generators.append(generator)
+        return generators
+
+    def constraints(self) -> Dict[str, Any]:
+        blocks, tail = self.blocks()
+        return {"blocks": [[int(element) for element in block] for block in blocks],
+                "tail": [int(element) for element in tail]}
+
+    def get_state(self) -> Any:
+        return self.random.bit_generator.state
+
+    def set_state(self, state: Any):
+        self.random.bit_generator.state = state
+
     def __iter__(self) -> Iterator[List[int]]:
         return self
 
+    def blocks(self) -> Tuple[List[List[int]], List[int]]:
+        """
+        Structure of produced keys: blocks of key elements shuffled as units
+        (single permuted elements and, with shuffle_linked_groups_outer, linked groups)
+        and the fixed tail of linked groups appended after them
+        """
+        blocks = [[self.initial_key[idx] for idx in (element if not isinstance(element, int) else [element])]
+                  for element in [*self.permutation_indices,
+                                  *(self.linked_groups if self.shuffle_linked_groups_outer else [])]]
+        tail = ([self.initial_key[idx] for group in self.linked_groups for idx in group]
+                if not self.shuffle_linked_groups_outer else [])
+        return blocks, tail
+
     def __next__(self) -> List[int]:
-        shuffling_elements = [*self.permutation_indices,
-                              *(self.linked_groups if self.shuffle_linked_groups_outer else [])]
-        random.shuffle(shuffling_elements)
-        return [
-            self.initial_key[idx]
-            for sublist in shuffling_elements
-            for idx in (sublist if not isinstance(sublist, int) else [sublist])
-        ] + (
-            [self.initial_key[idx] for group in self.linked_groups for idx in group]
-            if not self.shuffle_linked_groups_outer else []
-        )
+        return self.sample(1)[0].tolist()
+
+    def sample(self, count: int) -> np.ndarray:
+        """
+        Random keys as rows of a two dimensional array, the same keys as count calls of next.
+
+        Every row orders blocks by uniform random numbers, elements are scattered
+        to start positions of their blocks in the row plus their offsets in blocks.
+        """
+        orders = np.argsort(self.random.random((count, len(self._block_lengths))), axis=1)
+        rows = np.arange(count)[:, None]
+        ordered_lengths = self._block_lengths[orders]
+        starts = np.empty_like(orders)
+        starts[rows, orders] = np.cumsum(ordered_lengths, axis=1) - ordered_lengths
+        keys = np.empty((count, len(self._elements) + len(self._tail)), dtype=np.int64)
+        keys[rows, starts[:, self._element_blocks] + self._element_offsets] = self._elements
+        keys[:, len(self._elements):] = self._tail
+        return keys
 
     def hill_climbing(self, key: List[int]) -> Iterator[List[int]]:
-        permutations = itertools.permutations(self.permutation_indices, 2)
         swap: Tuple[int, int]
-        for swap in permutations:
+        for swap in self.swaps(key):
             yield swap_elements(key, swap=swap)
+
+    def swaps(self, key: List[int]) -> Iterator[Tuple[int, int]]:
+        return itertools.permutations(self.permutation_indices, 2)
+
+    def neighbourhood(self, key: List[int]) -> np.ndarray:
+        swaps = np.array(list(self.swaps(key)), dtype=np.int64).reshape(-1, 2)
+        rows = np.arange(len(swaps))
+        keys = np.tile(np.asarray(key), (len(swaps), 1))
+        keys[rows, swaps[:, 0]], keys[rows, swaps[:, 1]] = keys[rows, swaps[:, 1]], keys[rows, swaps[:, 0]]
+        return keys
@@ -8,7 +8,11 @@ from typing import Union, Sequence, Dict
 from crypto.algo.vigenere import VigenereCipher
 from crypto.analysis.base import BaseAnalyzer, AnalyzerResult
 from crypto.analysis.caesar import CaesarAnalyzer
-from crypto.analysis.language.frequency import Language, coincidence_index
+from crypto.analysis.language.frequency import Language
+from crypto.analysis.metrics import AnalyzerMetrics
+from crypto.utils import to_codepoints
+
+import numpy as np
 
 
 logger = logging.getLogger(__name__)
@@ -16,8 +20,9 @@ logger = logging.getLogger(__name__)
 
 class VigenereAnalyzer(BaseAnalyzer):
 
-    def __init__(self, language: Language, default_max_key_length: int = 10):
-        self.caesar_analyzer = CaesarAnalyzer(language)
+    def __init__(self, language: Language, default_max_key_length: int = 10, metrics: AnalyzerMetrics = None):
+        self.metrics = metrics
+        self.caesar_analyzer = CaesarAnalyzer(language, metrics=metrics)
         self.vigenere_cipher = VigenereCipher(language.alphabet)
         self.default_max_key_length = default_max_key_length
 
@@ -28,17 +33,30 @@ class VigenereAnalyzer(BaseAnalyzer):
     def decrypt(self, crypttext: str, key: Union[str, Sequence[int]], **kwargs) -> str:
         return self.vigenere_cipher.decrypt(crypttext, key)
 
-    def fit(self, crypttext: str, min_key_length: int = 1, max_key_length: int = None, **kwargs) -> AnalyzerResult:
+    def fit(self, crypttext: str, min_key_length: int = 1, max_key_length: int = None,
+            length_estimator: str = "coincidence", **kwargs) -> AnalyzerResult:
+        """
+        :param length_estimator:  Order key lengths by "coincidence" (fit_lengths)
+                                  or "autocorrelation" (autocorrelation_lengths)
+        """
         if max_key_length is None:
             max_key_length = min(self.default_max_key_length, len(crypttext))
         if min_key_length < 1:
             raise ValueError("Min key length could not be less than one")
-        possible_lengths = self.fit_lengths(crypttext, min_key_length=min_key_length, max_key_length=max_key_length)
+        if self.metrics is not None:
+            self.metrics.start()
+        estimators = {"coincidence": self.fit_lengths, "autocorrelation": self.autocorrelation_lengths}
+        if length_estimator not in estimators:
+            raise ValueError(f"Unknown key length estimator {length_estimator}")
+        possible_lengths = estimators[length_estimator](crypttext, min_key_length=min_key_length,
+                                                        max_key_length=max_key_length)
 
         best_keys = set()
         best_loss: float = None
         for length, index in possible_lengths.items():
             logger.info(f"Trying out length {length} with index {index}...")
+            if self.metrics is not None:
+                self.metrics.report()
             scores_sum = 0
             keys = []
             for cut_index in range(length):
@@ -67,15 +85,52 @@ class VigenereAnalyzer(BaseAnalyzer):
                 logger.info(f"Adding {keys} to the best keys")
                 best_keys.union(keys)
         logger.info(f"Best keys after fitting: {best_keys} ({best_loss:.3f})")
-        return AnalyzerResult(best_keys, best_loss, score_is_loss=True)
+        if self.metrics is not None:
+            self.metrics.report(force=True)
+        return AnalyzerResult(best_keys, best_loss, score_is_loss=True, metrics=self.metrics)
 
     def fit_lengths(self, crypttext: str, min_key_length: int, max_key_length: int) -> Dict[int, float]:
+        """
+        Average coincidence index of strided slices for every key length (best lengths first).
+
+        Text is encoded once, per slice histograms of a length are counted with one bincount
+        over (position mod length, symbol) pairs.
+        """
+        symbols = self.encode_symbols(crypttext)
+        n_symbols = int(symbols.max(initial=-1)) + 1
+        positions = np.arange(len(symbols), dtype=np.int64)
         key_lengths: Dict[int, float] = dict()
         for key_length in range(min_key_length, max_key_length + 1):
-            indices = [
-                coincidence_index(crypttext[text_cut_index::key_length], language=None)
-                for text_cut_index in range(key_length)
-            ]
-            key_lengths[key_length] = sum(indices) / len(indices)
+            counts = np.bincount(positions % key_length * n_symbols + symbols,
+                                 minlength=key_length * n_symbols).reshape(key_length, n_symbols)
+            sizes = counts.sum(axis=1)
+            # coincidence_index(slice) = sum(p^2), empty slices have zero index
+            indices = np.divide((counts ** 2).sum(axis=1), sizes ** 2, out=np.zeros(key_length), where=sizes > 0)
+            key_lengths[key_length] = float(indices.mean())
+
+        return OrderedDict(sorted(key_lengths.items(), key=lambda x: x[1], reverse=True))
+
+    def autocorrelation_lengths(self, crypttext: str, min_key_length: int,
+                                max_key_length: int) -> Dict[int, float]:
+        """
+        Kasiski-style estimate: rate of coinciding characters of the text and the text shifted by a key length
+        (best lengths first). Multiples of the true key length get high rates too.
 
+        Only shifts of candidate key lengths are needed, so coincidences are counted directly
+        with one comparison of the encoded text with itself per shift (linear memory).
+        """
+        symbols = self.encode_symbols(crypttext)
+        size = len(symbols)
+        key_lengths = {
+            key_length: float(np.count_nonzero(symbols[key_length:] == symbols[:-key_length]) / (size - key_length))
+            for key_length in range(min_key_length, min(max_key_length, size - 1) + 1)
+        }
         return OrderedDict(sorted(key_lengths.items(), key=lambda x: x[1], reverse=True))
+
+    @staticmethod
+    def encode_symbols(text: str) -> np.ndarray:
+        """
+        Text characters encoded as consecutive integers
+        """
+        _, symbols = np.unique(to_codepoints(text), return_inverse=True)
+        return symbols.astype(np.int64).ravel()
@@ -0,0 +1,230 @@
+"""
+Batch cracking of crypttexts.
+
+Jobs are JSON objects (one per line)::
+
+    {"id": 1, "cipher": "vigenere", "crypttext": "..."}
+    {"id": 2, "cipher": "transposition", "crypttext": "...", "size": [10, 11],
+     "generator": {"linked_groups": [[-1, -2]]}, "fit": {"ngrams": 3, "phases": 20}}
+
+where ``cipher`` is one of CIPHERS, ``size`` (rows, columns) is the grid of a double transposition,
+``key`` its initial column key, ``generator`` keyword arguments of TranspositionKeyGenerator
+and ``fit`` keyword arguments of the analyzer fit. Results are AnalyzerResult serialized as JSON objects,
+failed jobs and lines which are not valid jobs are reported in the "error" field of their records.
+"""
+import dataclasses
+import json
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from logging import getLogger
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from crypto.algo.transpositions import DoubleTranspositionCipher
+from crypto.analysis.base import AnalyzerResult, BaseAnalyzer
+from crypto.analysis.caesar import CaesarAnalyzer
+from crypto.analysis.hill import HillClimbingAnalyzer
+from crypto.analysis.language.frequency import GramStat, Language
+from crypto.analysis.language.utils import log_loss
+from crypto.analysis.substitution import SubstitutionAnalyzer
+from crypto.analysis.transposition import TranspositionKeyGenerator
+from crypto.analysis.vigenere import VigenereAnalyzer
+from crypto.utils import to_df
+
+logger = getLogger(__name__)
+
+CIPHERS = ("caesar", "vigenere", "transposition", "substitution")
+
+
+@dataclass
+class Job:
+    crypttext: str
+    cipher: str
+    id: Any = None
+    size: Optional[Tuple[int, int]] = None
+    key: Optional[List[int]] = None
+    generator: Dict[str, Any] = field(default_factory=dict)
+    fit: Dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def from_json(cls, line: str, cipher: str = None) -> 'Job':
+        """
+        :param cipher:  Cipher of jobs without one
+        """
+        data = json.loads(line)
+        if not isinstance(data, dict) or "crypttext" not in data:
+            raise ValueError(f"Job should be a JSON object with a crypttext: {line.strip()}")
+        data.setdefault("cipher", cipher)
+        unknown = set(data) - {f.name for f in dataclasses.fields(cls)}
+        if unknown:
+            raise ValueError(f"Unknown job fields {sorted(unknown)}: {line.strip()}")
+        return cls(**data)
+
+
+@dataclass
+class InvalidJob:
+    """
+    Line of a job stream which is not a valid job
+    """
+    line: int
+    error: str
+
+
+def read_jobs(lines: Iterable[str], cipher: str = None) -> Iterator[Union[Job, InvalidJob]]:
+    """
+    Jobs of JSON lines (blank lines are skipped), lines are read lazily.
+    Lines which are not valid jobs do not stop the stream, they are returned as InvalidJob
+    with the line number (starting from 1).
+    """
+    for number, line in enumerate(lines, start=1):
+        if line.strip():
+            try:
+                yield Job.from_json(line, cipher=cipher)
+            except ValueError as e:
+                logger.error(f"Line {number} is not a valid job: {e}")
+                yield InvalidJob(number, f"{type(e).__name__}: {e}")
+
+
+def make_analyzer(job: Job, language: Language,
+                  loss_fn: Callable[[GramStat, GramStat], float] = log_loss) -> Tuple[BaseAnalyzer, Any]:
+    """
+    Analyzer of the job cipher and the crypttext in the form it expects
+    """
+    if job.cipher == "caesar":
+        return CaesarAnalyzer(language), job.crypttext
+    if job.cipher == "vigenere":
+        return VigenereAnalyzer(language), job.crypttext
+    if job.cipher == "substitution":
+        return SubstitutionAnalyzer(language, loss_fn=loss_fn), job.crypttext
+    if job.cipher == "transposition":
+        if job.size is None:
+            raise ValueError("Transposition job requires size (rows, columns) of the grid")
+        rows, columns = job.size
+        key_generator = TranspositionKeyGenerator(job.key if job.key is not None else list(range(columns)),
+                                                  **job.generator)
+        analyzer = HillClimbingAnalyzer(DoubleTranspositionCipher(), key_generator=key_generator, key_argname="k2",
+                                        language=language, loss_fn=loss_fn, vectorized=True)
+        return analyzer, to_df(job.crypttext, (rows, columns))
+    raise ValueError(f"Unknown cipher {job.cipher}, expected one of {', '.join(CIPHERS)}")
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, (set, frozenset)):
+        return sorted(_jsonable(item) for item in value)
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(item) for item in value]
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def to_record(job: Job, analyzer: BaseAnalyzer, crypttext: Any, result: AnalyzerResult) -> Dict[str, Any]:
+    """
+    JSON serializable result of a job with the text decrypted with the first best key.
+    If decryption fails, the keys are kept and the failure is reported in the "plaintext_error" field.
+    """
+    best_keys = _jsonable(result.best_keys)
+    record = {
+        "id": job.id,
+        "cipher": job.cipher,
+        "best_keys": best_keys,
+        "best_score": _jsonable(result.best_score),
+        "score_is_loss": result.score_is_loss,
+        "plaintext": None,
+    }
+    if best_keys:
+        try:
+            record["plaintext"] = analyzer.decrypt(crypttext, best_keys[0])
+        except Exception as e:
+            logger.warning(f"Job {job.id} is not decrypted: {type(e).__name__}: {e}")
+            record["plaintext_error"] = f"{type(e).__name__}: {e}"
+    return record
+
+
+def crack(job: Union[Job, InvalidJob], language: Language,
+          loss_fn: Callable[[GramStat, GramStat], float] = log_loss) -> Dict[str, Any]:
+    """
+    Result record of a job, failures are reported in the "error" field of the record
+    (with the "line" of invalid jobs)
+    """
+    started = time.perf_counter()
+    if isinstance(job, InvalidJob):
+        record = {"id": None, "cipher": None, "line": job.line, "error": job.error}
+    else:
+        try:
+            analyzer, crypttext = make_analyzer(job, language, loss_fn=loss_fn)
+            record = to_record(job, analyzer, crypttext, analyzer.fit(crypttext, **job.fit))
+        except Exception as e:
+            logger.error(f"Job {job.id} failed: {type(e).__name__}: {e}")
+            record = {"id": job.id, "cipher": job.cipher, "error": f"{type(e).__name__}: {e}"}
+    record["elapsed"] = time.perf_counter() - started
+    return record
+
+
+def crack_stream(jobs: Iterable[Union[Job, InvalidJob]], language: Language,
+                 loss_fn: Callable[[GramStat, GramStat], float] = log_loss, workers: int = None,
+                 max_in_flight: int = None, ordered: bool = True) -> Iterator[Dict[str, Any]]:
+    """
+    Result records of jobs (with "index" of the job in the stream) as soon as they are ready.
+
+    With several workers jobs are cracked in a process pool. Language tables are published
+    to a temporary directory once and memory-mapped by workers (see Language.publish).
+    Jobs are read lazily, at most max_in_flight of them (2 per worker by default)
+    are submitted or waiting for their turn to be returned at any time.
+
+    :param ordered:  Return records in the order of jobs, otherwise in the order of completion
+    """
+    if workers is None or workers <= 1:
+        for index, job in enumerate(jobs):
+            yield {"index": index, **crack(job, language, loss_fn=loss_fn)}
+        return
+    max_in_flight = max(max_in_flight or 2 * workers, 1)
+    with tempfile.TemporaryDirectory() as root:
+        shared = dataclasses.replace(language, shared_root=language.publish(Path(root)))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(shared, loss_fn)) as executor:
+            jobs = enumerate(jobs)
+            pending: Dict[Future, int] = {}
+            finished: Dict[int, Dict[str, Any]] = {}
+            next_index = 0
+            exhausted = False
+            while True:
+                # finished records waiting for earlier ones occupy their slots too
+                while not exhausted and len(pending) + len(finished) < max_in_flight:
+                    index, job = next(jobs, (None, None))
+                    if job is None:
+                        exhausted = True
+                    else:
+                        pending[executor.submit(_crack_job, job)] = index
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = pending.pop(future)
+                    record = {"index": index, **future.result()}
+                    if ordered:
+                        finished[index] = record
+                    else:
+                        yield record
+                while next_index in finished:
+                    yield finished.pop(next_index)
+                    next_index += 1
+
+
+_worker_state: Optional[Tuple[Language, Callable[[GramStat, GramStat], float]]] = None
+
+
+def _init_worker(language: Language, loss_fn: Callable[[GramStat, GramStat], float]):
+    global _worker_state
+    _worker_state = language, loss_fn
+
+
+def _crack_job(job: Union[Job, InvalidJob]) -> Dict[str, Any]:
+    language, loss_fn = _worker_state
+    return crack(job, language, loss_fn=loss_fn)
@@ -1,13 +1,14 @@
 """
 Language processing utilities:
 - ENGLISH_FREQUENCY_TABLE
+- matching of frequency tables (match_table, assign_table, ranked_mappings)
 
 """
 import math
 import numpy as np
-from collections import Counter, OrderedDict, defaultdict
+from collections import Counter, defaultdict
 from logging import getLogger
-from typing import NamedTuple, Dict, List
+from typing import NamedTuple, Dict, List, Tuple
 
 logger = getLogger(__name__)
 ENGLISH_FREQUENCY_TABLE = {
@@ -58,6 +59,14 @@ class TextDescriptor(NamedTuple):
         return TextDescriptor(length=length, entropy=entropy, frequencies=freqs)
 
 
+def _sorted_table(table: Dict[str, float]) -> Tuple[List[str], np.ndarray]:
+    """
+    Letters of a frequency table and their frequencies sorted by frequency
+    """
+    items = sorted(table.items(), key=lambda t: t[1])
+    return [letter for letter, _ in items], np.array([freq for _, freq in items], dtype=float)
+
+
 def match_table(a: Dict[str, float], b: Dict[str, float],
                 rtol: float=0.05, atol: float=0.01) -> Dict[str, List[str]]:
     """
@@ -65,20 +74,86 @@ def match_table(a: Dict[str, float], b: Dict[str, float],
 
     :return: a dictionary of matches letters from a -> b
     """
-    a = OrderedDict(sorted(a.items(), key=lambda t: t[1]))
-    b = OrderedDict(sorted(b.items(), key=lambda t: t[1]))
+    a_keys, a_freqs = _sorted_table(a)
+    b_keys, b_freqs = _sorted_table(b)
+    # tolerance mask of all pairs at once (np.allclose semantics)
+    close = np.isclose(a_freqs[:, None], b_freqs[None, :], rtol=rtol, atol=atol)
     mapping = defaultdict(list)
-    for a_key, a_freq in a.items():
-        for b_key, b_freq in b.items():
-            #logger.debug(f"Comparing {a_key}-{b_key} ({a_freq} vs. {b_freq})")
-            if np.allclose(a_freq, b_freq, rtol=rtol, atol=atol):
-                logger.debug(f"Mapping {a_key}->{b_key} ({a_freq} -> {b_freq})")
-                mapping[a_key].append(b_key)
-        if len(mapping[a_key]) == 0:
+    for a_key, a_freq, row in zip(a_keys, a_freqs, close):
+        mapping[a_key] = [b_keys[j] for j in np.flatnonzero(row)]
+        if mapping[a_key]:
+            logger.debug(f"Mapping {a_key}->{mapping[a_key]} ({a_freq})")
+        else:
             logger.warning(f"Not found any letters for letter {a_key} ({a_freq})")
     return mapping
 
 
+def _assign_sorted(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Optimal order-preserving assignment of sorted frequencies a to sorted frequencies b (len(a) <= len(b))
+    minimizing the sum of absolute differences
+
+    :return: indices of b assigned to every element of a
+    """
+    costs = np.abs(a[:, None] - b[None, :])
+    # values[i, j]: best cost of a[:i + 1] with a[i] assigned to b[j]
+    values = np.empty_like(costs)
+    previous = np.zeros(len(b))
+    for i in range(len(a)):
+        values[i] = previous + costs[i]
+        values[i, :i] = np.inf
+        previous = np.concatenate(([np.inf], np.minimum.accumulate(values[i])[:-1]))
+    assigned = np.empty(len(a), dtype=np.int64)
+    limit = len(b)
+    for i in range(len(a) - 1, -1, -1):
+        assigned[i] = np.argmin(values[i, :limit])
+        limit = assigned[i]
+    return assigned
+
+
+def assign_table(a: Dict[str, float], b: Dict[str, float]) -> Dict[str, str]:
+    """
+    Optimal one-to-one matching of one frequency table to another minimizing the total frequency distance.
+    On a line the optimal matching keeps frequency ranks, so with tables of the same size letters are
+    matched by rank; with tables of different sizes letters of the larger table are left out optimally.
+
+    :return: a dictionary of matched letters from a -> b (letters of a are left out if a is larger than b)
+    """
+    a_keys, a_freqs = _sorted_table(a)
+    b_keys, b_freqs = _sorted_table(b)
+    if len(a_keys) <= len(b_keys):
+        return {a_key: b_keys[j] for a_key, j in zip(a_keys, _assign_sorted(a_freqs, b_freqs))}
+    return {a_keys[i]: b_key for b_key, i in zip(b_keys, _assign_sorted(b_freqs, a_freqs))}
+
+
+def ranked_mappings(a: Dict[str, float], b: Dict[str, float], count: int = 10) -> List[Tuple[float, Dict[str, str]]]:
+    """
+    Candidate one-to-one matchings of one frequency table to another ranked by the total frequency distance:
+    the optimal matching (see assign_table) followed by matchings swapping targets of two of its letters
+
+    :return: list of (distance, mapping of letters from a -> b) of at most count candidates
+    """
+    best = assign_table(a, b)
+    keys = list(best)
+    targets = [best[key] for key in keys]
+    a_freqs = np.array([a[key] for key in keys], dtype=float)
+    b_freqs = np.array([b[target] for target in targets], dtype=float)
+    distance = float(np.abs(a_freqs - b_freqs).sum())
+    # change of distance swapping targets of letters i and j, all pairs at once
+    own = np.abs(a_freqs - b_freqs)
+    changes = np.abs(a_freqs[:, None] - b_freqs[None, :]) + np.abs(a_freqs[None, :] - b_freqs[:, None]) \
+        - own[:, None] - own[None, :]
+    rows, columns = np.triu_indices(len(keys), k=1)
+    pairs = np.argsort(changes[rows, columns], kind="stable")[:max(count - 1, 0)]
+    candidates = [(distance, best)]
+    for pair in pairs.tolist():
+        i, j = rows[pair], columns[pair]
+        mapping = dict(best)
+        mapping[keys[i]], mapping[keys[j]] = targets[j], targets[i]
+        candidates.append((distance + float(changes[i, j]), mapping))
+    return candidates[:count]
+
+
 # ASSERTIONS on the static data defined above
 assert abs(sum(ENGLISH_FREQUENCY_TABLE.values())-1) < 0.0001, \
     f"Frequencies in ENGLISH_FREQUENCY_TABLE should sum up to 1 (sum is {sum(ENGLISH_FREQUENCY_TABLE.values())})"
@@ -1,8 +1,11 @@
 import copy
 import itertools
+import os
 import random
-from typing import Iterator, List, Iterable, Set, Tuple, Any
+from pathlib import Path
+from typing import Iterator, List, Iterable, Set, Tuple, Any, BinaryIO, Callable
 
+import numpy as np
 import pandas as pd
 
 
@@ -23,6 +26,17 @@ def to_df(text: str, size: Tuple[int, int]) -> pd.DataFrame:
     return pd.DataFrame(data)
 
 
+def to_grid(text: str, size: Tuple[int, int]) -> np.ndarray:
+    """
+    Convert a line of text into a two dimensional array of unicode code points
+
+    :param text:
+    :param size:
+    :return:
+    """
+    return to_codepoints(text[:size[0] * size[1]]).reshape(size)
+
+
 def from_df(matrix: pd.DataFrame) -> List[str]:
     """
     Convert matrix to a text lines array
@@ -42,3 +56,37 @@ def swap_elements(a: List[int], swap: Tuple[int, int]):
     a[swap[0]] = a[swap[1]]
     a[swap[1]] = tmp
     return a
+
+
+def to_codepoints(text: str) -> np.ndarray:
+    """
+    Convert text into an array of unicode code points
+
+    :param text:
+    :return:
+    """
+    return np.frombuffer(text.encode("utf-32-le"), dtype="<u4")
+
+
+def from_codepoints(codepoints: np.ndarray) -> str:
+    """
+    Convert an array of unicode code points back into text
+
+    :param codepoints:
+    :return:
+    """
+    return np.ascontiguousarray(codepoints, dtype="<u4").tobytes().decode("utf-32-le")
+
+
+def write_atomic(path: Path, write: Callable[[BinaryIO], Any]):
+    """
+    Writes a file through a temporary file replacing it at once,
+    so that readers never see a partially written file
+    """
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        with tmp_path.open("wb") as f:
+            write(f)
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)